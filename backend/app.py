@@ -5,280 +5,472 @@ This backend manages PyPay contract operations.
 """
 
 import os
+import queue
+import time
 import pathlib
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, Response, g, request
 from flask_cors import CORS
 from dotenv import load_dotenv
-from wallet_manager import WalletManager
-from contract_manager import ContractManager
+from config import EVENTS_KEEPALIVE, EVENTS_MAX_STREAM
+from metrics import observe_request, render
+from services import Services
+from job_queue import IdempotencyConflict
+from schemas import (
+    RequestError, decode, encode, encode_event, error_body,
+    TransferRequest, TransferBatchRequest, CrossChainTransferRequest, CheckCrossChainRequest, EstimateFeeRequest,
+    PyusdBalancesRequest, ComputeAddressRequest, VerifyPayload, VerifyRequest
+)
 
 # Load environment variables from root directory
 env_path = pathlib.Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
-app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "*"}})  # Enable CORS for frontend integration
+api = Blueprint('api', __name__)
 
-# Initialize wallet manager and contract manager
-wallet_manager = WalletManager()
-contract_manager = ContractManager(wallet_manager)
+def create_wallet_manager():
+    """Create the wallet manager (imports web3 on first use)."""
+    from wallet_manager import WalletManager
+    return WalletManager()
 
-@app.route('/health', methods=['GET'])
+def create_contract_manager(wallet_manager):
+    """Create the contract manager for a wallet manager."""
+    from contract_manager import ContractManager
+    return ContractManager(wallet_manager)
+
+# Wallet and contract managers, created on first use and warmed in the background
+services = Services(create_wallet_manager, create_contract_manager)
+wallet_manager = services.wallet_manager
+contract_manager = services.contract_manager
+
+def respond(body, status=200):
+    """JSON response, encoded with msgspec."""
+    return Response(encode(body), status=status, mimetype='application/json')
+
+@api.before_app_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@api.before_app_request
+def warm_services():
+    """Warm this process's services if no server hook has (a no-op once started)."""
+    services.warm()
+
+@api.after_app_request
+def record_request(response):
+    """Record endpoint latency by URL rule (not raw path, to keep labels bounded)."""
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    observe_request(request.method, endpoint, response.status_code, time.perf_counter() - g.request_start)
+    return response
+
+@api.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics: endpoint, RPC and contract manager stage latencies."""
+    body, content_type = render()
+    return Response(body, status=200, content_type=content_type)
+
+@api.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint."""
-    return jsonify({
+    """Liveness check; does not wait for the RPC connections (see /ready)."""
+    return respond({
         'status': 'healthy',
         'address': wallet_manager.get_address(),
         'network': os.getenv('NETWORK', 'mainnet')
-    }), 200
+    }, 200)
+
+@api.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness check: 200 once this process's RPC connections are warm, 503 until then."""
+    readiness = services.readiness()
+    return respond({
+        'status': 'ready' if readiness['ready'] else 'starting',
+        **readiness
+    }, 200 if readiness['ready'] else 503)
 
-@app.route('/balance', methods=['GET'])
+@api.route('/balance', methods=['GET'])
 def get_balance():
     """Get the balance of the wallet in ETH."""
     try:
-        balance = wallet_manager.get_balance()
-        return jsonify({
+        balance = contract_manager.get_wallet_balance()
+        return respond({
             'success': True,
             'balance': balance
-        }), 200
+        }, 200)
     except Exception as e:
-        return jsonify({
+        return respond({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
-@app.route('/address', methods=['GET'])
+@api.route('/address', methods=['GET'])
 def get_address():
     """Get the wallet address."""
     try:
         address = wallet_manager.get_address()
-        return jsonify({
+        return respond({
             'success': True,
             'address': address
-        }), 200
+        }, 200)
     except Exception as e:
-        return jsonify({
+        return respond({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
-@app.route('/cross-chain-transfer', methods=['POST'])
+@api.route('/cross-chain-transfer', methods=['POST'])
 def cross_chain_transfer():
-    """Call PyPay CrossChainTransfer function."""
+    """Queue PyPay CrossChainTransfer function; follow /jobs/<job_id>/events for the result."""
     try:
-        data = request.json
-        
-        # Validate required fields
-        required_fields = [
-            'contract_address', 'source_chain_ids', 'amount_each',
-            'nonces', 'expiry', 'destination_chain_id', 'target_address',
-            'signature', 'native_fee'
-        ]
-        
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
-            return jsonify({
-                'success': False,
-                'error': f'Missing required fields: {", ".join(missing_fields)}'
-            }), 400
-        
-        # Convert signature hex string to bytes
-        signature = bytes.fromhex(data['signature'].replace('0x', ''))
-        
-        # Convert string arrays to int arrays
-        source_chain_ids = [int(x) for x in data['source_chain_ids']]
-        amount_each = [int(x) for x in data['amount_each']]
-        nonces = [int(x) for x in data['nonces']]
+        req = decode(request.get_data(), CrossChainTransferRequest)
         
-        # Convert strings to int
-        expiry = int(data['expiry'])
-        destination_chain_id = int(data['destination_chain_id'])
-        native_fee = int(data['native_fee'])
-        
-        # Call contract function
-        tx_hash = contract_manager.cross_chain_transfer(
-            contract_address=data['contract_address'],
-            source_chain_ids=source_chain_ids,
-            amount_each=amount_each,
-            nonces=nonces,
-            expiry=expiry,
-            destination_chain_id=destination_chain_id,
-            target_address=data['target_address'],
-            signature=signature,
-            native_fee=native_fee
+        # Queue the contract call
+        job_id = contract_manager.submit_cross_chain_transfer(
+            **req.payload(),
+            native_fee=req.native_fee,
+            urgency=req.urgency,
+            idempotency_key=request.headers.get('Idempotency-Key')
         )
         
-        return jsonify({
+        return respond({
             'success': True,
-            'tx_hash': tx_hash,
-            'message': 'CrossChainTransfer transaction sent successfully'
-        }), 200
+            'job_id': job_id,
+            'status_url': f'/jobs/{job_id}',
+            'events_url': f'/jobs/{job_id}/events',
+            'message': 'CrossChainTransfer transaction queued'
+        }, 202)
         
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except IdempotencyConflict as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 409)
     except Exception as e:
-        return jsonify({
+        return respond({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
-@app.route('/transfer', methods=['POST'])
+@api.route('/transfer', methods=['POST'])
 def transfer():
-    """Call PyPay transfer function."""
+    """Queue PyPay transfer function; follow /jobs/<job_id>/events for the result."""
     try:
-        data = request.json
-        
-        # Validate required fields
-        required_fields = [
-            'contract_address', 'source_chain_ids', 'amount_each',
-            'nonces', 'expiry', 'destination_chain_id', 'target_address',
-            'signature'
-        ]
+        req = decode(request.get_data(), TransferRequest)
         
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
-            return jsonify({
-                'success': False,
-                'error': f'Missing required fields: {", ".join(missing_fields)}'
-            }), 400
+        # Queue the contract call
+        job_id = contract_manager.submit_transfer(
+            **req.payload(),
+            urgency=req.urgency,
+            idempotency_key=request.headers.get('Idempotency-Key')
+        )
         
-        # Convert signature hex string to bytes
-        signature = bytes.fromhex(data['signature'].replace('0x', ''))
+        return respond({
+            'success': True,
+            'job_id': job_id,
+            'status_url': f'/jobs/{job_id}',
+            'events_url': f'/jobs/{job_id}/events',
+            'message': 'Transfer transaction queued'
+        }, 202)
         
-        # Convert string arrays to int arrays
-        source_chain_ids = [int(x) for x in data['source_chain_ids']]
-        amount_each = [int(x) for x in data['amount_each']]
-        nonces = [int(x) for x in data['nonces']]
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except IdempotencyConflict as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 409)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/transfer/batch', methods=['POST'])
+def transfer_batch():
+    """Pre-verify and send many PyPay transfer payloads, pipelined per chain; one result per payload."""
+    try:
+        req = decode(request.get_data(), TransferBatchRequest)
         
-        # Convert strings to int
-        expiry = int(data['expiry'])
-        destination_chain_id = int(data['destination_chain_id'])
+        # Payloads that cannot be decoded fail on their own; the rest are sent together
+        results = []
+        payloads = []
+        for raw in req.payloads:
+            try:
+                payloads.append(decode(raw, TransferRequest).payload())
+                results.append(None)
+            except RequestError as e:
+                results.append(error_body(e))
         
-        # Call contract function
-        tx_hash = contract_manager.transfer(
-            contract_address=data['contract_address'],
-            source_chain_ids=source_chain_ids,
-            amount_each=amount_each,
-            nonces=nonces,
-            expiry=expiry,
-            destination_chain_id=destination_chain_id,
-            target_address=data['target_address'],
-            signature=signature
-        )
+        sent = iter(contract_manager.transfer_batch(payloads, urgency=req.urgency))
+        results = [result if result is not None else next(sent) for result in results]
+        succeeded = sum(1 for result in results if result['success'])
         
-        return jsonify({
+        return respond({
             'success': True,
-            'tx_hash': tx_hash,
-            'message': 'Transfer transaction sent successfully'
-        }), 200
+            'sent': succeeded,
+            'failed': len(results) - succeeded,
+            'results': results
+        }, 200)
         
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the state of a queued transfer."""
+    try:
+        job = contract_manager.get_job(job_id)
+        if job is None:
+            return respond({
+                'success': False,
+                'error': f'Job not found: {job_id}'
+            }, 404)
+        return respond({
+            'success': True,
+            'job': job
+        }, 200)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Stream the lifecycle of a queued transfer as server-sent events until it is done."""
+    events = queue.Queue()
+    try:
+        unsubscribe = contract_manager.subscribe_job(
+            job_id,
+            events.put,
+            after=request.headers.get('Last-Event-ID', type=int)
+        )
+        if unsubscribe is None:
+            return respond({
+                'success': False,
+                'error': f'Job not found: {job_id}'
+            }, 404)
     except Exception as e:
-        return jsonify({
+        return respond({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
+    
+    def stream():
+        deadline = time.monotonic() + EVENTS_MAX_STREAM
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    event = events.get(timeout=EVENTS_KEEPALIVE)
+                except queue.Empty:
+                    # Comment line so proxies do not close an idle stream
+                    yield b': keep-alive\n\n'
+                    continue
+                yield encode_event(event)
+                if event['event'] == 'done':
+                    return
+        finally:
+            unsubscribe()
+    
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
-@app.route('/tx-status/<tx_hash>', methods=['GET'])
+@api.route('/tx-status/<tx_hash>', methods=['GET'])
 def get_transaction_status(tx_hash):
-    """Get the status of a transaction."""
+    """Get the status of a transaction. Optional ?chain_id= and ?wait=<seconds> long-poll."""
     try:
-        status = contract_manager.get_transaction_receipt(tx_hash)
-        return jsonify({
+        status = contract_manager.get_transaction_receipt(
+            tx_hash,
+            chain_id=request.args.get('chain_id', type=int),
+            wait=request.args.get('wait', 0, type=float)
+        )
+        return respond({
             'success': True,
             'status': status
-        }), 200
+        }, 200)
     except Exception as e:
-        return jsonify({
+        return respond({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
-@app.route('/check-cross-chain', methods=['POST'])
+@api.route('/check-cross-chain', methods=['POST'])
 def check_cross_chain():
     """Check if cross-chain transfer has been received."""
     try:
-        data = request.json
-        
-        required_fields = ['target_address', 'amount_expected', 'destination_chain_id']
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
-            return jsonify({
-                'success': False,
-                'error': f'Missing required fields: {", ".join(missing_fields)}'
-            }), 400
+        req = decode(request.get_data(), CheckCrossChainRequest)
         
         result = contract_manager.check_cross_chain_received(
-            target_address=data['target_address'],
-            amount_expected=int(data['amount_expected']),
-            destination_chain_id=int(data['destination_chain_id']),
-            timeout=int(data.get('timeout', 60))
+            target_address=req.target_address,
+            amount_expected=req.amount_expected,
+            destination_chain_id=req.destination_chain_id,
+            timeout=req.timeout,
+            since_block=req.since_block
         )
         
-        return jsonify({
+        return respond({
             'success': True,
             'result': result
-        }), 200
+        }, 200)
         
+    except RequestError as e:
+        return respond(error_body(e), 400)
     except Exception as e:
-        return jsonify({
+        return respond({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
-@app.route('/estimate-fee', methods=['POST'])
+@api.route('/estimate-fee', methods=['POST'])
 def estimate_fee():
     """Estimate native fee for cross-chain transfer by querying the contract."""
     try:
-        data = request.json
-        
-        required_fields = ['contract_address', 'source_chain_id', 'destination_chain_id', 'amount', 'target_address']
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
-            return jsonify({
-                'success': False,
-                'error': f'Missing required fields: {", ".join(missing_fields)}'
-            }), 400
+        req = decode(request.get_data(), EstimateFeeRequest)
         
-        contract_address = data['contract_address']
-        source_chain_id = int(data['source_chain_id'])
-        destination_chain_id = int(data['destination_chain_id'])
-        amount = data['amount']
-        target_address = data['target_address']
-        
-        # Query the contract for the actual native fee
-        quote_fee = contract_manager.get_quote_native_fee(
-            contract_address=contract_address,
-            source_chain_id=source_chain_id,
-            destination_chain_id=destination_chain_id,
-            amount=amount,
-            target_address=target_address
+        # Native fee from the background-refreshed quote cache
+        quote = contract_manager.get_native_fee_quote(
+            contract_address=req.contract_address,
+            source_chain_id=req.source_chain_id,
+            destination_chain_id=req.destination_chain_id,
+            amount=req.amount,
+            target_address=req.target_address,
+            force_refresh=req.force_refresh
         )
+        quote_fee = quote['native_fee']
         
         # Add 20% buffer for safety
         estimated_fee = int(quote_fee * 1.2)
         
-        return jsonify({
+        return respond({
             'success': True,
             'estimated_fee': str(estimated_fee),
             'estimated_fee_eth': estimated_fee / 1e18,
             'quote_fee': str(quote_fee),
             'quote_fee_eth': quote_fee / 1e18,
+            'quote_age': quote['age'],
+            'quote_block_number': quote['block_number'],
             'note': 'Fee queried from contract with 20% safety buffer'
-        }), 200
+        }, 200)
+        
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/pyusd-balances', methods=['POST'])
+def pyusd_balances():
+    """Get PYUSD balances of many addresses across chains, one batched read per chain."""
+    try:
+        req = decode(request.get_data(), PyusdBalancesRequest)
         
+        balances = contract_manager.get_pyusd_balances(req.addresses, req.chain_ids or None)
+        
+        return respond({
+            'success': True,
+            'balances': {
+                str(chain_id): {address: str(balance) if balance is not None else None for address, balance in by_address.items()}
+                for chain_id, by_address in balances.items()
+            }
+        }, 200)
+        
+    except RequestError as e:
+        return respond(error_body(e), 400)
     except Exception as e:
-        return jsonify({
+        return respond({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
-@app.errorhandler(404)
+@api.route('/compute-address', methods=['POST'])
+def compute_address():
+    """Compute the PyPay contract addresses of many users, without RPC calls."""
+    try:
+        req = decode(request.get_data(), ComputeAddressRequest)
+        
+        contract_addresses = contract_manager.compute_contract_addresses(req.addresses, chain_id=req.chain_id)
+        
+        return respond({
+            'success': True,
+            'addresses': dict(zip(req.addresses, contract_addresses))
+        }, 200)
+        
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/verify', methods=['POST'])
+def verify_payloads():
+    """Pre-verify signed transfer payloads (signature, expiry, source chain, used nonce)."""
+    try:
+        req = decode(request.get_data(), VerifyRequest)
+        
+        # Payloads that cannot be decoded fail on their own; the rest are verified together
+        results = []
+        payloads = []
+        for raw in req.payloads:
+            try:
+                payloads.append(decode(raw, VerifyPayload).payload())
+                results.append(None)
+            except RequestError as e:
+                results.append({'valid': False, 'error': str(e), 'signer': None})
+        
+        verified = iter(contract_manager.verify_payloads(payloads))
+        results = [result if result is not None else next(verified) for result in results]
+        
+        return respond({
+            'success': True,
+            'results': results
+        }, 200)
+        
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.app_errorhandler(404)
 def not_found(error):
-    return jsonify({'error': 'Not found'}), 404
+    return respond({'error': 'Not found'}, 404)
 
-@app.errorhandler(500)
+@api.app_errorhandler(500)
 def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
+    return respond({'error': 'Internal server error'}, 500)
+
+def create_app():
+    """
+    Create the Flask app.
+    Creates no services and opens no connections, so it is safe to call in a
+    process that is forked into workers afterwards (gunicorn preload_app);
+    each worker warms its own services.
+    
+    Returns:
+        Flask app
+    """
+    app = Flask(__name__)
+    CORS(app, resources={r"/*": {"origins": "*"}})  # Enable CORS for frontend integration
+    app.register_blueprint(api)
+    return app
+
+app = create_app()
 
 if __name__ == '__main__':
+    services.warm()
     port = int(os.getenv('PORT', 5002))  # Changed default to 5002 to avoid conflicts
     debug = os.getenv('DEBUG', 'False').lower() == 'true'
     app.run(host='0.0.0.0', port=port, debug=debug)
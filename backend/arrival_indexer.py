@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Arrival Indexer for cross-chain PYUSD deliveries.
+Incrementally indexes PYUSD Transfer logs coming from the OFT contract
+(or minted) and OFT receive logs on each destination chain, keeps a
+persisted checkpoint and an in-memory index by recipient of the credits
+of the last ARRIVAL_MEMORY_WINDOW blocks (older lookups read the store).
+"""
+
+import os
+from web3 import Web3
+from chain_clients import batch_request
+from log_indexer import LogIndexer, address_topic
+from config import (
+    STATE_DIR, PYUSD_ADDRESSES, OFT_ADDRESSES, INDEXER_REORG_DEPTH, INDEXER_REORG_DEPTHS,
+    ARRIVAL_MEMORY_WINDOW, ARRIVAL_MEMORY_WINDOWS
+)
+
+# Transfer(address indexed from, address indexed to, uint256 value)
+TRANSFER_TOPIC = Web3.keccak(text='Transfer(address,address,uint256)').hex()
+
+# OFTReceived(bytes32 indexed guid, uint32 srcEid, address indexed toAddress, uint256 amountReceivedLD)
+OFT_RECEIVED_TOPIC = Web3.keccak(text='OFTReceived(bytes32,uint32,address,uint256)').hex()
+
+ZERO_TOPIC = '0x' + '00' * 32
+
+
+def _topic_address(topic):
+    return Web3.to_checksum_address('0x' + topic[-40:])
+
+
+class ArrivalIndexer(LogIndexer):
+    """Indexes PYUSD credits from LayerZero deliveries per destination chain."""
+
+    name = 'arrival-indexer'
+
+    def __init__(self, clients, heads, db_path=None):
+        """
+        Initialize the indexer.
+
+        Args:
+            clients: ChainClientRegistry for the destination chains
+            heads: HeadFollower that signals new blocks
+            db_path: Optional SQLite file path (default: STATE_DIR/arrivals.db)
+        """
+        if db_path is None:
+            db_path = os.getenv('ARRIVALS_DB_PATH') or os.path.join(
+                os.getenv('STATE_DIR', STATE_DIR), 'arrivals.db'
+            )
+        self._index = {}     # (chain_id, recipient) -> [credit, ...]
+        self._horizons = {}  # chain_id -> first block whose credits are all in memory
+        super().__init__(clients, heads, db_path)
+
+    def _create_tables(self, conn):
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS credits ('
+            ' chain_id INTEGER NOT NULL,'
+            ' recipient TEXT NOT NULL,'
+            ' tx_hash TEXT NOT NULL,'
+            ' block_number INTEGER NOT NULL,'
+            ' amount TEXT NOT NULL,'
+            ' PRIMARY KEY (chain_id, tx_hash, recipient))'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS credits_block ON credits (chain_id, block_number)')
+        conn.execute('CREATE INDEX IF NOT EXISTS credits_recipient ON credits (chain_id, recipient, block_number)')
+
+    def _load(self, conn):
+        for chain_id, checkpoint in self._checkpoints.items():
+            horizon = max(checkpoint - ARRIVAL_MEMORY_WINDOWS.get(chain_id, ARRIVAL_MEMORY_WINDOW) + 1, 0)
+            self._horizons[chain_id] = horizon
+            for recipient, tx_hash, block_number, amount in conn.execute(
+                'SELECT recipient, tx_hash, block_number, amount FROM credits'
+                ' WHERE chain_id = ? AND block_number >= ? ORDER BY block_number',
+                (chain_id, horizon)
+            ):
+                self._index.setdefault((chain_id, recipient), []).append({
+                    'tx_hash': tx_hash,
+                    'block_number': block_number,
+                    'amount': int(amount)
+                })
+
+    def _check_chain(self, chain_id):
+        if chain_id not in PYUSD_ADDRESSES:
+            raise ValueError(f'Unsupported chain: {chain_id}')
+
+    def credits(self, chain_id, recipient, since_block=None):
+        """
+        Look up indexed credits to a recipient.
+
+        Args:
+            chain_id: Destination chain ID
+            recipient: Recipient address
+            since_block: Optional first block to include
+
+        Returns:
+            List of credits (tx_hash, block_number, amount)
+        """
+        recipient = Web3.to_checksum_address(recipient)
+        if since_block is None or since_block < self._horizons.get(chain_id, 0):
+            # Reaches past the in-memory window
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT tx_hash, block_number, amount FROM credits'
+                    ' WHERE chain_id = ? AND recipient = ? AND block_number >= ? ORDER BY block_number',
+                    (chain_id, recipient, since_block or 0)
+                ).fetchall()
+            return [
+                {'tx_hash': tx_hash, 'block_number': block_number, 'amount': int(amount)}
+                for tx_hash, block_number, amount in rows
+            ]
+
+        credits = self._index.get((chain_id, recipient), [])
+        return [credit for credit in credits if credit['block_number'] >= since_block]
+
+    def check(self, chain_id, recipient, amount_expected, since_block=None):
+        """
+        Check whether the expected amount has been credited to a recipient.
+
+        Args:
+            chain_id: Destination chain ID
+            recipient: Recipient address
+            amount_expected: Expected amount (PYUSD base units, 6 decimals)
+            since_block: Optional first block to include
+
+        Returns:
+            dict with status information
+        """
+        self.start(chain_id)
+        credits = self.credits(chain_id, recipient, since_block)
+        received_amount = sum(credit['amount'] for credit in credits)
+        received = bool(credits) and received_amount >= amount_expected * 99 // 100
+        head = self.heads.head(chain_id)
+        depth = INDEXER_REORG_DEPTHS.get(chain_id, INDEXER_REORG_DEPTH)
+
+        return {
+            # OFT delivers at least 99% of the amount sent (minAmountLD)
+            'received': received,
+            # Credits deeper than the reorg depth are no longer indexed again
+            'confirmed': received and head is not None and all(
+                credit['block_number'] <= head - depth for credit in credits
+            ),
+            'received_amount': received_amount / 1e6,  # PYUSD has 6 decimals
+            'expected_amount': amount_expected / 1e6,
+            'credits': credits,
+            'indexed_block': self.checkpoint(chain_id),
+            'chain_id': chain_id,
+            'address': recipient
+        }
+
+    def _fetch_logs(self, chain_id, web3, from_block, to_block):
+        oft_address = OFT_ADDRESSES[chain_id]
+        block_range = {'fromBlock': hex(from_block), 'toBlock': hex(to_block)}
+        responses = batch_request(web3, [
+            # PYUSD unlocked by the OFT adapter or minted on delivery
+            ('eth_getLogs', [{
+                **block_range,
+                'address': PYUSD_ADDRESSES[chain_id],
+                'topics': [TRANSFER_TOPIC, [address_topic(oft_address), ZERO_TOPIC]]
+            }]),
+            ('eth_getLogs', [{
+                **block_range,
+                'address': oft_address,
+                'topics': [OFT_RECEIVED_TOPIC]
+            }])
+        ])
+
+        logs = []
+        for response in responses:
+            if 'error' in response:
+                raise ValueError(response['error'])
+            logs.extend(response['result'])
+        return logs
+
+    def _store(self, chain_id, logs):
+        credits = []
+        for log in logs:
+            topics = log['topics']
+            if topics[0] == TRANSFER_TOPIC:
+                recipient = _topic_address(topics[2])
+                amount = int(log['data'], 16)
+            else:
+                # data = srcEid (uint32) || amountReceivedLD (uint256)
+                recipient = _topic_address(topics[2])
+                amount = int(log['data'][-64:], 16)
+            credits.append((chain_id, recipient, log['transactionHash'], int(log['blockNumber'], 16), str(amount)))
+
+        # A delivery emits both a Transfer and an OFTReceived log; the key keeps one
+        for credit in credits:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO credits (chain_id, recipient, tx_hash, block_number, amount)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                credit
+            )
+            if cursor.rowcount:
+                chain, recipient, tx_hash, block_number, amount = credit
+                self._index.setdefault((chain, recipient), []).append({
+                    'tx_hash': tx_hash,
+                    'block_number': block_number,
+                    'amount': int(amount)
+                })
+        if credits:
+            self._prune(chain_id, max(credit[3] for credit in credits))
+
+    def _rewind(self, chain_id, from_block, to_block):
+        rows = self._conn.execute(
+            'SELECT DISTINCT recipient FROM credits WHERE chain_id = ? AND block_number BETWEEN ? AND ?',
+            (chain_id, from_block, to_block)
+        ).fetchall()
+        if not rows:
+            return
+        self._conn.execute(
+            'DELETE FROM credits WHERE chain_id = ? AND block_number BETWEEN ? AND ?',
+            (chain_id, from_block, to_block)
+        )
+        for (recipient,) in rows:
+            key = (chain_id, recipient)
+            credits = [
+                credit for credit in self._index.get(key, [])
+                if not from_block <= credit['block_number'] <= to_block
+            ]
+            if credits:
+                self._index[key] = credits
+            else:
+                self._index.pop(key, None)
+
+    def _prune(self, chain_id, block_number):
+        window = ARRIVAL_MEMORY_WINDOWS.get(chain_id, ARRIVAL_MEMORY_WINDOW)
+        horizon = block_number - window + 1
+        # Moved in steps of a tenth of the window, so memory stays within 1.1 windows
+        if horizon - self._horizons.get(chain_id, 0) < window // 10:
+            return
+        self._horizons[chain_id] = horizon
+        for key in [key for key in self._index if key[0] == chain_id]:
+            credits = [credit for credit in self._index[key] if credit['block_number'] >= horizon]
+            if credits:
+                self._index[key] = credits
+            else:
+                del self._index[key]
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+ASGI application for blockchain backend.
+Serves the same endpoints and JSON responses as app.py, backed by
+AsyncWeb3 so slow chain calls do not hold a worker thread.
+
+Run with: hypercorn asgi:app --bind 0.0.0.0:5002
+"""
+
+import asyncio
+import os
+import time
+import pathlib
+from quart import Blueprint, Quart, Response, g, request
+from quart_cors import cors
+from dotenv import load_dotenv
+from config import EVENTS_KEEPALIVE, EVENTS_MAX_STREAM
+from metrics import observe_request, render
+from services import Services
+from job_queue import IdempotencyConflict
+from schemas import (
+    RequestError, decode, encode, encode_event, error_body,
+    TransferRequest, TransferBatchRequest, CrossChainTransferRequest, CheckCrossChainRequest, EstimateFeeRequest,
+    ComputeAddressRequest, PyusdBalancesRequest, VerifyPayload, VerifyRequest
+)
+
+# Load environment variables from root directory
+env_path = pathlib.Path(__file__).parent.parent / '.env'
+load_dotenv(dotenv_path=env_path)
+
+api = Blueprint('api', __name__)
+
+def create_wallet_manager():
+    """Create the async wallet manager (imports web3 on first use)."""
+    from async_wallet_manager import AsyncWalletManager
+    return AsyncWalletManager()
+
+def create_contract_manager(wallet_manager):
+    """Create the async contract manager for a wallet manager."""
+    from async_contract_manager import AsyncContractManager
+    return AsyncContractManager(wallet_manager)
+
+# Wallet and contract managers, created on first use and warmed in the background
+services = Services(create_wallet_manager, create_contract_manager)
+wallet_manager = services.wallet_manager
+contract_manager = services.contract_manager
+
+@api.before_app_serving
+async def startup():
+    """Start the job dispatchers and warm the RPC connections in the background once the event loop is running."""
+    await contract_manager.start()
+    services.warm_async()
+
+@api.after_app_serving
+async def shutdown():
+    """Close pooled RPC sessions."""
+    await contract_manager.close()
+
+def respond(body, status=200):
+    """JSON response, encoded with msgspec."""
+    return Response(encode(body), status=status, mimetype='application/json')
+
+@api.before_app_request
+async def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@api.after_app_request
+async def record_request(response):
+    """Record endpoint latency by URL rule (not raw path, to keep labels bounded)."""
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    observe_request(request.method, endpoint, response.status_code, time.perf_counter() - g.request_start)
+    return response
+
+@api.route('/metrics', methods=['GET'])
+async def get_metrics():
+    """Prometheus metrics: endpoint, RPC and contract manager stage latencies."""
+    body, content_type = render()
+    return Response(body, status=200, content_type=content_type)
+
+@api.route('/health', methods=['GET'])
+async def health_check():
+    """Liveness check; does not wait for the RPC connections (see /ready)."""
+    return respond({
+        'status': 'healthy',
+        'address': wallet_manager.get_address(),
+        'network': os.getenv('NETWORK', 'mainnet')
+    }, 200)
+
+@api.route('/ready', methods=['GET'])
+async def readiness_check():
+    """Readiness check: 200 once this process's RPC connections are warm, 503 until then."""
+    readiness = services.readiness()
+    return respond({
+        'status': 'ready' if readiness['ready'] else 'starting',
+        **readiness
+    }, 200 if readiness['ready'] else 503)
+
+@api.route('/balance', methods=['GET'])
+async def get_balance():
+    """Get the balance of the wallet in ETH."""
+    try:
+        balance = await contract_manager.get_wallet_balance()
+        return respond({
+            'success': True,
+            'balance': balance
+        }, 200)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/address', methods=['GET'])
+async def get_address():
+    """Get the wallet address."""
+    try:
+        address = wallet_manager.get_address()
+        return respond({
+            'success': True,
+            'address': address
+        }, 200)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/cross-chain-transfer', methods=['POST'])
+async def cross_chain_transfer():
+    """Queue PyPay CrossChainTransfer function; follow /jobs/<job_id>/events for the result."""
+    try:
+        req = decode(await request.get_data(), CrossChainTransferRequest)
+
+        job_id = await contract_manager.submit_cross_chain_transfer(
+            **req.payload(),
+            native_fee=req.native_fee,
+            urgency=req.urgency,
+            idempotency_key=request.headers.get('Idempotency-Key')
+        )
+
+        return respond({
+            'success': True,
+            'job_id': job_id,
+            'status_url': f'/jobs/{job_id}',
+            'events_url': f'/jobs/{job_id}/events',
+            'message': 'CrossChainTransfer transaction queued'
+        }, 202)
+
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except IdempotencyConflict as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 409)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/transfer', methods=['POST'])
+async def transfer():
+    """Queue PyPay transfer function; follow /jobs/<job_id>/events for the result."""
+    try:
+        req = decode(await request.get_data(), TransferRequest)
+
+        job_id = await contract_manager.submit_transfer(
+            **req.payload(),
+            urgency=req.urgency,
+            idempotency_key=request.headers.get('Idempotency-Key')
+        )
+
+        return respond({
+            'success': True,
+            'job_id': job_id,
+            'status_url': f'/jobs/{job_id}',
+            'events_url': f'/jobs/{job_id}/events',
+            'message': 'Transfer transaction queued'
+        }, 202)
+
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except IdempotencyConflict as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 409)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/transfer/batch', methods=['POST'])
+async def transfer_batch():
+    """Pre-verify and send many PyPay transfer payloads, pipelined per chain; one result per payload."""
+    try:
+        req = decode(await request.get_data(), TransferBatchRequest)
+
+        # Payloads that cannot be decoded fail on their own; the rest are sent together
+        results = []
+        payloads = []
+        for raw in req.payloads:
+            try:
+                payloads.append(decode(raw, TransferRequest).payload())
+                results.append(None)
+            except RequestError as e:
+                results.append(error_body(e))
+
+        sent = iter(await contract_manager.transfer_batch(payloads, urgency=req.urgency))
+        results = [result if result is not None else next(sent) for result in results]
+        succeeded = sum(1 for result in results if result['success'])
+
+        return respond({
+            'success': True,
+            'sent': succeeded,
+            'failed': len(results) - succeeded,
+            'results': results
+        }, 200)
+
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/jobs/<job_id>', methods=['GET'])
+async def get_job(job_id):
+    """Get the state of a queued transfer."""
+    try:
+        job = await contract_manager.get_job(job_id)
+        if job is None:
+            return respond({
+                'success': False,
+                'error': f'Job not found: {job_id}'
+            }, 404)
+        return respond({
+            'success': True,
+            'job': job
+        }, 200)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/jobs/<job_id>/events', methods=['GET'])
+async def stream_job_events(job_id):
+    """Stream the lifecycle of a queued transfer as server-sent events until it is done."""
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    try:
+        unsubscribe = await contract_manager.subscribe_job(
+            job_id,
+            lambda event: loop.call_soon_threadsafe(events.put_nowait, event),
+            after=request.headers.get('Last-Event-ID', type=int)
+        )
+        if unsubscribe is None:
+            return respond({
+                'success': False,
+                'error': f'Job not found: {job_id}'
+            }, 404)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+    async def stream():
+        deadline = time.monotonic() + EVENTS_MAX_STREAM
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    event = await asyncio.wait_for(events.get(), EVENTS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    # Comment line so proxies do not close an idle stream
+                    yield b': keep-alive\n\n'
+                    continue
+                yield encode_event(event)
+                if event['event'] == 'done':
+                    return
+        finally:
+            unsubscribe()
+
+    response = Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # The stream outlives Quart's default response timeout
+    response.timeout = None
+    return response
+
+@api.route('/tx-status/<tx_hash>', methods=['GET'])
+async def get_transaction_status(tx_hash):
+    """Get the status of a transaction. Optional ?chain_id= and ?wait=<seconds> long-poll."""
+    try:
+        status = await contract_manager.get_transaction_receipt(
+            tx_hash,
+            chain_id=request.args.get('chain_id', type=int),
+            wait=request.args.get('wait', 0, type=float)
+        )
+        return respond({
+            'success': True,
+            'status': status
+        }, 200)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/check-cross-chain', methods=['POST'])
+async def check_cross_chain():
+    """Check if cross-chain transfer has been received."""
+    try:
+        req = decode(await request.get_data(), CheckCrossChainRequest)
+
+        result = await contract_manager.check_cross_chain_received(
+            target_address=req.target_address,
+            amount_expected=req.amount_expected,
+            destination_chain_id=req.destination_chain_id,
+            timeout=req.timeout,
+            since_block=req.since_block
+        )
+
+        return respond({
+            'success': True,
+            'result': result
+        }, 200)
+
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/estimate-fee', methods=['POST'])
+async def estimate_fee():
+    """Estimate native fee for cross-chain transfer by querying the contract."""
+    try:
+        req = decode(await request.get_data(), EstimateFeeRequest)
+
+        # Native fee from the background-refreshed quote cache
+        quote = await contract_manager.get_native_fee_quote(
+            contract_address=req.contract_address,
+            source_chain_id=req.source_chain_id,
+            destination_chain_id=req.destination_chain_id,
+            amount=req.amount,
+            target_address=req.target_address,
+            force_refresh=req.force_refresh
+        )
+        quote_fee = quote['native_fee']
+
+        # Add 20% buffer for safety
+        estimated_fee = int(quote_fee * 1.2)
+
+        return respond({
+            'success': True,
+            'estimated_fee': str(estimated_fee),
+            'estimated_fee_eth': estimated_fee / 1e18,
+            'quote_fee': str(quote_fee),
+            'quote_fee_eth': quote_fee / 1e18,
+            'quote_age': quote['age'],
+            'quote_block_number': quote['block_number'],
+            'note': 'Fee queried from contract with 20% safety buffer'
+        }, 200)
+
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/pyusd-balances', methods=['POST'])
+async def pyusd_balances():
+    """Get PYUSD balances of many addresses across chains, one batched read per chain."""
+    try:
+        req = decode(await request.get_data(), PyusdBalancesRequest)
+
+        balances = await contract_manager.get_pyusd_balances(req.addresses, req.chain_ids or None)
+
+        return respond({
+            'success': True,
+            'balances': {
+                str(chain_id): {address: str(balance) if balance is not None else None for address, balance in by_address.items()}
+                for chain_id, by_address in balances.items()
+            }
+        }, 200)
+
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/compute-address', methods=['POST'])
+async def compute_address():
+    """Compute the PyPay contract addresses of many users, without RPC calls."""
+    try:
+        req = decode(await request.get_data(), ComputeAddressRequest)
+
+        contract_addresses = await contract_manager.compute_contract_addresses(req.addresses, chain_id=req.chain_id)
+
+        return respond({
+            'success': True,
+            'addresses': dict(zip(req.addresses, contract_addresses))
+        }, 200)
+
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.route('/verify', methods=['POST'])
+async def verify_payloads():
+    """Pre-verify signed transfer payloads (signature, expiry, source chain, used nonce)."""
+    try:
+        req = decode(await request.get_data(), VerifyRequest)
+
+        # Payloads that cannot be decoded fail on their own; the rest are verified together
+        results = []
+        payloads = []
+        for raw in req.payloads:
+            try:
+                payloads.append(decode(raw, VerifyPayload).payload())
+                results.append(None)
+            except RequestError as e:
+                results.append({'valid': False, 'error': str(e), 'signer': None})
+
+        verified = iter(await contract_manager.verify_payloads(payloads))
+        results = [result if result is not None else next(verified) for result in results]
+
+        return respond({
+            'success': True,
+            'results': results
+        }, 200)
+
+    except RequestError as e:
+        return respond(error_body(e), 400)
+    except Exception as e:
+        return respond({
+            'success': False,
+            'error': str(e)
+        }, 500)
+
+@api.app_errorhandler(404)
+async def not_found(error):
+    return respond({'error': 'Not found'}, 404)
+
+@api.app_errorhandler(500)
+async def internal_error(error):
+    return respond({'error': 'Internal server error'}, 500)
+
+def create_app():
+    """
+    Create the Quart app.
+    Creates no services and opens no connections; each worker starts and
+    warms its own when it begins serving.
+
+    Returns:
+        Quart app
+    """
+    app = Quart(__name__)
+    app.register_blueprint(api)
+    return cors(app, allow_origin='*')  # Enable CORS for frontend integration
+
+app = create_app()
+
+if __name__ == '__main__':
+    port = int(os.getenv('PORT', 5002))
+    debug = os.getenv('DEBUG', 'False').lower() == 'true'
+    app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,829 @@
+#!/usr/bin/env python3
+"""
+Async Contract Manager for the ASGI backend.
+Same PyPay operations as ContractManager, on top of AsyncWeb3, with
+independent RPCs inside one call issued concurrently.
+"""
+
+import asyncio
+import logging
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from web3 import AsyncWeb3, Web3
+from web3.middleware import async_geth_poa_middleware
+from web3.exceptions import TransactionNotFound
+from eth_utils import is_address
+from config import (
+    FACTORY_ADDRESS, OPERATOR_ADDRESS, PYUSD_ADDRESSES, RPC_POOL_SIZE, RPC_POOL_SIZES, RPC_TIMEOUT,
+    TX_MAX_WAIT, TX_WAIT_POLL_INTERVAL, FEE_URGENCY_PERCENTILES
+)
+from chain_clients import ChainClientRegistry, create_async_provider, create_provider, get_rpc_urls
+from rpc_router import is_rejection
+from nonce_manager import NonceManager
+from fee_oracle import FeeOracle, gas_label
+from head_follower import HeadFollower
+from read_cache import BlockReadCache
+from read_batcher import ReadBatcher, read_key
+from quote_cache import QuoteCache
+from singleflight import AsyncSingleFlight
+from tx_tracker import TransactionTracker
+from tx_accelerator import TransactionAccelerator
+from batch_sender import BatchSender
+from arrival_indexer import ArrivalIndexer
+from lifecycle import LifecycleWatcher
+from job_queue import JobQueue
+from used_nonce_index import UsedNonceIndex
+from payload_verifier import PayloadVerifier
+from contract_manager import (
+    load_contract_registry, load_pypay_artifact, build_call_transaction, bridging_chain_ids, job_payload, job_call,
+    idempotency_keys, verification_payloads, raise_if_rejected, group_batch, send_transfer_batch,
+    sent_record, raise_if_reverted, SendOutcomeUnknown
+)
+from contract_registry import to_checksum
+from create2 import PyPayAddressDeriver
+from metrics import async_rpc_metrics_middleware, rpc_metrics_middleware, stage
+
+logger = logging.getLogger(__name__)
+
+class AsyncContractManager:
+    """Manages PyPay contract interactions without blocking the event loop."""
+
+    def __init__(self, wallet_manager):
+        """Initialize the contract manager."""
+        self.wallet_manager = wallet_manager
+        self.web3 = wallet_manager.web3
+
+        # ABIs parsed once, with precomputed selectors and codecs
+        self.contracts = load_contract_registry()
+        self.abi = self.contracts.abi('PyPay')
+
+        # PyPay addresses derived locally (CREATE2), checked once per chain against the Factory
+        self.addresses = PyPayAddressDeriver(load_pypay_artifact()['bytecode'])
+        self._derivation_checked = {}
+
+        # Per-chain AsyncWeb3 clients, created on first use
+        self._clients = {}
+        self._clients_lock = asyncio.Lock()
+        self._sessions = []
+
+        # Nonce allocation, fee and quote caching and batched reads are shared with
+        # the sync backend; they only touch the RPC on resync/refresh, which runs in a thread
+        self.sync_clients = ChainClientRegistry()
+        self.nonces = NonceManager()
+        self.heads = HeadFollower()
+        self.read_cache = BlockReadCache(self.heads, self.sync_clients)
+        self.flights = AsyncSingleFlight()
+        self.reads = ReadBatcher(self.sync_clients, self.read_cache)
+        self.quotes = QuoteCache(self.reads, self.heads, self.sync_clients)
+        self.fee_oracle = FeeOracle(self.heads)
+        self.tracker = TransactionTracker(self.sync_clients, self.heads)
+        self.tracker.add_listener(self.fee_oracle.observe_receipt)
+        self.accelerator = TransactionAccelerator(wallet_manager.signer, self.nonces, self.tracker, self.heads, self.fee_oracle)
+        self.batches = BatchSender(wallet_manager.signer, self.nonces, self.fee_oracle, self.tracker, self.accelerator)
+        self.arrivals = ArrivalIndexer(self.sync_clients, self.heads)
+        for chain_id in PYUSD_ADDRESSES:
+            self.arrivals.start(chain_id)
+        self.used_nonces = UsedNonceIndex(self.sync_clients, self.heads)
+        for chain_id in PYUSD_ADDRESSES:
+            self.used_nonces.start(chain_id)
+        self.verifier = PayloadVerifier(self.used_nonces, self._contract_addresses_blocking)
+        self._default_chain_id = None
+        self._default_sync_web3 = None
+
+        # Submission queue; created in start() once the event loop runs
+        self.jobs = None
+        self.lifecycle = None
+        self._loop = None
+
+    async def start(self):
+        """Start the submission queue dispatchers on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self.jobs = JobQueue(self._run_job)
+        self.lifecycle = LifecycleWatcher(self.jobs, self.tracker, self.arrivals, self.heads)
+
+    async def get_web3_for_chain(self, chain_id):
+        """
+        Get AsyncWeb3 instance for the specified chain.
+
+        Args:
+            chain_id: Chain ID (1 for Ethereum, 42161 for Arbitrum)
+
+        Returns:
+            Shared AsyncWeb3 instance with a pooled keep-alive session
+        """
+        web3 = self._clients.get(chain_id)
+        if web3 is not None:
+            return web3
+
+        async with self._clients_lock:
+            if chain_id not in self._clients:
+                # One endpoint, or several with scoring, hedged reads and broadcast sends
+                rpc_urls = get_rpc_urls(chain_id)
+                provider = create_async_provider(rpc_urls, chain_id)
+                pool_size = RPC_POOL_SIZES.get(chain_id, RPC_POOL_SIZE)
+                session = ClientSession(
+                    connector=TCPConnector(limit=pool_size * len(rpc_urls), limit_per_host=pool_size),
+                    timeout=ClientTimeout(total=RPC_TIMEOUT),
+                    raise_for_status=True
+                )
+                await provider.cache_async_session(session)
+                self._sessions.append(session)
+
+                web3 = AsyncWeb3(provider)
+
+                # Add PoA middleware for Arbitrum and other PoA chains
+                web3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+
+                # Outermost, so retries count towards the recorded latency
+                web3.middleware_onion.add(async_rpc_metrics_middleware(chain_id), 'metrics')
+                self._clients[chain_id] = web3
+
+        return self._clients[chain_id]
+
+    async def warm(self):
+        """
+        Open the per-chain connections ahead of the first request.
+
+        Returns:
+            dict of chain ID to whether its RPC answered
+        """
+        async def check(chain_id):
+            try:
+                web3 = await self.get_web3_for_chain(chain_id)
+                await web3.eth.block_number
+                return True
+            except Exception:
+                return False
+
+        results = await asyncio.gather(*(check(chain_id) for chain_id in PYUSD_ADDRESSES))
+        return dict(zip(PYUSD_ADDRESSES, results))
+
+    async def get_default_chain_id(self):
+        """Get the chain ID of the default AsyncWeb3 connection."""
+        if self._default_chain_id is None:
+            self._default_chain_id = await self.web3.eth.chain_id
+        return self._default_chain_id
+
+    async def get_wallet_balance(self):
+        """
+        Get the balance of the wallet in ETH.
+        On a chain in PYUSD_ADDRESSES the balance is read once per block.
+
+        Returns:
+            Balance in ETH (string)
+        """
+        chain_id = await self.get_default_chain_id()
+        if chain_id not in PYUSD_ADDRESSES:
+            return await self.flights.do(
+                None, 'eth_getBalance', (self.wallet_manager.address,), self.wallet_manager.get_balance
+            )
+
+        address = self.wallet_manager.address
+        balance_wei = await self._cached_read(
+            chain_id,
+            ('eth_getBalance', address),
+            lambda: self.web3.eth.get_balance(address)
+        )
+        return str(self.web3.from_wei(balance_wei, 'ether'))
+
+    async def _cached_read(self, chain_id, key, fetch):
+        # BlockReadCache.read for a coroutine function; concurrent misses share one call
+        block_number = self.read_cache.head(chain_id)
+        if block_number is None:
+            return await self.flights.do(chain_id, key[0], (None, key), fetch)
+        value = self.read_cache.get(chain_id, block_number, key)
+        if value is None:
+            async def fetch_and_cache():
+                result = await fetch()
+                self.read_cache.put(chain_id, block_number, key, result)
+                return result
+
+            value = await self.flights.do(chain_id, key[0], (block_number, key), fetch_and_cache)
+        return value
+
+    def _get_sync_web3(self, chain_id):
+        # Sync client used by the nonce manager and fee oracle
+        if chain_id in PYUSD_ADDRESSES:
+            return self.sync_clients.get(chain_id)
+        if self._default_sync_web3 is None:
+            self._default_sync_web3 = Web3(create_provider(self.wallet_manager.rpc_urls))
+            self._default_sync_web3.middleware_onion.add(rpc_metrics_middleware(), 'metrics')
+        return self._default_sync_web3
+
+    async def call_contract(
+        self, contract_address, function_name, args, chain_id=None, value=None, urgency='normal', on_signed=None
+    ):
+        """
+        Call a contract function.
+
+        Args:
+            contract_address: Contract address
+            function_name: Function name to call
+            args: Function arguments
+            chain_id: Optional chain ID to use (if None, uses default)
+            value: Optional native token amount (in wei) to send with the transaction
+            urgency: Fee tier ('fast', 'normal' or 'cheap')
+            on_signed: Optional blocking callback(tx_hash, transaction, label) run in a
+                thread before the broadcast
+
+        Returns:
+            Transaction hash
+        """
+        if not is_address(contract_address):
+            raise ValueError(f'Invalid contract address: {contract_address}')
+
+        # Use specified chain or default web3
+        if chain_id is not None:
+            web3 = await self.get_web3_for_chain(chain_id)
+        else:
+            web3 = self.web3
+            chain_id = await self.get_default_chain_id()
+        sync_web3 = self._get_sync_web3(chain_id)
+
+        # Function codec; calldata is encoded without a contract object
+        func = self.contracts.function('PyPay', function_name)
+
+        # Fees and nonce come from local state; run in a thread in case of a resync
+        address = self.wallet_manager.address
+        label = gas_label(function_name, args)
+        with stage('fees_nonce', chain_id=chain_id):
+            fees, nonce = await asyncio.gather(
+                asyncio.to_thread(self.fee_oracle.get_fees, sync_web3, chain_id, urgency),
+                asyncio.to_thread(self.nonces.allocate, sync_web3, chain_id, address)
+            )
+
+        # Build transaction
+        try:
+            with stage('build', chain_id=chain_id):
+                tx_dict = {
+                    'nonce': nonce,
+                    'chainId': chain_id,
+                    **fees
+                }
+
+                transaction = build_call_transaction(func, contract_address, args, value, tx_dict)
+                # Learned per payload size; a size not seen yet is estimated once, in a thread
+                transaction['gas'] = await asyncio.to_thread(
+                    self.fee_oracle.gas_limit, chain_id, label, sync_web3, {**transaction, 'from': address}
+                )
+        except Exception as e:
+            await asyncio.to_thread(self.accelerator.release, chain_id, sync_web3, [nonce])
+            raise ValueError(f'Error building transaction: {str(e)}')
+
+        # Sign transaction
+        with stage('sign', chain_id=chain_id):
+            signed_txn = self.wallet_manager.sign_transaction(transaction)
+
+        if on_signed is not None:
+            try:
+                await asyncio.to_thread(on_signed, signed_txn.hash.hex(), transaction, label)
+            except Exception:
+                await asyncio.to_thread(self.accelerator.release, chain_id, sync_web3, [nonce])
+                raise
+
+        # Send transaction; a refused one did not consume its nonce, so give it back
+        try:
+            with stage('send', chain_id=chain_id):
+                tx_hash = await web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        except Exception as e:
+            if is_rejection(e):
+                await asyncio.to_thread(self.accelerator.release, chain_id, sync_web3, [nonce])
+                raise
+            # Lost in transport: the node may have it, so its nonce is kept and it is watched
+            tx_hash = signed_txn.hash.hex()
+            self.tracker.track(tx_hash, chain_id, web3=sync_web3, label=label)
+            self.accelerator.watch(chain_id, sync_web3, transaction, tx_hash, label=label)
+            raise SendOutcomeUnknown(tx_hash, e) from e
+
+        tx_hash = tx_hash.hex()
+        self.tracker.track(tx_hash, chain_id, web3=sync_web3, label=label)
+        self.accelerator.watch(chain_id, sync_web3, transaction, tx_hash, label=label)
+
+        return tx_hash
+
+    async def dispatch(self, chain_ids, submit):
+        """
+        Run a submission on several chains concurrently.
+
+        Args:
+            chain_ids: List of chain IDs
+            submit: Coroutine function taking a chain ID and returning a transaction hash
+
+        Returns:
+            dict mapping chain ID to {'tx_hash': ...} or {'error': ...}
+        """
+        chain_ids = list(dict.fromkeys(chain_ids))
+        outcomes = await asyncio.gather(*(submit(chain_id) for chain_id in chain_ids), return_exceptions=True)
+        return {
+            chain_id: {'error': str(outcome)} if isinstance(outcome, Exception) else {'tx_hash': outcome}
+            for chain_id, outcome in zip(chain_ids, outcomes)
+        }
+
+    async def cross_chain_transfer(
+        self,
+        contract_address,
+        source_chain_ids,
+        amount_each,
+        nonces,
+        expiry,
+        destination_chain_id,
+        target_address,
+        signature,
+        native_fee,
+        urgency='normal'
+    ):
+        """
+        Call CrossChainTransfer function on every source chain in parallel.
+
+        Args: see ContractManager.cross_chain_transfer
+
+        Returns:
+            dict mapping source chain ID to {'tx_hash': ...} or {'error': ...}
+        """
+        chain_ids = bridging_chain_ids(source_chain_ids, destination_chain_id)
+
+        async def submit(chain_id):
+            fee = native_fee[chain_id] if isinstance(native_fee, dict) else native_fee
+            args = [
+                source_chain_ids,
+                amount_each,
+                nonces,
+                expiry,
+                destination_chain_id,
+                target_address,
+                signature,
+                fee
+            ]
+            return await self.call_contract(
+                contract_address=contract_address,
+                function_name='CrossChainTransfer',
+                args=args,
+                chain_id=chain_id,
+                value=fee,  # Pass native fee as value for payable function
+                urgency=urgency
+            )
+
+        return await self.dispatch(chain_ids, submit)
+
+    async def transfer(
+        self,
+        contract_address,
+        source_chain_ids,
+        amount_each,
+        nonces,
+        expiry,
+        destination_chain_id,
+        target_address,
+        signature,
+        urgency='normal'
+    ):
+        """
+        Call transfer function on the first source chain.
+
+        Args: see ContractManager.transfer
+
+        Returns:
+            dict mapping the chain ID to {'tx_hash': ...} or {'error': ...}
+        """
+        if not source_chain_ids:
+            raise ValueError('source_chain_ids cannot be empty')
+
+        args = [
+            source_chain_ids,
+            amount_each,
+            nonces,
+            expiry,
+            destination_chain_id,
+            target_address,
+            signature
+        ]
+
+        return await self.dispatch(source_chain_ids[:1], lambda chain_id: self.call_contract(
+            contract_address=contract_address,
+            function_name='transfer',
+            args=args,
+            chain_id=chain_id,
+            urgency=urgency
+        ))
+
+    async def transfer_batch(self, payloads, urgency='normal'):
+        """
+        Pre-verify many signed transfer payloads and send the valid ones at once.
+        Each chain's group is signed and broadcast in a thread with the sync client.
+
+        Args: see ContractManager.transfer_batch
+
+        Returns:
+            List of dicts with success, chain_id, tx_hash and nonce, or error, in payload order
+        """
+        if urgency not in FEE_URGENCY_PERCENTILES:
+            raise ValueError(f'Unknown urgency: {urgency}')
+
+        verified = await self.verify_payloads([
+            {**payload, 'chain_id': payload['source_chain_ids'][0] if payload['source_chain_ids'] else None}
+            for payload in payloads
+        ])
+        results, groups = group_batch(payloads, verified)
+
+        func = self.contracts.function('PyPay', 'transfer')
+        sent = await asyncio.gather(*[
+            asyncio.to_thread(
+                send_transfer_batch, self.batches, func, self._get_sync_web3(chain_id),
+                chain_id, payloads, indexes, urgency
+            )
+            for chain_id, indexes in groups.items()
+        ])
+        for chain_results in sent:
+            for index, result in chain_results.items():
+                results[index] = result
+        return results
+
+    async def submit_cross_chain_transfer(
+        self,
+        contract_address,
+        source_chain_ids,
+        amount_each,
+        nonces,
+        expiry,
+        destination_chain_id,
+        target_address,
+        signature,
+        native_fee,
+        urgency='normal',
+        idempotency_key=None
+    ):
+        """
+        Pre-verify the payload and queue CrossChainTransfer on every source chain
+        other than the destination. A retry of a queued payload (or of the same
+        idempotency_key) returns the job already queued for it.
+
+        Args: see ContractManager.cross_chain_transfer, plus idempotency_key (optional client key)
+
+        Returns:
+            Job ID (str)
+        """
+        chain_ids = bridging_chain_ids(source_chain_ids, destination_chain_id)
+        if isinstance(native_fee, dict):
+            missing = [chain_id for chain_id in chain_ids if chain_id not in native_fee]
+            if missing:
+                raise ValueError(f'native_fee missing for chains: {missing}')
+            native_fee = {str(chain_id): fee for chain_id, fee in native_fee.items()}
+
+        payload = job_payload(
+            contract_address, source_chain_ids, amount_each, nonces, expiry,
+            destination_chain_id, target_address, signature, urgency
+        )
+        keys, fingerprint = idempotency_keys('CrossChainTransfer', payload, idempotency_key)
+        job_id = await asyncio.to_thread(self.jobs.lookup, keys, fingerprint)
+        if job_id is not None:
+            return job_id
+
+        payload['native_fee'] = native_fee
+        # Deliveries for this job land after this block
+        payload['destination_block'] = self.heads.head(destination_chain_id) or self.arrivals.checkpoint(destination_chain_id)
+
+        raise_if_rejected(chain_ids, await self.verify_payloads(verification_payloads(
+            chain_ids, contract_address, source_chain_ids, amount_each, nonces, expiry,
+            destination_chain_id, target_address, signature
+        )))
+        return await asyncio.to_thread(
+            self.jobs.enqueue, 'CrossChainTransfer', chain_ids, payload, keys=keys, fingerprint=fingerprint
+        )
+
+    async def submit_transfer(
+        self,
+        contract_address,
+        source_chain_ids,
+        amount_each,
+        nonces,
+        expiry,
+        destination_chain_id,
+        target_address,
+        signature,
+        urgency='normal',
+        idempotency_key=None
+    ):
+        """
+        Pre-verify the payload and queue transfer on the first source chain.
+        A retry of a queued payload (or of the same idempotency_key) returns
+        the job already queued for it.
+
+        Args: see ContractManager.transfer, plus idempotency_key (optional client key)
+
+        Returns:
+            Job ID (str)
+        """
+        if not source_chain_ids:
+            raise ValueError('source_chain_ids cannot be empty')
+
+        payload = job_payload(
+            contract_address, source_chain_ids, amount_each, nonces, expiry,
+            destination_chain_id, target_address, signature, urgency
+        )
+        keys, fingerprint = idempotency_keys('transfer', payload, idempotency_key)
+        job_id = await asyncio.to_thread(self.jobs.lookup, keys, fingerprint)
+        if job_id is not None:
+            return job_id
+
+        raise_if_rejected(source_chain_ids[:1], await self.verify_payloads(verification_payloads(
+            source_chain_ids[:1], contract_address, source_chain_ids, amount_each, nonces, expiry,
+            destination_chain_id, target_address, signature
+        )))
+        return await asyncio.to_thread(
+            self.jobs.enqueue, 'transfer', source_chain_ids[:1], payload, keys=keys, fingerprint=fingerprint
+        )
+
+    async def verify_payloads(self, payloads):
+        """
+        Check signed payloads the way PyPay.signatureVerifier would.
+
+        Args: see ContractManager.verify_payloads
+
+        Returns:
+            List of dicts with valid, error and signer, in payload order
+        """
+        with stage('verify', payloads=len(payloads)):
+            return await asyncio.to_thread(self.verifier.verify_many, payloads)
+
+    def _contract_addresses_blocking(self, user_addresses, chain_id):
+        # Called by the verifier from a worker thread
+        return asyncio.run_coroutine_threadsafe(
+            self.compute_contract_addresses(user_addresses, chain_id), self._loop
+        ).result()
+
+    async def get_job(self, job_id):
+        """Get the state of a queued submission, or None if unknown."""
+        return await asyncio.to_thread(self.jobs.get, job_id)
+
+    async def subscribe_job(self, job_id, callback, after=None):
+        """
+        Subscribe to the lifecycle events of a queued submission.
+
+        Args: see ContractManager.subscribe_job. callback is called from
+            background threads.
+
+        Returns:
+            Callable that ends the subscription, or None if the job is unknown
+        """
+        return await asyncio.to_thread(self.lifecycle.subscribe, job_id, callback, after)
+
+    def _run_job(self, kind, chain_id, payload, sent, record):
+        # Called from the queue's dispatcher threads; the send runs on the event loop
+        return asyncio.run_coroutine_threadsafe(self._send_job(kind, chain_id, payload, sent, record), self._loop).result()
+
+    async def _send_job(self, kind, chain_id, payload, sent, record):
+        # Timed on the loop, so the call_contract stages nest under the job span
+        with stage('job', kind=kind, chain_id=chain_id):
+            try:
+                if sent is not None:
+                    # An earlier attempt signed it and may have sent it before dying
+                    tx_hash = await self.resend_transaction(chain_id, sent)
+                    if tx_hash is not None:
+                        return tx_hash
+                    # Never sent: its nonce went to another transaction
+                    await asyncio.to_thread(record, None)
+                args, value = job_call(kind, chain_id, payload)
+                try:
+                    return await self.call_contract(
+                        contract_address=payload['contract_address'],
+                        function_name=kind,
+                        args=args,
+                        chain_id=chain_id,
+                        value=value,
+                        urgency=payload['urgency'],
+                        on_signed=lambda tx_hash, transaction, label: record(sent_record(tx_hash, transaction, label))
+                    )
+                except Exception as e:
+                    if is_rejection(e):
+                        # Refused, and its nonce given back: the next attempt signs a new one
+                        await asyncio.to_thread(record, None)
+                    raise
+            except Exception as e:
+                raise_if_reverted(e)
+                raise
+
+    async def resend_transaction(self, chain_id, sent):
+        """
+        Broadcast again a job transaction whose send outcome is unknown.
+
+        Args: see ContractManager.resend_transaction
+
+        Returns:
+            Transaction hash, or None if its nonce went to another transaction (it was never sent)
+        """
+        web3 = await self.get_web3_for_chain(chain_id)
+        sync_web3 = self._get_sync_web3(chain_id)
+        transaction, label = sent['transaction'], sent['label']
+        signed_txn = self.wallet_manager.sign_transaction(transaction)
+        tx_hash = signed_txn.hash.hex()
+        try:
+            await web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        except Exception as e:
+            message = str(e).lower()
+            if 'nonce too low' in message:
+                # Mined already, or the nonce was used by another transaction
+                try:
+                    await web3.eth.get_transaction_receipt(tx_hash)
+                except TransactionNotFound:
+                    return None
+            elif 'already known' not in message and 'underpriced' not in message:
+                # Underpriced: a replacement of it with the same nonce is pending
+                raise
+
+        self.tracker.track(tx_hash, chain_id, web3=sync_web3, label=label)
+        self.accelerator.watch(chain_id, sync_web3, transaction, tx_hash, label=label)
+        return tx_hash
+
+    async def _compute_contract_address(self, user_address, chain_id):
+        """Compute PyPay contract address for a given user and chain."""
+        return (await self.compute_contract_addresses([user_address], chain_id))[0]
+
+    async def compute_contract_addresses(self, user_addresses, chain_id=None):
+        """
+        Compute the PyPay contract addresses of many users.
+
+        Args: see ContractManager.compute_contract_addresses
+
+        Returns:
+            List of checksummed contract addresses, in user order
+        """
+        if chain_id is None:
+            chain_id = next(iter(PYUSD_ADDRESSES))
+        for user_address in user_addresses:
+            if not is_address(user_address):
+                raise ValueError(f'Invalid address: {user_address}')
+
+        if await self._derivation_matches(chain_id):
+            return self.addresses.compute_many(user_addresses)
+
+        # Artifacts differ from the deployed PyPay: ask the Factory
+        return list(await asyncio.gather(*(
+            self._factory_compute_address(user_address, chain_id) for user_address in user_addresses
+        )))
+
+    async def _derivation_matches(self, chain_id):
+        matches = self._derivation_checked.get(chain_id)
+        if matches is None:
+            onchain = await self._factory_compute_address(OPERATOR_ADDRESS, chain_id)
+            matches = onchain == self.addresses.compute(OPERATOR_ADDRESS)
+            if not matches:
+                logger.warning('Local PyPay bytecode does not match the Factory on chain %s; using RPC', chain_id)
+            self._derivation_checked[chain_id] = matches
+        return matches
+
+    async def _factory_compute_address(self, user_address, chain_id):
+        web3 = await self.get_web3_for_chain(chain_id)
+        factory = self.contracts.function('Factory', 'computeAddress')
+        result = await web3.eth.call({
+            'to': to_checksum(FACTORY_ADDRESS),
+            'data': factory.encode([0, user_address, OPERATOR_ADDRESS])
+        })
+        return to_checksum(factory.decode(result))
+
+    async def get_transaction_receipt(self, tx_hash, chain_id=None, wait=0):
+        """
+        Get transaction status from the transaction tracker.
+
+        Args:
+            tx_hash: Transaction hash
+            chain_id: Optional chain ID (if None, looks on every configured chain)
+            wait: Seconds to wait for the transaction to be mined (default: 0)
+
+        Returns:
+            Transaction status with confirmations and chain ID
+        """
+        # In a thread: hashes the tracker did not send are looked up on chain
+        status = await asyncio.to_thread(self.tracker.status, tx_hash, chain_id=chain_id)
+        deadline = asyncio.get_running_loop().time() + min(wait, TX_MAX_WAIT)
+
+        # Long-poll on the event loop instead of blocking a thread
+        while status['status'] == 'pending' and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(TX_WAIT_POLL_INTERVAL)
+            status = await asyncio.to_thread(self.tracker.status, tx_hash, chain_id=chain_id)
+        return status
+
+    async def check_cross_chain_received(
+        self,
+        target_address,
+        amount_expected,
+        destination_chain_id,
+        timeout=60,
+        since_block=None
+    ):
+        """
+        Check if cross-chain transfer has been received on the destination chain.
+
+        Args: see ContractManager.check_cross_chain_received
+
+        Returns:
+            dict with status information
+        """
+        try:
+            if destination_chain_id not in PYUSD_ADDRESSES:
+                return {'received': False, 'error': f'Unsupported chain: {destination_chain_id}'}
+
+            # Index lookup only; no RPC on the request path
+            return self.arrivals.check(destination_chain_id, target_address, amount_expected, since_block)
+        except Exception as e:
+            return {
+                'received': False,
+                'error': str(e)
+            }
+
+    async def get_quote_native_fee(
+        self,
+        contract_address,
+        source_chain_id,
+        destination_chain_id,
+        amount,
+        target_address
+    ):
+        """
+        Query the native fee required for cross-chain transfer.
+
+        Args: see ContractManager.get_quote_native_fee
+
+        Returns:
+            Native fee in wei (as int)
+        """
+        try:
+            web3_source = await self.get_web3_for_chain(source_chain_id)
+            quote = self.contracts.function('QuoteFee', 'getQuoteNativeFee')
+            calldata = quote.encode([
+                source_chain_id,
+                destination_chain_id,
+                int(amount),
+                to_checksum(target_address)
+            ])
+
+            # Same route within one block: answered from the read cache
+            result = await self._cached_read(
+                source_chain_id,
+                read_key(contract_address, calldata),
+                lambda: web3_source.eth.call({'to': to_checksum(contract_address), 'data': calldata})
+            )
+            return quote.decode(result)
+        except Exception as e:
+            raise ValueError(f'Error querying native fee: {str(e)}')
+
+    async def get_native_fee_quote(
+        self,
+        contract_address,
+        source_chain_id,
+        destination_chain_id,
+        amount,
+        target_address,
+        force_refresh=False
+    ):
+        """
+        Get the native fee for a cross-chain transfer from the quote cache.
+
+        Args: see ContractManager.get_native_fee_quote
+
+        Returns:
+            dict with native_fee (int), block_number and age (seconds)
+        """
+        try:
+            # In a thread: a miss or forced refresh queries the contract
+            return await asyncio.to_thread(
+                self.quotes.get,
+                contract_address,
+                source_chain_id,
+                destination_chain_id,
+                amount,
+                target_address,
+                force_refresh=force_refresh
+            )
+        except Exception as e:
+            raise ValueError(f'Error querying native fee: {str(e)}')
+
+    async def get_pyusd_balances(self, addresses, chain_ids=None):
+        """
+        Get PYUSD balances of many addresses, one batched read per chain.
+
+        Args: see ContractManager.get_pyusd_balances
+
+        Returns:
+            dict mapping chain ID to {address: balance in base units}
+        """
+        chain_ids = list(chain_ids or PYUSD_ADDRESSES)
+        for chain_id in chain_ids:
+            if chain_id not in PYUSD_ADDRESSES:
+                raise ValueError(f'Unsupported chain: {chain_id}')
+
+        # Chains are independent; query them concurrently
+        results = await asyncio.gather(*(
+            asyncio.to_thread(self.reads.token_balances, chain_id, PYUSD_ADDRESSES[chain_id], addresses)
+            for chain_id in chain_ids
+        ))
+        return {
+            chain_id: dict(zip(addresses, balances))
+            for chain_id, balances in zip(chain_ids, results)
+        }
+
+    async def close(self):
+        """Close every pooled session."""
+        for session in self._sessions:
+            await session.close()
+        self._sessions.clear()
+        self._clients.clear()
+        self.sync_clients.close()
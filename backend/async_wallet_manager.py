@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Async Wallet Manager for the ASGI backend.
+Same wallet operations as WalletManager, on top of AsyncWeb3.
+"""
+
+import os
+from web3 import AsyncWeb3
+from web3.middleware import async_geth_poa_middleware
+from eth_account import Account
+from tx_signer import TransactionSigner
+from config import RPC_TIMEOUT
+from chain_clients import create_async_provider
+from metrics import async_rpc_metrics_middleware
+from wallet_manager import get_default_rpc_urls
+
+class AsyncWalletManager:
+    """Manages wallet operations for blockchain interactions without blocking the event loop."""
+
+    def __init__(self):
+        """Initialize the wallet manager with private key from environment."""
+        # Load private key from environment
+        self.private_key = os.getenv('PRIVATE_KEY')
+
+        if not self.private_key:
+            raise ValueError('PRIVATE_KEY not found in environment variables')
+
+        # Get the RPC URLs from environment or network default
+        self.rpc_urls = get_default_rpc_urls()
+        self.rpc_url = ', '.join(self.rpc_urls)
+
+        # Initialize AsyncWeb3 connection (opened lazily on the serving loop; failover across several endpoints)
+        self.web3 = AsyncWeb3(create_async_provider(
+            self.rpc_urls,
+            request_kwargs={'timeout': RPC_TIMEOUT}
+        ))
+
+        # Add PoA middleware for Arbitrum and other PoA chains
+        self.web3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+
+        # RPC latency and error metrics
+        self.web3.middleware_onion.add(async_rpc_metrics_middleware(), 'metrics')
+
+        # Create account from private key
+        self.account = Account.from_key(self.private_key)
+        self.address = self.account.address
+
+        # Signing service for the operator key (native secp256k1, optional process pool)
+        self.signer = TransactionSigner(self.private_key)
+
+    async def connect(self):
+        """Check the RPC connection."""
+        if not await self.web3.is_connected():
+            raise ConnectionError(f'Cannot connect to RPC: {self.rpc_url}')
+
+        print(f'Wallet initialized: {self.address}')
+        print(f'Connected to RPC: {self.rpc_url}')
+
+    def get_address(self):
+        """Get the wallet address."""
+        return self.address
+
+    async def get_balance(self):
+        """Get the balance of the wallet in ETH."""
+        balance_wei = await self.web3.eth.get_balance(self.address)
+        balance_eth = self.web3.from_wei(balance_wei, 'ether')
+        return str(balance_eth)
+
+    def sign_transaction(self, transaction):
+        """
+        Sign a transaction with the wallet's key (CPU only, no I/O).
+
+        Args:
+            transaction: Transaction dict
+
+        Returns:
+            SignedTransaction
+        """
+        return self.signer.sign(transaction)
+
+    def sign_transactions(self, transactions):
+        """
+        Sign many transactions with the wallet's key in one call.
+
+        Args:
+            transactions: List of transaction dicts
+
+        Returns:
+            List of SignedTransaction, in order
+        """
+        return self.signer.sign_many(transactions)
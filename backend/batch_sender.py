@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Batch Sender for bulk operator transactions on one chain.
+Instead of a fee lookup, nonce allocation and send round trip per call, a
+batch takes one fee quote and a block of consecutive nonces, signs every
+transaction locally and broadcasts them back to back as JSON-RPC batches of
+eth_sendRawTransaction, so throughput is bounded by the node.
+"""
+
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+from chain_clients import batch_request
+from rpc_router import send_result
+from config import SEND_BATCH_SIZE
+from metrics import stage
+
+
+def _error_message(response):
+    error = response.get('error')
+    return str(error.get('message', error)) if isinstance(error, dict) else str(error)
+
+
+class BatchSender:
+    """Signs and pipelines many contract calls from the operator account on a chain."""
+
+    def __init__(self, signer, nonces, fee_oracle, tracker, accelerator):
+        """
+        Initialize the sender.
+
+        Args:
+            signer: TransactionSigner of the operator key
+            nonces: NonceManager handing out the operator's nonces
+            fee_oracle: FeeOracle for fees and learned gas limits
+            tracker: TransactionTracker the sent transactions are tracked by
+            accelerator: TransactionAccelerator that re-sends them if they get stuck
+        """
+        self.signer = signer
+        self.nonces = nonces
+        self.fee_oracle = fee_oracle
+        self.tracker = tracker
+        self.accelerator = accelerator
+
+    def send(self, chain_id, web3, transactions, labels, urgency='normal'):
+        """
+        Send many transactions with consecutive nonces.
+
+        Args:
+            chain_id: Chain ID
+            web3: Web3 instance for the chain (sync)
+            transactions: List of call dicts (to, data, value), e.g. from build_call_transaction
+            labels: Gas label of each transaction (see fee_oracle.gas_label), for the
+                learned gas limit and the tracker
+            urgency: Fee tier ('fast', 'normal' or 'cheap')
+
+        Returns:
+            List of dicts with tx_hash and nonce, or error, in transaction order.
+            status 'unknown' marks a transaction whose broadcast failed in transport;
+            it may or may not have been received and is re-sent if it does not show up.
+        """
+        if not transactions:
+            return []
+
+        with stage('fees', chain_id=chain_id):
+            fees = self.fee_oracle.get_fees(web3, chain_id, urgency)
+
+        # Per transaction: gas grows with the payload's array lengths. A call whose
+        # estimate reverts is not sent (it would be a paid revert) and takes no nonce.
+        address = self.signer.address
+        results = [None] * len(transactions)
+        sending = []
+        for index, (call, label) in enumerate(zip(transactions, labels)):
+            try:
+                gas = self.fee_oracle.gas_limit(chain_id, label, web3, {**call, 'from': address})
+            except ContractLogicError as e:
+                results[index] = {'error': f'Call reverts: {e}'}
+                continue
+            sending.append((index, {**call, **fees, 'chainId': chain_id, 'gas': gas}, label))
+        if not sending:
+            return results
+
+        with stage('nonce', chain_id=chain_id):
+            first_nonce = self.nonces.allocate(web3, chain_id, address, count=len(sending))
+
+        unsigned = [{**transaction, 'nonce': first_nonce + offset} for offset, (_, transaction, _) in enumerate(sending)]
+        with stage('sign', chain_id=chain_id, transactions=len(unsigned)):
+            raws = [result.rawTransaction for result in self.signer.sign_many(unsigned)]
+
+        with stage('send', chain_id=chain_id, transactions=len(raws)):
+            responses = self._broadcast(web3, raws)
+
+        refused = []
+        for (index, _, label), transaction, raw, response in zip(sending, unsigned, raws, responses):
+            nonce = transaction['nonce']
+            if response is None:
+                # Its batch failed in transport, so the node may have it: tracked and watched
+                # like a sent one, and the accelerator re-sends it if it never shows up
+                tx_hash = Web3.keccak(raw).hex()
+                results[index] = {'tx_hash': tx_hash, 'nonce': nonce, 'status': 'unknown'}
+            elif 'error' in response:
+                results[index] = {'error': _error_message(response)}
+                refused.append(nonce)
+                continue
+            else:
+                tx_hash = response['result']
+                results[index] = {'tx_hash': tx_hash, 'nonce': nonce}
+            self.tracker.track(tx_hash, chain_id, web3=web3, label=label)
+            self.accelerator.watch(chain_id, web3, transaction, tx_hash, label=label)
+
+        if refused:
+            # Refused nonces are reused if nothing was allocated after them, otherwise
+            # filled: accepted transactions above them cannot be mined until they are used
+            self.accelerator.release(chain_id, web3, refused)
+        return results
+
+    def _broadcast(self, web3, raws):
+        # Back to back, lowest nonces first. A batch that fails in transport may or may not
+        # have been received: its transactions get None. Nothing after it is sent.
+        responses = []
+        for start in range(0, len(raws), SEND_BATCH_SIZE):
+            chunk = [Web3.to_hex(raw) for raw in raws[start:start + SEND_BATCH_SIZE]]
+            try:
+                answers = batch_request(web3, [('eth_sendRawTransaction', [raw]) for raw in chunk])
+            except Exception as e:
+                responses.extend([None] * len(chunk))
+                not_sent = {'error': {'message': f'Not sent: an earlier batch failed ({e})'}}
+                return responses + [not_sent] * (len(raws) - len(responses))
+            responses.extend(send_result(answer, [raw]) for answer, raw in zip(answers, chunk))
+        return responses
@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the backend against local stand-in chains.
+Starts two local EVM nodes (chain IDs 1 and 42161), installs the Factory and
+mock PYUSD, OFT and Multicall3 contracts at the configured addresses, deploys
+a PyPay contract for a test signer and serves app.py on a local port. It then
+drives /estimate-fee, /transfer, /cross-chain-transfer, /tx-status and
+/check-cross-chain at a given concurrency. Everything runs offline.
+
+Compile the contracts once (`npx hardhat compile` in the repository root),
+then from backend/:
+    python benchmark.py --requests 200 --concurrency 16
+    python benchmark.py --compare bench-results/<earlier run>.json
+    python benchmark.py --signing 20000   # signatures per second per core only
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+import requests
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from web3 import Web3
+
+ROOT = Path(__file__).resolve().parent.parent
+ARTIFACTS_DIR = ROOT / 'artifacts' / 'contracts'
+RESULTS_DIR = Path(__file__).resolve().parent / 'bench-results'
+
+# Development accounts funded by anvil and Hardhat nodes (never use on a real chain)
+OPERATOR_KEY = '0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80'
+SIGNER_KEY = '0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d'
+TARGET_ADDRESS = '0x90F79bf6EB2c4f870365E785982E1f101E93b906'
+
+SOURCE_CHAIN_ID = 1
+DESTINATION_CHAIN_ID = 42161
+AMOUNT = 1_000_000  # 1 PYUSD per source chain
+
+DEFAULT_NODE_CMD = 'anvil --port {port} --chain-id {chain_id} --silent'
+SCENARIOS = ['estimate-fee', 'transfer', 'transfer-batch', 'cross-chain-transfer', 'tx-status', 'check-cross-chain']
+
+
+def load_artifact(source, name):
+    """Load a Hardhat artifact (abi, bytecode, deployedBytecode)."""
+    path = ARTIFACTS_DIR / source / f'{name}.json'
+    if not path.exists():
+        raise SystemExit(f'Missing {path}; run `npx hardhat compile` in {ROOT} first')
+    with open(path) as f:
+        return json.load(f)
+
+
+def percentile(values, q):
+    """q-th percentile (0-1) of a list of numbers, nearest-rank."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def git_commit():
+    """Current commit hash, with '-dirty' for uncommitted changes."""
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, text=True).strip()
+        dirty = subprocess.run(['git', 'diff', '--quiet', 'HEAD'], cwd=ROOT).returncode != 0
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class LocalChain:
+    """One local EVM node process with a given chain ID."""
+
+    def __init__(self, chain_id, port, node_cmd, startup_timeout=30):
+        """
+        Start the node and wait until it answers with the expected chain ID.
+
+        Args:
+            chain_id: Chain ID the node must report
+            port: Port to listen on
+            node_cmd: Command template with {port} and {chain_id} placeholders
+            startup_timeout: Seconds to wait for the node
+        """
+        self.chain_id = chain_id
+        self.url = f'http://127.0.0.1:{port}'
+        command = shlex.split(node_cmd.format(port=port, chain_id=chain_id))
+        try:
+            self.process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except FileNotFoundError:
+            raise SystemExit(f'Cannot start local node `{command[0]}`; install it or pass --node-cmd')
+        self.web3 = Web3(Web3.HTTPProvider(self.url))
+
+        deadline = time.monotonic() + startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise SystemExit(f'Local node exited: {" ".join(command)}')
+            try:
+                if self.web3.eth.chain_id == chain_id:
+                    return
+                raise SystemExit(f'Node at {self.url} reports chain ID {self.web3.eth.chain_id}, not {chain_id}')
+            except requests.exceptions.ConnectionError:
+                time.sleep(0.2)
+        self.stop()
+        raise SystemExit(f'Local node did not start within {startup_timeout}s: {" ".join(command)}')
+
+    def set_code(self, address, artifact):
+        """Install a contract's runtime code at an address (hardhat_setCode, also served by anvil)."""
+        response = self.web3.provider.make_request('hardhat_setCode', [address, artifact['deployedBytecode']])
+        if 'error' in response:
+            raise RuntimeError(f'hardhat_setCode failed on chain {self.chain_id}: {response["error"]}')
+
+    def transact(self, account, to, data, value=0):
+        """Send a transaction from a local account and wait for a successful receipt."""
+        tx = {
+            'from': account.address,
+            'to': Web3.to_checksum_address(to),
+            'data': data,
+            'value': value,
+            'nonce': self.web3.eth.get_transaction_count(account.address, 'pending'),
+            'chainId': self.chain_id
+        }
+        tx['gas'] = self.web3.eth.estimate_gas(tx)
+        tx['maxPriorityFeePerGas'] = Web3.to_wei(1, 'gwei')
+        tx['maxFeePerGas'] = self.web3.eth.get_block('latest')['baseFeePerGas'] * 2 + tx['maxPriorityFeePerGas']
+        signed = account.sign_transaction(tx)
+        receipt = self.web3.eth.wait_for_transaction_receipt(self.web3.eth.send_raw_transaction(signed.rawTransaction))
+        if receipt['status'] != 1:
+            raise RuntimeError(f'Setup transaction reverted on chain {self.chain_id}')
+        return receipt
+
+    def stop(self):
+        """Stop the node process."""
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def install_contracts(chain, operator, signer):
+    """
+    Install Factory and the mocks at the configured addresses and deploy the signer's PyPay.
+
+    Args:
+        chain: LocalChain
+        operator: Operator account (sends the deploy transaction)
+        signer: Signer account the PyPay contract is deployed for
+
+    Returns:
+        Checksummed PyPay contract address
+    """
+    from config import FACTORY_ADDRESS, MULTICALL3_ADDRESSES, OFT_ADDRESSES, PYUSD_ADDRESSES
+
+    factory_artifact = load_artifact('pypay.sol', 'Factory')
+    chain.set_code(FACTORY_ADDRESS, factory_artifact)
+    chain.set_code(PYUSD_ADDRESSES[chain.chain_id], load_artifact('mocks/MockPYUSD.sol', 'MockPYUSD'))
+    chain.set_code(OFT_ADDRESSES[chain.chain_id], load_artifact('mocks/MockOFT.sol', 'MockOFT'))
+    if chain.chain_id in MULTICALL3_ADDRESSES:
+        chain.set_code(MULTICALL3_ADDRESSES[chain.chain_id], load_artifact('mocks/Multicall3.sol', 'Multicall3'))
+
+    factory = chain.web3.eth.contract(address=Web3.to_checksum_address(FACTORY_ADDRESS), abi=factory_artifact['abi'])
+    chain.transact(operator, FACTORY_ADDRESS, factory.encodeABI('deploy', [0, signer.address, operator.address]))
+    return factory.functions.computeAddress(0, signer.address, operator.address).call()
+
+
+def mint(chain, operator, recipient, amount):
+    """Simulate an OFT delivery by minting mock PYUSD to a recipient."""
+    from config import PYUSD_ADDRESSES
+
+    token = chain.web3.eth.contract(
+        address=Web3.to_checksum_address(PYUSD_ADDRESSES[chain.chain_id]),
+        abi=load_artifact('mocks/MockPYUSD.sol', 'MockPYUSD')['abi']
+    )
+    chain.transact(operator, token.address, token.encodeABI('mint', [recipient, amount]))
+
+
+class PayloadSigner:
+    """Signs transfer payloads for the benchmark signer, with unique nonces."""
+
+    def __init__(self, contract_address, signer):
+        self.contract_address = contract_address
+        self.signer = signer
+        self._nonces = itertools.count(int(time.time()))
+        self._lock = threading.Lock()
+
+    def body(self, source_chain_ids, destination_chain_id):
+        """Signed request body for /transfer or /cross-chain-transfer."""
+        from payload_verifier import payload_hash
+
+        with self._lock:
+            nonces = [next(self._nonces) for _ in source_chain_ids]
+        amount_each = [AMOUNT] * len(source_chain_ids)
+        expiry = int(time.time()) + 3600
+        message_hash = payload_hash(
+            source_chain_ids, amount_each, nonces, expiry, destination_chain_id, TARGET_ADDRESS
+        )
+        signature = Account.sign_message(encode_defunct(primitive=message_hash), self.signer.key).signature
+        return {
+            'contract_address': self.contract_address,
+            'source_chain_ids': source_chain_ids,
+            'amount_each': [str(amount) for amount in amount_each],
+            'nonces': [str(nonce) for nonce in nonces],
+            'expiry': str(expiry),
+            'destination_chain_id': destination_chain_id,
+            'target_address': TARGET_ADDRESS,
+            'signature': signature.hex()
+        }
+
+
+def rpc_call_counts():
+    """Total JSON-RPC calls recorded so far, by method."""
+    from metrics import RPC_REQUEST_SECONDS
+
+    counts = {}
+    for metric in RPC_REQUEST_SECONDS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith('_count'):
+                method = sample.labels['method']
+                counts[method] = counts.get(method, 0) + sample.value
+    return counts
+
+
+class Driver:
+    """Issues API requests from a thread pool and summarizes them."""
+
+    def __init__(self, base_url, concurrency):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self._local = threading.local()
+
+    def _session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def run(self, name, make_request, count):
+        """
+        Run one scenario.
+
+        Args:
+            name: Scenario name
+            make_request: Callable(i) returning (method, path, json body or None)
+            count: Number of requests
+
+        Returns:
+            (summary dict, list of response bodies in request order)
+        """
+        def one(i):
+            method, path, body = make_request(i)
+            start = time.perf_counter()
+            response = self._session().request(method, self.base_url + path, json=body, timeout=120)
+            elapsed = time.perf_counter() - start
+            return elapsed, response.status_code, response.json()
+
+        rpc_before = rpc_call_counts()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(one, range(count)))
+        wall = time.perf_counter() - start
+        rpc_after = rpc_call_counts()
+
+        latencies = [elapsed for elapsed, _, _ in results]
+        errors = sum(1 for _, status, body in results if status >= 400 or not body.get('success'))
+        rpc_by_method = {
+            method: int(rpc_after[method] - rpc_before.get(method, 0))
+            for method in rpc_after if rpc_after[method] > rpc_before.get(method, 0)
+        }
+        summary = {
+            'requests': count,
+            'errors': errors,
+            'seconds': round(wall, 3),
+            'throughput_rps': round(count / wall, 1),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'rpc_calls_per_request': round(sum(rpc_by_method.values()) / count, 2),
+            'rpc_calls_by_method': dict(sorted(rpc_by_method.items(), key=lambda item: -item[1]))
+        }
+        print(
+            f'{name:<22} {summary["throughput_rps"]:>8} req/s  p50 {summary["p50_ms"]:>8} ms  '
+            f'p99 {summary["p99_ms"]:>8} ms  {summary["rpc_calls_per_request"]:>6} rpc/req  {errors} errors'
+        )
+        return summary, [body for _, _, body in results]
+
+
+def wait_for_jobs(contract_manager, job_ids, timeout):
+    """
+    Wait until queued jobs have finished.
+
+    Returns:
+        (seconds waited, list of finished jobs)
+    """
+    start = time.perf_counter()
+    pending = set(job_ids)
+    finished = {}
+    while pending and time.perf_counter() - start < timeout:
+        for job_id in list(pending):
+            job = contract_manager.get_job(job_id)
+            if job['state'] in ('succeeded', 'failed'):
+                finished[job_id] = job
+                pending.discard(job_id)
+        if pending:
+            time.sleep(0.05)
+    return time.perf_counter() - start, [finished[job_id] for job_id in job_ids if job_id in finished]
+
+
+def drain_summary(summary, waited, jobs, count):
+    """Add job completion figures to a submission scenario's summary."""
+    summary['jobs_succeeded'] = sum(1 for job in jobs if job['state'] == 'succeeded')
+    summary['jobs_failed'] = sum(1 for job in jobs if job['state'] == 'failed')
+    summary['jobs_unfinished'] = count - len(jobs)
+    # Submission plus queue drain: end-to-end on-chain throughput
+    total = summary['seconds'] + waited
+    summary['jobs_per_second'] = round(summary['jobs_succeeded'] / total, 1) if total else None
+    print(
+        f'{"":<22} {summary["jobs_per_second"]:>8} jobs/s ({summary["jobs_succeeded"]} succeeded, '
+        f'{summary["jobs_failed"]} failed, {summary["jobs_unfinished"]} unfinished)'
+    )
+
+
+def run_benchmark(args, chains, operator, signer, pypay_address):
+    """Serve the backend against the local chains and run the selected scenarios."""
+    from werkzeug.serving import make_server
+    import app as backend
+
+    server = make_server('127.0.0.1', args.api_port, backend.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    driver = Driver(f'http://127.0.0.1:{args.api_port}', args.concurrency)
+    payloads = PayloadSigner(pypay_address, signer)
+    scenarios = {}
+    tx_hashes = []
+
+    try:
+        if 'estimate-fee' in args.scenarios:
+            body = {
+                'contract_address': pypay_address,
+                'source_chain_id': SOURCE_CHAIN_ID,
+                'destination_chain_id': DESTINATION_CHAIN_ID,
+                'amount': str(AMOUNT),
+                'target_address': TARGET_ADDRESS
+            }
+            scenarios['estimate-fee'], _ = driver.run(
+                'estimate-fee', lambda i: ('POST', '/estimate-fee', body), args.requests
+            )
+
+        if 'transfer' in args.scenarios:
+            summary, bodies = driver.run(
+                'transfer',
+                lambda i: ('POST', '/transfer', payloads.body([SOURCE_CHAIN_ID], SOURCE_CHAIN_ID)),
+                args.requests
+            )
+            waited, jobs = wait_for_jobs(
+                backend.contract_manager, [body['job_id'] for body in bodies if body.get('success')], args.job_timeout
+            )
+            drain_summary(summary, waited, jobs, args.requests)
+            tx_hashes += [job['tx_hash'] for job in jobs if job.get('tx_hash')]
+            scenarios['transfer'] = summary
+
+        if 'transfer-batch' in args.scenarios:
+            # The same number of transfers as the transfer scenario, batch_size per request
+            summary, bodies = driver.run(
+                'transfer-batch',
+                lambda i: ('POST', '/transfer/batch', {'payloads': [
+                    payloads.body([SOURCE_CHAIN_ID], SOURCE_CHAIN_ID)
+                    for _ in range(min(args.batch_size, args.requests - i * args.batch_size))
+                ]}),
+                -(-args.requests // args.batch_size)
+            )
+            sent = [result for body in bodies for result in body.get('results', []) if result.get('success')]
+            summary['transfers_sent'] = len(sent)
+            summary['transfers_per_second'] = round(len(sent) / summary['seconds'], 1) if summary['seconds'] else None
+            print(f'{"":<22} {summary["transfers_per_second"]:>8} transfers/s ({len(sent)} sent)')
+            tx_hashes += [result['tx_hash'] for result in sent]
+            scenarios['transfer-batch'] = summary
+
+        if 'cross-chain-transfer' in args.scenarios:
+            fee = backend.contract_manager.get_native_fee_quote(
+                pypay_address, SOURCE_CHAIN_ID, DESTINATION_CHAIN_ID, AMOUNT, TARGET_ADDRESS
+            )['native_fee']
+            summary, bodies = driver.run(
+                'cross-chain-transfer',
+                lambda i: ('POST', '/cross-chain-transfer', {
+                    **payloads.body([SOURCE_CHAIN_ID, DESTINATION_CHAIN_ID], DESTINATION_CHAIN_ID),
+                    'native_fee': str(fee)
+                }),
+                args.requests
+            )
+            waited, jobs = wait_for_jobs(
+                backend.contract_manager, [body['job_id'] for body in bodies if body.get('success')], args.job_timeout
+            )
+            drain_summary(summary, waited, jobs, args.requests)
+            scenarios['cross-chain-transfer'] = summary
+
+        if 'tx-status' in args.scenarios:
+            if not tx_hashes:
+                # No transfer scenario ran: look up a setup transaction instead
+                tx_hashes = [chains[SOURCE_CHAIN_ID].transact(operator, TARGET_ADDRESS, '0x')['transactionHash'].hex()]
+            scenarios['tx-status'], _ = driver.run(
+                'tx-status',
+                lambda i: ('GET', f'/tx-status/{tx_hashes[i % len(tx_hashes)]}?chain_id={SOURCE_CHAIN_ID}', None),
+                args.requests
+            )
+
+        if 'check-cross-chain' in args.scenarios:
+            destination = chains[DESTINATION_CHAIN_ID]
+            since_block = destination.web3.eth.block_number + 1
+            mint(destination, operator, TARGET_ADDRESS, AMOUNT)
+            body = {
+                'target_address': TARGET_ADDRESS,
+                'amount_expected': str(AMOUNT),
+                'destination_chain_id': DESTINATION_CHAIN_ID,
+                'timeout': 0,
+                'since_block': since_block
+            }
+            # Let the arrival indexer catch up with the simulated delivery first
+            deadline = time.monotonic() + args.job_timeout
+            while not backend.contract_manager.check_cross_chain_received(
+                TARGET_ADDRESS, AMOUNT, DESTINATION_CHAIN_ID, timeout=0, since_block=since_block
+            ).get('received'):
+                if time.monotonic() > deadline:
+                    raise SystemExit('Arrival indexer did not pick up the simulated delivery')
+                time.sleep(0.2)
+            scenarios['check-cross-chain'], _ = driver.run(
+                'check-cross-chain', lambda i: ('POST', '/check-cross-chain', body), args.requests
+            )
+    finally:
+        server.shutdown()
+
+    return scenarios
+
+
+def benchmark_signing(count, workers):
+    """
+    Signatures per second, and per core, of the ways the backend can sign.
+    Runs offline: eth_account as the baseline, the native signer in one thread
+    and the signer's process pool.
+    """
+    from tx_signer import TransactionSigner
+
+    operator = Account.from_key(OPERATOR_KEY)
+    transactions = [
+        {
+            'chainId': SOURCE_CHAIN_ID,
+            'nonce': nonce,
+            'maxFeePerGas': Web3.to_wei(30, 'gwei'),
+            'maxPriorityFeePerGas': Web3.to_wei(1, 'gwei'),
+            'gas': 120000,
+            'to': TARGET_ADDRESS,
+            'value': 0,
+            'data': '0x' + os.urandom(260).hex()  # about a transfer's calldata
+        }
+        for nonce in range(count)
+    ]
+
+    native = TransactionSigner(OPERATOR_KEY, workers=0)
+    pool = TransactionSigner(OPERATOR_KEY, workers=workers)
+    pool.sign_many(transactions)  # start the workers
+    runs = [
+        ('eth_account', 1, lambda: [operator.sign_transaction(tx) for tx in transactions]),
+        ('native' if native.native else 'native (unavailable)', 1, lambda: native.sign_many(transactions)),
+        (f'pool x{workers}', workers, lambda: pool.sign_many(transactions))
+    ]
+    print(f'{"signer":<22} {"sig/s":>10} {"sig/s/core":>11}')
+    results = {}
+    for name, cores, run in runs:
+        start = time.perf_counter()
+        run()
+        rate = count / (time.perf_counter() - start)
+        results[name] = {'signatures_per_second': round(rate), 'per_core': round(rate / cores)}
+        print(f'{name:<22} {rate:>10.0f} {rate / cores:>11.0f}')
+    pool.close()
+    return results
+
+
+def compare(previous_path, results):
+    """Print the change of each scenario's figures against an earlier results file."""
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f'\nCompared with {previous_path} (commit {previous.get("commit")}):')
+    for name, summary in results['scenarios'].items():
+        before = previous.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        changes = []
+        for key in ('throughput_rps', 'p50_ms', 'p99_ms', 'rpc_calls_per_request'):
+            if before.get(key):
+                changes.append(f'{key} {(summary[key] - before[key]) / before[key] * 100:+.1f}%')
+        print(f'{name:<22} ' + '  '.join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end backend benchmark against local chains')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario (default: 200)')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients (default: 16)')
+    parser.add_argument('--batch-size', type=int, default=100, help='payloads per /transfer/batch request (default: 100)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated subset of: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--node-cmd', default=DEFAULT_NODE_CMD, help='local node command with {port} and {chain_id}')
+    parser.add_argument('--base-port', type=int, default=18545, help='first local node port (default: 18545)')
+    parser.add_argument('--api-port', type=int, default=15002, help='backend port (default: 15002)')
+    parser.add_argument('--job-timeout', type=float, default=120, help='seconds to wait for queued jobs (default: 120)')
+    parser.add_argument('--output', help='results file (default: bench-results/<time>-<commit>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare with')
+    parser.add_argument('--signing', type=int, metavar='COUNT', help='only benchmark signing COUNT transactions (offline)')
+    parser.add_argument('--signing-workers', type=int, default=os.cpu_count(), help='signing pool processes (default: CPU count)')
+    args = parser.parse_args()
+    if args.signing:
+        benchmark_signing(args.signing, args.signing_workers)
+        return 0
+    args.scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f'unknown scenarios: {", ".join(sorted(unknown))}')
+
+    operator = Account.from_key(OPERATOR_KEY)
+    signer = Account.from_key(SIGNER_KEY)
+    state_dir = tempfile.mkdtemp(prefix='pypay-bench-')
+    chains = {}
+    try:
+        for offset, chain_id in enumerate((SOURCE_CHAIN_ID, DESTINATION_CHAIN_ID)):
+            chains[chain_id] = LocalChain(chain_id, args.base_port + offset, args.node_cmd)
+
+        # Point the backend at the local chains before any backend module is imported
+        os.environ.update({
+            'PRIVATE_KEY': OPERATOR_KEY,
+            'OPERATOR_ADDRESS': operator.address,
+            'NETWORK': 'localhost',
+            'RPC_URL': chains[SOURCE_CHAIN_ID].url,
+            'RPC_URLS': chains[SOURCE_CHAIN_ID].url,
+            'STATE_DIR': state_dir,
+            **{f'RPC_URLS_{chain_id}': chain.url for chain_id, chain in chains.items()}
+        })
+
+        pypay_address = None
+        for chain in chains.values():
+            pypay_address = install_contracts(chain, operator, signer)
+        print(f'PyPay {pypay_address} deployed on chains {", ".join(str(chain_id) for chain_id in chains)}')
+
+        scenarios = run_benchmark(args, chains, operator, signer, pypay_address)
+    finally:
+        for chain in chains.values():
+            chain.stop()
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'node_cmd': args.node_cmd,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'scenarios': scenarios
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f'{datetime.now():%Y%m%d-%H%M%S}-{commit[:12]}.json'
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nResults written to {output}')
+
+    if args.compare:
+        compare(args.compare, results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
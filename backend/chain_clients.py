@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Chain Client Registry for long-lived per-chain Web3 connections.
+Keeps one pooled keep-alive HTTP session per chain and checks RPC health
+in the background instead of on every request.
+"""
+
+import os
+import json
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import AsyncWeb3, Web3
+from web3._utils.request import async_make_post_request
+from web3.middleware import geth_poa_middleware
+from metrics import chain_label, observe_payload, observe_rpc, rpc_metrics_middleware
+from rpc_router import AsyncFailoverProvider, FailoverProvider, endpoint_set
+from config import (
+    RPC_POOL_SIZE, RPC_POOL_SIZES, RPC_TIMEOUT, RPC_HEALTH_CHECK_INTERVAL, RPC_PUBLIC_FALLBACKS, RPC_FALLBACK_URLS
+)
+
+
+def get_rpc_url(chain_id):
+    """
+    Get the RPC URL for the specified chain.
+
+    Args:
+        chain_id: Chain ID (1 for Ethereum, 42161 for Arbitrum)
+
+    Returns:
+        RPC URL string
+    """
+    if chain_id == 1:  # Ethereum
+        alchemy_key = os.getenv('ALCHEMY_API_KEY_ETHEREUM')
+        if alchemy_key:
+            return f'https://eth-mainnet.g.alchemy.com/v2/{alchemy_key}'
+        return 'https://eth.llamarpc.com'
+    elif chain_id == 42161:  # Arbitrum
+        alchemy_key = os.getenv('ALCHEMY_API_KEY_ARBITRUM')
+        if alchemy_key:
+            return f'https://arb-mainnet.g.alchemy.com/v2/{alchemy_key}'
+        return 'https://arb1.arbitrum.io/rpc'
+    raise ValueError(f'Unsupported chain ID: {chain_id}')
+
+
+def get_rpc_urls(chain_id):
+    """
+    Get every RPC URL for the specified chain, preferred first.
+
+    Args:
+        chain_id: Chain ID
+
+    Returns:
+        RPC_URLS_<chain_id> (comma-separated) if set, otherwise the get_rpc_url
+        endpoint, followed by RPC_FALLBACK_URLS if RPC_PUBLIC_FALLBACKS is enabled
+    """
+    configured = os.getenv(f'RPC_URLS_{chain_id}')
+    if configured:
+        return [url.strip() for url in configured.split(',') if url.strip()]
+    fallbacks = RPC_FALLBACK_URLS.get(chain_id, []) if RPC_PUBLIC_FALLBACKS else []
+    return list(dict.fromkeys([get_rpc_url(chain_id), *fallbacks]))
+
+
+def create_provider(urls, chain_id=None, pool_size=None, timeout=None):
+    """
+    Create a pooled provider for one or several endpoints.
+
+    Args:
+        urls: RPC URLs, preferred first
+        chain_id: Chain ID for metrics and endpoint scoring (None for the default connection)
+        pool_size: Keep-alive connections per endpoint (default: RPC_POOL_SIZES / RPC_POOL_SIZE)
+        timeout: Seconds per request (default: RPC_TIMEOUT)
+
+    Returns:
+        PooledHTTPProvider for one URL, FailoverProvider over pooled providers for several
+    """
+    urls = list(dict.fromkeys(urls))
+    pool_size = pool_size or RPC_POOL_SIZES.get(chain_id, RPC_POOL_SIZE)
+    timeout = timeout or RPC_TIMEOUT
+    providers = [PooledHTTPProvider(url, pool_size, timeout, chain_id=chain_id) for url in urls]
+    if len(providers) == 1:
+        return providers[0]
+    return FailoverProvider(endpoint_set(chain_id, urls), providers, pool_size)
+
+
+def create_async_provider(urls, chain_id=None, **kwargs):
+    """
+    Create an async provider for one or several endpoints.
+
+    Args:
+        urls: RPC URLs, preferred first
+        chain_id: Chain ID for metrics and endpoint scoring (None for the default connection)
+        **kwargs: Passed to each AsyncHTTPProvider (e.g. request_kwargs)
+
+    Returns:
+        MeteredAsyncHTTPProvider for one URL, AsyncFailoverProvider for several
+    """
+    urls = list(dict.fromkeys(urls))
+    providers = [MeteredAsyncHTTPProvider(url, chain_id=chain_id, **kwargs) for url in urls]
+    if len(providers) == 1:
+        return providers[0]
+    return AsyncFailoverProvider(endpoint_set(chain_id, urls), providers)
+
+
+def batch_request(web3, calls):
+    """
+    Send JSON-RPC requests as one batch when the provider supports it,
+    otherwise one by one.
+
+    Args:
+        web3: Web3 instance
+        calls: List of (method, params) tuples
+
+    Returns:
+        List of raw JSON-RPC responses, in call order
+    """
+    provider = web3.provider
+    if hasattr(provider, 'make_batch_request'):
+        return provider.make_batch_request(calls)
+    return [provider.make_request(method, params) for method, params in calls]
+
+
+class PooledHTTPProvider(Web3.HTTPProvider):
+    """HTTP provider that sends every request through one shared keep-alive session."""
+
+    def __init__(self, endpoint_uri, pool_size, timeout, chain_id=None):
+        super().__init__(endpoint_uri, request_kwargs={'timeout': timeout})
+        self.metrics_label = chain_label(chain_id)
+
+        # One connection pool per chain, shared by all threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        response = self.session.post(self.endpoint_uri, data=request_data, **self.get_request_kwargs())
+        response.raise_for_status()
+        observe_payload(self.metrics_label, method, len(request_data), len(response.content))
+        return self.decode_rpc_response(response.content)
+
+    def make_batch_request(self, calls):
+        """
+        Send several JSON-RPC requests in one HTTP round trip.
+
+        Args:
+            calls: List of (method, params) tuples
+
+        Returns:
+            List of raw JSON-RPC responses, in call order
+        """
+        payload = [
+            {'jsonrpc': '2.0', 'method': method, 'params': params, 'id': index}
+            for index, (method, params) in enumerate(calls)
+        ]
+        request_data = json.dumps(payload)
+
+        # Batches bypass the middleware stack, so they are recorded here
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.endpoint_uri, data=request_data, **self.get_request_kwargs())
+            response.raise_for_status()
+        except Exception:
+            observe_rpc(self.metrics_label, 'batch', time.perf_counter() - start, 'transport')
+            raise
+        results = response.json()
+
+        # Some nodes reject the whole batch with a single error object
+        if isinstance(results, dict):
+            observe_rpc(self.metrics_label, 'batch', time.perf_counter() - start, 'rpc')
+            raise ValueError(f'Batch request failed: {results.get("error")}')
+        observe_rpc(self.metrics_label, 'batch', time.perf_counter() - start)
+        observe_payload(self.metrics_label, 'batch', len(request_data), len(response.content))
+
+        by_id = {result.get('id'): result for result in results}
+        return [by_id.get(index, {'error': {'message': 'missing response'}}) for index in range(len(calls))]
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+class MeteredAsyncHTTPProvider(AsyncWeb3.AsyncHTTPProvider):
+    """Async HTTP provider that records request and response sizes."""
+
+    def __init__(self, endpoint_uri, chain_id=None, **kwargs):
+        super().__init__(endpoint_uri, **kwargs)
+        self.metrics_label = chain_label(chain_id)
+
+    async def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        raw_response = await async_make_post_request(self.endpoint_uri, request_data, **self.get_request_kwargs())
+        observe_payload(self.metrics_label, method, len(request_data), len(raw_response))
+        return self.decode_rpc_response(raw_response)
+
+
+class ChainClientRegistry:
+    """Registry of pooled Web3 clients, one per chain."""
+
+    def __init__(self, health_check_interval=None):
+        """Initialize an empty registry; clients are created on first use."""
+        self.health_check_interval = health_check_interval or RPC_HEALTH_CHECK_INTERVAL
+        self._clients = {}
+        self._health = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread = None
+
+    def get(self, chain_id):
+        """
+        Get the shared Web3 instance for the specified chain.
+
+        Args:
+            chain_id: Chain ID (1 for Ethereum, 42161 for Arbitrum)
+
+        Returns:
+            Web3 instance
+        """
+        web3 = self._clients.get(chain_id)
+        if web3 is None:
+            web3 = self._create(chain_id)
+
+        # Fail fast if the last background health check saw the RPC down
+        healthy, error = self._health.get(chain_id, (True, None))
+        if not healthy:
+            raise ConnectionError(f'Cannot connect to chain {chain_id} RPC: {error}')
+
+        return web3
+
+    def is_healthy(self, chain_id):
+        """Return the result of the last health check for the chain."""
+        return self._health.get(chain_id, (True, None))[0]
+
+    def chain_ids(self):
+        """Return the chain IDs that have a client."""
+        return list(self._clients)
+
+    def close(self):
+        """Stop health checks and close every pooled session."""
+        self._stop.set()
+        with self._lock:
+            for web3 in self._clients.values():
+                web3.provider.close()
+            self._clients.clear()
+
+    def _create(self, chain_id):
+        with self._lock:
+            if chain_id in self._clients:
+                return self._clients[chain_id]
+
+            # One endpoint, or several with scoring, hedged reads and broadcast sends
+            web3 = Web3(create_provider(get_rpc_urls(chain_id), chain_id))
+
+            # Add PoA middleware for Arbitrum and other PoA chains
+            web3.middleware_onion.inject(geth_poa_middleware, layer=0)
+
+            # Outermost, so retries count towards the recorded latency
+            web3.middleware_onion.add(rpc_metrics_middleware(chain_id), 'metrics')
+
+            self._clients[chain_id] = web3
+            self._start_health_checks()
+            return web3
+
+    def _start_health_checks(self):
+        if self._health_thread is not None:
+            return
+        self._health_thread = threading.Thread(
+            target=self._health_loop,
+            name='rpc-health-check',
+            daemon=True
+        )
+        self._health_thread.start()
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_check_interval):
+            for chain_id, web3 in list(self._clients.items()):
+                self.check_health(chain_id, web3)
+
+    def check_health(self, chain_id, web3=None):
+        """
+        Run a health check for the chain and record the result.
+
+        Args:
+            chain_id: Chain ID
+            web3: Optional Web3 instance (defaults to the registered client)
+
+        Returns:
+            True if the RPC answered
+        """
+        web3 = web3 or self._clients.get(chain_id)
+        if web3 is None:
+            return False
+        try:
+            probe = getattr(web3.provider, 'probe', None)
+            if probe is not None:
+                # Every endpoint's latency and head lag; healthy while one endpoint is usable
+                if not probe():
+                    raise ConnectionError('no healthy RPC endpoint')
+            else:
+                web3.eth.block_number
+            self._health[chain_id] = (True, None)
+        except Exception as e:
+            self._health[chain_id] = (False, str(e))
+        return self._health[chain_id][0]
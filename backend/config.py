@@ -4,11 +4,13 @@ Configuration file for backend
 Update contract addresses here when deploying to different networks
 """
 
+import os
+
 # Factory contract address (same on all chains)
 FACTORY_ADDRESS = '0x0ece0dca03180c05c8eb91a3790d763ed02d9b55'
 
-# Operator wallet address (backend wallet)
-OPERATOR_ADDRESS = '0x3d94E55a2C3Cf83226b3D056eBeBb43b4731417f'
+# Operator wallet address (backend wallet); OPERATOR_ADDRESS overrides it for local chains
+OPERATOR_ADDRESS = os.getenv('OPERATOR_ADDRESS', '0x3d94E55a2C3Cf83226b3D056eBeBb43b4731417f')
 
 # PYUSD token addresses
 PYUSD_ADDRESSES = {
@@ -31,4 +33,141 @@ CHAIN_IDS = {
 # Backend API settings
 DEFAULT_PORT = 5002
 DEFAULT_DEBUG = False
+WARMUP_RETRY_INITIAL = 1  # seconds before retrying a failed background warm-up
+WARMUP_RETRY_MAX = 30  # longest delay between warm-up retries in seconds
+READY_CHAINS = list(PYUSD_ADDRESSES)  # chains whose RPC must answer before /ready returns 200
+
+
+# RPC client settings
+RPC_TIMEOUT = 10  # seconds per RPC request
+RPC_POOL_SIZE = 10  # keep-alive connections per chain
+RPC_POOL_SIZES = {
+    # Per-chain overrides, e.g. 42161: 20
+}
+RPC_HEALTH_CHECK_INTERVAL = 15  # seconds between background health checks
+
+# RPC endpoint routing (a chain may be served by several endpoints)
+RPC_PUBLIC_FALLBACKS = os.getenv('RPC_PUBLIC_FALLBACKS', 'False').lower() == 'true'  # add RPC_FALLBACK_URLS to each chain
+RPC_FALLBACK_URLS = {
+    # Public endpoints used alongside the Alchemy URL when enabled; RPC_URLS_<chain_id> replaces the whole set
+    1: ['https://eth.llamarpc.com', 'https://ethereum-rpc.publicnode.com'],
+    42161: ['https://arb1.arbitrum.io/rpc', 'https://arbitrum-one-rpc.publicnode.com']
+}
+RPC_EWMA_ALPHA = 0.1  # weight of the newest sample in rolling latency and error rate
+RPC_MAX_ERROR_RATE = 0.5  # rolling error rate above which an endpoint is skipped
+RPC_MAX_HEAD_LAG = 3  # blocks behind the best endpoint before an endpoint is skipped
+RPC_MAX_HEAD_LAGS = {
+    42161: 40  # Arbitrum makes ~4 blocks per second
+}
+RPC_HEDGE_MIN_DELAY = 0.05  # seconds; a read is hedged after max(this, latency + 4 * deviation)
+RPC_HEDGE_INITIAL_DELAY = 0.5  # seconds before hedging a read to an endpoint with no latency yet
+RPC_BROADCAST_FANOUT = 3  # endpoints each raw transaction is sent to
+
+# Local state (nonce store, indexes, queues)
+STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'state')
+
+# Nonce manager settings
+NONCE_RESYNC_INTERVAL = 60  # seconds between checks against the pending count
+
+# Head follower settings
+HEAD_POLL_INTERVAL = 2  # seconds between block number checks per chain
+
+# Fee oracle settings
+FEE_HISTORY_BLOCKS = 20  # blocks of eth_feeHistory to sample
+FEE_URGENCY_PERCENTILES = {
+    'cheap': 10,
+    'normal': 50,
+    'fast': 90
+}
+
+# Gas limit model
+DEFAULT_GAS_LIMIT = 500000  # lowest gas limit sent; also used when a call cannot be estimated
+GAS_LIMIT_MULTIPLIER = 1.2  # headroom over the largest observed gasUsed (or the estimate)
+GAS_SAMPLES = 50  # receipts kept per function and payload size
+
+# Transaction tracker settings
+TX_FINALITY_DEPTH = 12  # confirmations after which a receipt is cached for good
+TX_CACHE_SIZE = 10000  # finalized receipts kept in memory
+TX_BATCH_SIZE = 100  # receipts fetched per JSON-RPC batch
+TX_PENDING_TTL = 3600  # seconds to keep looking for an unmined transaction
+TX_MAX_WAIT = 120  # longest ?wait= long-poll in seconds
+TX_UNKNOWN_TTL = 5  # seconds a not-found lookup of a hash the tracker never sent is reused
+TX_UNKNOWN_CACHE_SIZE = 10000  # not-found lookups remembered
+TX_WAIT_POLL_INTERVAL = 0.25  # seconds between tracker checks in async long-polls
+
+# Stuck transaction accelerator (replace-by-fee)
+TX_INCLUSION_DEADLINE = 60  # seconds a sent transaction may stay unmined before it is re-sent with higher fees
+TX_INCLUSION_DEADLINES = {
+    42161: 15  # Arbitrum includes a correctly priced transaction within seconds
+}
+TX_FEE_BUMP = 0.125  # fraction added to the fees on each replacement (nodes require at least 0.1)
+TX_MAX_BUMPS = 5  # replacements per nonce before the accelerator gives up
+TX_MAX_FEE_MULTIPLIER = 4  # replacements never bid more than this times the original max fee
+
+# Arrival indexer settings
+INDEXER_START_LOOKBACK = 5000  # blocks indexed before the first checkpoint
+INDEXER_INITIAL_RANGE = 2000  # blocks per eth_getLogs request to start with
+INDEXER_MAX_RANGE = 10000  # largest eth_getLogs block range
+INDEXER_MAX_RANGES_PER_TICK = 10  # ranges fetched before yielding to the next head
+INDEXER_REORG_DEPTH = 12  # latest blocks indexed again on every tick, so logs of reorged-out blocks are dropped
+INDEXER_REORG_DEPTHS = {
+    42161: 240  # about a minute of Arbitrum blocks
+}
+ARRIVAL_MEMORY_WINDOW = 50000  # blocks of credits kept in memory; older lookups read the store
+ARRIVAL_MEMORY_WINDOWS = {
+    42161: 1000000
+}
+
+# Read batching (Multicall3 aggregate3, same address on all chains)
+MULTICALL3_ADDRESSES = {
+    1: '0xcA11bde05977b3631167028862bE2a173976CA11',  # Ethereum
+    42161: '0xcA11bde05977b3631167028862bE2a173976CA11'  # Arbitrum
+}
+READ_BATCH_WINDOW = 0.005  # seconds to collect concurrent reads into one batch
+READ_BATCH_MAX = 500  # calls per aggregate3 / JSON-RPC batch
+
+# Block-keyed read cache (view calls and balances, expired by new heads)
+READ_CACHE_MAX_BLOCK_LAG = 0  # blocks behind the followed head a cached read may be served
+READ_CACHE_MAX_HEAD_AGE = 10  # seconds without a successful head poll before reads bypass the cache
+READ_CACHE_SIZE = 10000  # cached reads per chain
+
+# Contract registry
+CONTRACT_CACHE_SIZE = 4096  # contract instances and checksummed addresses kept
+
+# Offline PyPay address derivation (CREATE2)
+ADDRESS_CACHE_SIZE = 100000  # derived (signer, salt) -> address entries kept
+COMPUTE_ADDRESS_MAX = 10000  # user addresses per /compute-address request
+
+# Native fee quote cache
+QUOTE_TTL = 30  # seconds before a cached quote is refreshed
+QUOTE_IDLE_TTL = 600  # seconds after the last request before a route stops refreshing
+
+# Submission job queue
+JOB_WORKERS_PER_CHAIN = 4  # dispatcher threads per chain
+JOB_MAX_ATTEMPTS = 5  # sends tried before a task is marked failed
+JOB_RETRY_BASE = 2  # seconds before the first retry, doubled on each attempt
+JOB_RETRY_MAX = 60  # longest delay between retries in seconds
+JOB_LEASE = 120  # seconds a claimed task is held before another worker may take it over
+JOB_POLL_INTERVAL = 1  # seconds between queue checks when idle
+IDEMPOTENCY_TTL = 86400  # seconds a submission's idempotency keys map retries to its job
+IDEMPOTENCY_MAX_KEYS = 100000  # idempotency keys kept; the oldest are dropped first
+
+# Bulk transfers (/transfer/batch)
+TRANSFER_BATCH_MAX = 5000  # payloads per /transfer/batch request
+SEND_BATCH_SIZE = 100  # signed transactions per eth_sendRawTransaction JSON-RPC batch
+
+# Transaction signing
+SIGNING_WORKERS = 0  # signing processes for large batches (0: sign in the calling thread); SIGNING_WORKERS env overrides
+SIGNING_POOL_MIN_BATCH = 256  # smallest batch worth sending to the signing processes
+
+# Job lifecycle stream (server-sent events)
+EVENTS_KEEPALIVE = 15  # seconds between keep-alive comments on an idle /jobs/<job_id>/events stream
+EVENTS_MAX_STREAM = 3600  # seconds before a stream is closed; clients reconnect with Last-Event-ID
+
+# Payload pre-verification
+EXPIRY_MARGIN = 30  # seconds of validity a payload must have left to be accepted
+VERIFY_BATCH_MAX = 1000  # payloads per /verify request
 
+# Metrics and tracing
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)  # seconds, endpoint/RPC/stage histograms
+PAYLOAD_SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152)  # bytes, RPC request/response histograms
@@ -6,11 +6,317 @@ Handles CrossChainTransfer and transfer function calls.
 
 import os
 import json
-from web3 import Web3
-from web3.middleware import geth_poa_middleware
-from eth_account import Account
+import hashlib
+import logging
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from eth_utils import is_address
-from config import FACTORY_ADDRESS, OPERATOR_ADDRESS, PYUSD_ADDRESSES, OFT_ADDRESSES
+from web3 import Web3
+from web3.exceptions import ContractLogicError, TransactionNotFound
+from config import FACTORY_ADDRESS, OPERATOR_ADDRESS, PYUSD_ADDRESSES, FEE_URGENCY_PERCENTILES
+from chain_clients import ChainClientRegistry
+from rpc_router import is_rejection
+from contract_registry import ContractRegistry, to_checksum
+from create2 import PyPayAddressDeriver
+from nonce_manager import NonceManager
+from fee_oracle import FeeOracle, gas_label
+from head_follower import HeadFollower
+from tx_tracker import TransactionTracker
+from tx_accelerator import TransactionAccelerator
+from batch_sender import BatchSender
+from arrival_indexer import ArrivalIndexer
+from lifecycle import LifecycleWatcher
+from read_cache import BlockReadCache
+from read_batcher import ReadBatcher
+from quote_cache import QuoteCache
+from job_queue import JobQueue, PermanentError
+from used_nonce_index import UsedNonceIndex
+from payload_verifier import PayloadVerifier
+from metrics import stage
+
+logger = logging.getLogger(__name__)
+
+# Factory computeAddress view
+FACTORY_ABI = [
+    {
+        "inputs": [
+            {"internalType": "uint256", "name": "_salt_int", "type": "uint256"},
+            {"internalType": "address", "name": "signer", "type": "address"},
+            {"internalType": "address", "name": "operator", "type": "address"}
+        ],
+        "name": "computeAddress",
+        "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function",
+    }
+]
+
+# ERC20 balanceOf / decimals views
+ERC20_ABI = [
+    {
+        "constant": True,
+        "inputs": [{"name": "_owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "payable": False,
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "decimals",
+        "outputs": [{"name": "", "type": "uint8"}],
+        "payable": False,
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+# PyPay getQuoteNativeFee view
+QUOTE_FEE_ABI = [
+    {
+        "inputs": [
+            {"internalType": "uint256", "name": "sourceChainId", "type": "uint256"},
+            {"internalType": "uint256", "name": "destinationChainId", "type": "uint256"},
+            {"internalType": "uint256", "name": "amount", "type": "uint256"},
+            {"internalType": "address", "name": "targetAddress", "type": "address"}
+        ],
+        "name": "getQuoteNativeFee",
+        "outputs": [
+            {"internalType": "uint256", "name": "nativeFee", "type": "uint256"}
+        ],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+@lru_cache(maxsize=1)
+def load_pypay_artifact():
+    """Load the PyPay Hardhat artifact (ABI and creation bytecode), once per process."""
+    artifact_path = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)),
+        'artifacts/contracts/pypay.sol/PyPay.json'
+    )
+    
+    with open(artifact_path, 'r') as f:
+        return json.load(f)
+
+def load_pypay_abi():
+    """Load the PyPay ABI from the Hardhat artifacts."""
+    return load_pypay_artifact()['abi']
+
+def load_contract_registry():
+    """Contract registry with the PyPay, Factory, ERC20 and quote ABIs."""
+    contracts = ContractRegistry()
+    contracts.register('PyPay', load_pypay_abi())
+    contracts.register('Factory', FACTORY_ABI)
+    contracts.register('ERC20', ERC20_ABI)
+    contracts.register('QuoteFee', QUOTE_FEE_ABI)
+    return contracts
+
+def build_call_transaction(function, contract_address, args, value, fields):
+    """Transaction dict for a contract call, with calldata from the function's codec."""
+    if value and not function.payable:
+        raise ValueError(f'{function.name} is not payable')
+    return {
+        **fields,
+        'to': to_checksum(contract_address),
+        'data': function.encode(args),
+        'value': value or 0
+    }
+
+def bridging_chain_ids(source_chain_ids, destination_chain_id):
+    """Source chains a CrossChainTransfer is sent on: all but the destination."""
+    if not source_chain_ids:
+        raise ValueError('source_chain_ids cannot be empty')
+    
+    # The destination chain's share needs no bridging
+    chain_ids = [chain_id for chain_id in source_chain_ids if chain_id != destination_chain_id]
+    if not chain_ids:
+        raise ValueError('source_chain_ids must contain a chain other than destination_chain_id')
+    return chain_ids
+
+def job_payload(
+    contract_address, source_chain_ids, amount_each, nonces, expiry,
+    destination_chain_id, target_address, signature, urgency
+):
+    """JSON-serializable arguments of a queued transfer."""
+    if not is_address(contract_address):
+        raise ValueError(f'Invalid contract address: {contract_address}')
+    if urgency not in FEE_URGENCY_PERCENTILES:
+        raise ValueError(f'Unknown urgency: {urgency}')
+    return {
+        'contract_address': contract_address,
+        'source_chain_ids': source_chain_ids,
+        'amount_each': amount_each,
+        'nonces': nonces,
+        'expiry': expiry,
+        'destination_chain_id': destination_chain_id,
+        'target_address': target_address,
+        'signature': '0x' + bytes(signature).hex(),
+        'urgency': urgency
+    }
+
+def idempotency_keys(kind, payload, client_key=None):
+    """
+    Idempotency keys and fingerprint of a queued submission.
+    The fingerprint covers the contract, the PyPay nonces and the signature,
+    which binds every other field: a second job for the same payload could
+    only revert on the used-nonce check. A client Idempotency-Key, if given,
+    is a key of its own and must keep being sent with the same payload.
+    
+    Returns:
+        (keys, fingerprint)
+    """
+    fingerprint = hashlib.sha256(json.dumps([
+        kind, payload['contract_address'].lower(), payload['nonces'], payload['signature']
+    ]).encode()).hexdigest()
+    keys = [f'payload:{fingerprint}']
+    if client_key:
+        keys.insert(0, f'client:{client_key}')
+    return keys, fingerprint
+
+def verification_payloads(
+    chain_ids, contract_address, source_chain_ids, amount_each, nonces, expiry,
+    destination_chain_id, target_address, signature
+):
+    """Payloads to pre-verify for a submission, one per chain it is sent on."""
+    return [
+        {
+            'contract_address': contract_address,
+            'chain_id': chain_id,
+            'source_chain_ids': source_chain_ids,
+            'amount_each': amount_each,
+            'nonces': nonces,
+            'expiry': expiry,
+            'destination_chain_id': destination_chain_id,
+            'target_address': target_address,
+            'signature': signature
+        }
+        for chain_id in chain_ids
+    ]
+
+def raise_if_rejected(chain_ids, results):
+    """Raise ValueError for the first chain whose payload failed pre-verification."""
+    for chain_id, result in zip(chain_ids, results):
+        if not result['valid']:
+            raise ValueError(f'Payload rejected on chain {chain_id}: {result["error"]}')
+
+def group_batch(payloads, verified):
+    """
+    Split /transfer/batch payloads into rejected ones and per-chain send groups.
+    A payload runs on its first source chain. It is not sent if it failed
+    pre-verification or uses a PyPay nonce an earlier payload in the batch uses.
+    
+    Returns:
+        (results, groups): results holds an error result or None per payload;
+        groups maps chain ID to the indexes of the payloads to send there
+    """
+    results = [None] * len(payloads)
+    groups = {}
+    claimed = set()
+    for index, (payload, check) in enumerate(zip(payloads, verified)):
+        if not check['valid']:
+            results[index] = {'success': False, 'error': check['error']}
+            continue
+        chain_id = payload['source_chain_ids'][0]
+        key = (chain_id, payload['contract_address'].lower(), payload['nonces'][0])
+        if key in claimed:
+            results[index] = {'success': False, 'error': 'nonce used by an earlier payload in the batch'}
+            continue
+        claimed.add(key)
+        groups.setdefault(chain_id, []).append(index)
+    return results, groups
+
+def send_transfer_batch(batches, func, web3, chain_id, payloads, indexes, urgency):
+    """
+    Encode transfer payloads and send them on one chain with a BatchSender.
+    
+    Args:
+        batches: BatchSender
+        func: PyPay transfer function codec
+        web3: Web3 instance for the chain (sync)
+        chain_id: Chain ID
+        payloads: /transfer/batch payloads
+        indexes: Indexes of the payloads to send on this chain
+        urgency: Fee tier
+    
+    Returns:
+        dict mapping each payload index to its result
+    """
+    results = {}
+    sending = []
+    transactions = []
+    labels = []
+    for index in indexes:
+        payload = payloads[index]
+        args = [
+            payload['source_chain_ids'],
+            payload['amount_each'],
+            payload['nonces'],
+            payload['expiry'],
+            payload['destination_chain_id'],
+            payload['target_address'],
+            payload['signature']
+        ]
+        # A payload that cannot be encoded fails alone
+        try:
+            transactions.append(build_call_transaction(func, payload['contract_address'], args, None, {}))
+            labels.append(gas_label('transfer', args))
+            sending.append(index)
+        except Exception as e:
+            results[index] = {'success': False, 'chain_id': chain_id, 'error': f'Error building transaction: {str(e)}'}
+    
+    try:
+        sent = batches.send(chain_id, web3, transactions, labels, urgency)
+    except Exception as e:
+        sent = [{'error': str(e)}] * len(sending)
+    for index, result in zip(sending, sent):
+        results[index] = {'success': 'error' not in result, 'chain_id': chain_id, **result}
+    return results
+
+def job_call(kind, chain_id, payload):
+    """Contract arguments and value for running a queued job on one chain."""
+    args = [
+        payload['source_chain_ids'],
+        payload['amount_each'],
+        payload['nonces'],
+        payload['expiry'],
+        payload['destination_chain_id'],
+        payload['target_address'],
+        bytes.fromhex(payload['signature'][2:])
+    ]
+    value = None
+    if kind == 'CrossChainTransfer':
+        fee = payload['native_fee']
+        value = fee[str(chain_id)] if isinstance(fee, dict) else fee
+        args.append(value)  # Also sent as value for the payable function
+    return args, value
+
+def sent_record(tx_hash, transaction, label):
+    """JSON-serializable record of a signed job transaction, kept by the job queue until it is sent."""
+    return {
+        'tx_hash': tx_hash,
+        'label': label,
+        'transaction': {key: Web3.to_hex(value) if isinstance(value, bytes) else value for key, value in transaction.items()}
+    }
+
+class SendOutcomeUnknown(ConnectionError):
+    """A signed transaction whose broadcast failed in transport; the node may have received it."""
+    
+    def __init__(self, tx_hash, error):
+        super().__init__(f'Send of {tx_hash} failed in transport, outcome unknown: {error}')
+        self.tx_hash = tx_hash
+
+def raise_if_reverted(error):
+    """Raise a job send error as PermanentError if it, or what caused it, is a contract revert."""
+    cause, seen = error, set()
+    while cause is not None and id(cause) not in seen:
+        if isinstance(cause, ContractLogicError):
+            raise PermanentError(str(error)) from error
+        seen.add(id(cause))
+        cause = cause.__cause__ or cause.__context__
 
 class ContractManager:
     """Manages PyPay contract interactions."""
@@ -20,16 +326,62 @@ class ContractManager:
         self.wallet_manager = wallet_manager
         self.web3 = wallet_manager.web3
         
-        # Load PyPay ABI
-        abi_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            'artifacts/contracts/pypay.sol/PyPay.json'
-        )
+        # ABIs parsed once, with precomputed selectors and codecs
+        self.contracts = load_contract_registry()
+        self.abi = self.contracts.abi('PyPay')
+        
+        # PyPay addresses derived locally (CREATE2), checked once per chain against the Factory
+        self.addresses = PyPayAddressDeriver(load_pypay_artifact()['bytecode'])
+        self._derivation_checked = {}
+        
+        # Long-lived per-chain clients shared by all requests
+        self.clients = ChainClientRegistry()
+        
+        # Operator nonce allocator
+        self.nonces = NonceManager()
+        
+        # Per-chain head follower shared by the background services
+        self.heads = HeadFollower()
+        
+        # EIP-1559 fees and learned gas limits
+        self.fee_oracle = FeeOracle(self.heads)
+        
+        # Receipt tracking for /tx-status; mined receipts feed the gas-limit model
+        self.tracker = TransactionTracker(self.clients, self.heads)
+        self.tracker.add_listener(self.fee_oracle.observe_receipt)
         
-        with open(abi_path, 'r') as f:
-            abi = json.load(f)['abi']
+        # Stuck operator transactions are re-sent with bumped fees
+        self.accelerator = TransactionAccelerator(wallet_manager.signer, self.nonces, self.tracker, self.heads, self.fee_oracle)
         
-        self.abi = abi
+        # Pipelined sends for /transfer/batch
+        self.batches = BatchSender(wallet_manager.signer, self.nonces, self.fee_oracle, self.tracker, self.accelerator)
+        
+        # View calls and balances cached per block, expired by new heads
+        self.read_cache = BlockReadCache(self.heads, self.clients)
+        
+        # Batched view calls (Multicall3 / JSON-RPC batch)
+        self.reads = ReadBatcher(self.clients, self.read_cache)
+        
+        # Native fee quotes refreshed in the background
+        self.quotes = QuoteCache(self.reads, self.heads, self.clients)
+        
+        # Cross-chain arrivals indexed from destination-chain logs
+        self.arrivals = ArrivalIndexer(self.clients, self.heads)
+        for chain_id in PYUSD_ADDRESSES:
+            self.arrivals.start(chain_id)
+        
+        # Signature, expiry and used-nonce checks before anything is sent
+        self.used_nonces = UsedNonceIndex(self.clients, self.heads)
+        for chain_id in PYUSD_ADDRESSES:
+            self.used_nonces.start(chain_id)
+        self.verifier = PayloadVerifier(self.used_nonces, self.compute_contract_addresses)
+        
+        # Durable submission queue drained by per-chain dispatchers
+        self.jobs = JobQueue(self._run_job)
+        
+        # Job lifecycle events for /jobs/<job_id>/events
+        self.lifecycle = LifecycleWatcher(self.jobs, self.tracker, self.arrivals, self.heads)
+        self._default_chain_id = None
     
     def get_web3_for_chain(self, chain_id):
         """
@@ -39,37 +391,54 @@ class ContractManager:
             chain_id: Chain ID (1 for Ethereum, 42161 for Arbitrum)
         
         Returns:
-            Web3 instance
-        """
-        # Get RPC URL based on chain ID
-        if chain_id == 1:  # Ethereum
-            alchemy_key = os.getenv('ALCHEMY_API_KEY_ETHEREUM')
-            if alchemy_key:
-                rpc_url = f'https://eth-mainnet.g.alchemy.com/v2/{alchemy_key}'
-            else:
-                rpc_url = 'https://eth.llamarpc.com'
-        elif chain_id == 42161:  # Arbitrum
-            alchemy_key = os.getenv('ALCHEMY_API_KEY_ARBITRUM')
-            if alchemy_key:
-                rpc_url = f'https://arb-mainnet.g.alchemy.com/v2/{alchemy_key}'
-            else:
-                rpc_url = 'https://arb1.arbitrum.io/rpc'
-        else:
-            raise ValueError(f'Unsupported chain ID: {chain_id}')
-        
-        # Create Web3 instance
-        web3 = Web3(Web3.HTTPProvider(rpc_url))
+            Shared, pooled Web3 instance from the client registry
+        """
+        return self.clients.get(chain_id)
+    
+    def warm(self):
+        """
+        Open the per-chain connections ahead of the first request.
         
-        # Add PoA middleware for Arbitrum and other PoA chains
-        web3.middleware_onion.inject(geth_poa_middleware, layer=0)
+        Returns:
+            dict of chain ID to whether its RPC answered
+        """
+        return {
+            chain_id: self.clients.check_health(chain_id, self.clients.get(chain_id))
+            for chain_id in PYUSD_ADDRESSES
+        }
+    
+    def get_default_chain_id(self):
+        """Get the chain ID of the default Web3 connection."""
+        if self._default_chain_id is None:
+            self._default_chain_id = self.web3.eth.chain_id
+        return self._default_chain_id
+    
+    def get_wallet_balance(self):
+        """
+        Get the balance of the wallet in ETH.
+        On a chain in PYUSD_ADDRESSES the balance is read once per block.
         
-        # Check connection
-        if not web3.is_connected():
-            raise ConnectionError(f'Cannot connect to chain {chain_id} RPC: {rpc_url}')
+        Returns:
+            Balance in ETH (string)
+        """
+        chain_id = self.get_default_chain_id()
+        if chain_id not in PYUSD_ADDRESSES:
+            # Not cached per block, but concurrent requests share one read
+            return self.read_cache.flights.do(
+                None, 'eth_getBalance', (self.wallet_manager.address,), self.wallet_manager.get_balance
+            )
         
-        return web3
+        address = self.wallet_manager.address
+        balance_wei = self.read_cache.read(
+            chain_id,
+            ('eth_getBalance', address),
+            lambda: self.web3.eth.get_balance(address)
+        )
+        return str(self.web3.from_wei(balance_wei, 'ether'))
     
-    def call_contract(self, contract_address, function_name, args, chain_id=None, value=None):
+    def call_contract(
+        self, contract_address, function_name, args, chain_id=None, value=None, urgency='normal', on_signed=None
+    ):
         """
         Call a contract function.
         
@@ -79,6 +448,8 @@ class ContractManager:
             args: Function arguments
             chain_id: Optional chain ID to use (if None, uses default)
             value: Optional native token amount (in wei) to send with the transaction
+            urgency: Fee tier ('fast', 'normal' or 'cheap')
+            on_signed: Optional callback(tx_hash, transaction, label) run before the broadcast
         
         Returns:
             Transaction hash
@@ -91,40 +462,91 @@ class ContractManager:
             web3 = self.get_web3_for_chain(chain_id)
         else:
             web3 = self.web3
+            chain_id = self.get_default_chain_id()
         
-        # Create contract instance
-        contract = web3.eth.contract(
-            address=Web3.to_checksum_address(contract_address),
-            abi=self.abi
-        )
+        # Function codec; calldata is encoded without a contract object
+        func = self.contracts.function('PyPay', function_name)
+        
+        # Fees come from the oracle's cache; gas limit from past receipts of this payload size
+        label = gas_label(function_name, args)
+        with stage('fees', chain_id=chain_id):
+            fees = self.fee_oracle.get_fees(web3, chain_id, urgency)
         
-        # Get function
-        func = getattr(contract.functions, function_name)
+        # Allocate nonce locally (shared across threads and worker processes)
+        address = self.wallet_manager.address
+        with stage('nonce', chain_id=chain_id):
+            nonce = self.nonces.allocate(web3, chain_id, address)
         
         # Build transaction
         try:
-            tx_dict = {
-                'from': self.wallet_manager.address,
-                'nonce': web3.eth.get_transaction_count(self.wallet_manager.address),
-                'gas': 500000,  # Adjust as needed
-                'gasPrice': web3.eth.gas_price
-            }
-            
-            # Add value if specified (for payable functions)
-            if value is not None:
-                tx_dict['value'] = value
-            
-            transaction = func(*args).build_transaction(tx_dict)
+            with stage('build', chain_id=chain_id):
+                tx_dict = {
+                    'nonce': nonce,
+                    'chainId': chain_id,
+                    **fees
+                }
+                
+                transaction = build_call_transaction(func, contract_address, args, value, tx_dict)
+                transaction['gas'] = self.fee_oracle.gas_limit(chain_id, label, web3, {**transaction, 'from': address})
         except Exception as e:
+            self.accelerator.release(chain_id, web3, [nonce])
             raise ValueError(f'Error building transaction: {str(e)}')
         
         # Sign transaction
-        signed_txn = self.wallet_manager.account.sign_transaction(transaction)
+        with stage('sign', chain_id=chain_id):
+            signed_txn = self.wallet_manager.sign_transaction(transaction)
+        
+        if on_signed is not None:
+            try:
+                on_signed(signed_txn.hash.hex(), transaction, label)
+            except Exception:
+                self.accelerator.release(chain_id, web3, [nonce])
+                raise
+        
+        # Send transaction; a refused one did not consume its nonce, so give it back
+        try:
+            with stage('send', chain_id=chain_id):
+                tx_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        except Exception as e:
+            if is_rejection(e):
+                self.accelerator.release(chain_id, web3, [nonce])
+                raise
+            # Lost in transport: the node may have it, so its nonce is kept and it is watched
+            tx_hash = signed_txn.hash.hex()
+            self.tracker.track(tx_hash, chain_id, web3=web3, label=label)
+            self.accelerator.watch(chain_id, web3, transaction, tx_hash, label=label)
+            raise SendOutcomeUnknown(tx_hash, e) from e
         
-        # Send transaction
-        tx_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        tx_hash = tx_hash.hex()
+        self.tracker.track(tx_hash, chain_id, web3=web3, label=label)
+        self.accelerator.watch(chain_id, web3, transaction, tx_hash, label=label)
+        
+        return tx_hash
+    
+    def dispatch(self, chain_ids, submit):
+        """
+        Run a submission on several chains concurrently, one worker per chain.
+        Each chain uses its own client and nonce lane, so a slow chain does not
+        delay the others.
+        
+        Args:
+            chain_ids: List of chain IDs
+            submit: Callable taking a chain ID and returning a transaction hash
+        
+        Returns:
+            dict mapping chain ID to {'tx_hash': ...} or {'error': ...}
+        """
+        chain_ids = list(dict.fromkeys(chain_ids))
+        with ThreadPoolExecutor(max_workers=len(chain_ids)) as executor:
+            futures = {chain_id: executor.submit(submit, chain_id) for chain_id in chain_ids}
         
-        return tx_hash.hex()
+        results = {}
+        for chain_id, future in futures.items():
+            try:
+                results[chain_id] = {'tx_hash': future.result()}
+            except Exception as e:
+                results[chain_id] = {'error': str(e)}
+        return results
     
     def cross_chain_transfer(
         self,
@@ -136,10 +558,13 @@ class ContractManager:
         destination_chain_id,
         target_address,
         signature,
-        native_fee
+        native_fee,
+        urgency='normal'
     ):
         """
-        Call CrossChainTransfer function.
+        Call CrossChainTransfer function on every source chain in parallel.
+        Each chain bridges its own share (amount_each at its index) to the
+        destination chain, so one signed payload covers all source chains.
         
         Args:
             contract_address: PyPay contract address
@@ -150,36 +575,36 @@ class ContractManager:
             destination_chain_id: Destination chain ID (uint256)
             target_address: Target address
             signature: Signature bytes
-            native_fee: Native fee amount (uint256)
+            native_fee: Native fee amount (uint256), or dict of chain ID to fee
+            urgency: Fee tier ('fast', 'normal' or 'cheap')
         
         Returns:
-            Transaction hash
+            dict mapping source chain ID to {'tx_hash': ...} or {'error': ...}
         """
-        # Determine which chain to send the transaction to based on source_chain_ids
-        # For now, use the first chain in the array as the source chain
-        if not source_chain_ids:
-            raise ValueError('source_chain_ids cannot be empty')
-        
-        source_chain_id = source_chain_ids[0]
+        chain_ids = bridging_chain_ids(source_chain_ids, destination_chain_id)
         
-        args = [
-            source_chain_ids,
-            amount_each,
-            nonces,
-            expiry,
-            destination_chain_id,
-            target_address,
-            signature,
-            native_fee
-        ]
+        def submit(chain_id):
+            fee = native_fee[chain_id] if isinstance(native_fee, dict) else native_fee
+            args = [
+                source_chain_ids,
+                amount_each,
+                nonces,
+                expiry,
+                destination_chain_id,
+                target_address,
+                signature,
+                fee
+            ]
+            return self.call_contract(
+                contract_address=contract_address,
+                function_name='CrossChainTransfer',
+                args=args,
+                chain_id=chain_id,
+                value=fee,  # Pass native fee as value for payable function
+                urgency=urgency
+            )
         
-        return self.call_contract(
-            contract_address=contract_address,
-            function_name='CrossChainTransfer',
-            args=args,
-            chain_id=source_chain_id,
-            value=native_fee  # Pass native fee as value for payable function
-        )
+        return self.dispatch(chain_ids, submit)
     
     def transfer(
         self,
@@ -190,11 +615,14 @@ class ContractManager:
         expiry,
         destination_chain_id,
         target_address,
-        signature
+        signature,
+        urgency='normal'
     ):
         """
-        Call transfer function. Supports multiple source chains.
-        For each chain in source_chain_ids, calls transfer on that chain.
+        Call transfer function.
+        The contract pays the sum of amount_each on the chain it runs on, so the
+        call is sent to the first source chain only (where the funds have been
+        consolidated); sending it on every source chain would pay more than once.
         
         Args:
             contract_address: PyPay contract address
@@ -205,17 +633,14 @@ class ContractManager:
             destination_chain_id: Destination chain ID (uint256)
             target_address: Target address
             signature: Signature bytes
+            urgency: Fee tier ('fast', 'normal' or 'cheap')
         
         Returns:
-            List of transaction hashes
+            dict mapping the chain ID to {'tx_hash': ...} or {'error': ...}
         """
         if not source_chain_ids:
             raise ValueError('source_chain_ids cannot be empty')
         
-        # Determine which chain this transaction is for
-        # The contract will check which chain it's running on and only process that chain's part
-        source_chain_id = source_chain_ids[0]
-        
         args = [
             source_chain_ids,
             amount_each,
@@ -226,140 +651,343 @@ class ContractManager:
             signature
         ]
         
-        return self.call_contract(
+        return self.dispatch(source_chain_ids[:1], lambda chain_id: self.call_contract(
             contract_address=contract_address,
             function_name='transfer',
             args=args,
-            chain_id=source_chain_id
+            chain_id=chain_id,
+            urgency=urgency
+        ))
+    
+    def transfer_batch(self, payloads, urgency='normal'):
+        """
+        Pre-verify many signed transfer payloads and send the valid ones at once.
+        Payloads are grouped by the chain they run on (their first source chain);
+        each group gets consecutive nonces and is broadcast back to back in
+        JSON-RPC batches. Chains are sent concurrently.
+        
+        Args:
+            payloads: List of dicts with the transfer fields (see transfer)
+            urgency: Fee tier for every transaction ('fast', 'normal' or 'cheap')
+        
+        Returns:
+            List of dicts with success, chain_id, tx_hash and nonce, or error, in payload order
+        """
+        if urgency not in FEE_URGENCY_PERCENTILES:
+            raise ValueError(f'Unknown urgency: {urgency}')
+        
+        verified = self.verify_payloads([
+            {**payload, 'chain_id': payload['source_chain_ids'][0] if payload['source_chain_ids'] else None}
+            for payload in payloads
+        ])
+        results, groups = group_batch(payloads, verified)
+        if not groups:
+            return results
+        
+        func = self.contracts.function('PyPay', 'transfer')
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            futures = [
+                executor.submit(
+                    send_transfer_batch, self.batches, func, self.get_web3_for_chain(chain_id),
+                    chain_id, payloads, indexes, urgency
+                )
+                for chain_id, indexes in groups.items()
+            ]
+        for future in futures:
+            for index, result in future.result().items():
+                results[index] = result
+        return results
+    
+    def submit_cross_chain_transfer(
+        self,
+        contract_address,
+        source_chain_ids,
+        amount_each,
+        nonces,
+        expiry,
+        destination_chain_id,
+        target_address,
+        signature,
+        native_fee,
+        urgency='normal',
+        idempotency_key=None
+    ):
+        """
+        Pre-verify the payload and queue CrossChainTransfer on every source chain
+        other than the destination. A retry of a queued payload (or of the same
+        idempotency_key) returns the job already queued for it.
+        
+        Args: see cross_chain_transfer, plus idempotency_key (optional client key)
+        
+        Returns:
+            Job ID (str)
+        """
+        chain_ids = bridging_chain_ids(source_chain_ids, destination_chain_id)
+        if isinstance(native_fee, dict):
+            missing = [chain_id for chain_id in chain_ids if chain_id not in native_fee]
+            if missing:
+                raise ValueError(f'native_fee missing for chains: {missing}')
+            native_fee = {str(chain_id): fee for chain_id, fee in native_fee.items()}
+        
+        payload = job_payload(
+            contract_address, source_chain_ids, amount_each, nonces, expiry,
+            destination_chain_id, target_address, signature, urgency
         )
+        keys, fingerprint = idempotency_keys('CrossChainTransfer', payload, idempotency_key)
+        job_id = self.jobs.lookup(keys, fingerprint)
+        if job_id is not None:
+            return job_id
+        
+        payload['native_fee'] = native_fee
+        # Deliveries for this job land after this block
+        payload['destination_block'] = self.heads.head(destination_chain_id) or self.arrivals.checkpoint(destination_chain_id)
+        
+        raise_if_rejected(chain_ids, self.verify_payloads(verification_payloads(
+            chain_ids, contract_address, source_chain_ids, amount_each, nonces, expiry,
+            destination_chain_id, target_address, signature
+        )))
+        return self.jobs.enqueue('CrossChainTransfer', chain_ids, payload, keys=keys, fingerprint=fingerprint)
     
-    def _compute_contract_address(self, user_address, chain_id):
-        """Compute PyPay contract address for a given user and chain."""
-        # This should match the Factory.computeAddress logic
-        # Use addresses from config
+    def submit_transfer(
+        self,
+        contract_address,
+        source_chain_ids,
+        amount_each,
+        nonces,
+        expiry,
+        destination_chain_id,
+        target_address,
+        signature,
+        urgency='normal',
+        idempotency_key=None
+    ):
+        """
+        Pre-verify the payload and queue transfer on the first source chain.
+        A retry of a queued payload (or of the same idempotency_key) returns
+        the job already queued for it.
         
-        web3 = self.get_web3_for_chain(chain_id)
-        factory_abi = [
-            {
-                "inputs": [
-                    {"internalType": "uint256", "name": "_salt_int", "type": "uint256"},
-                    {"internalType": "address", "name": "signer", "type": "address"},
-                    {"internalType": "address", "name": "operator", "type": "address"}
-                ],
-                "name": "computeAddress",
-                "outputs": [{"internalType": "address", "name": "", "type": "address"}],
-                "stateMutability": "view",
-                "type": "function",
-            }
-        ]
+        Args: see transfer, plus idempotency_key (optional client key)
+        
+        Returns:
+            Job ID (str)
+        """
+        if not source_chain_ids:
+            raise ValueError('source_chain_ids cannot be empty')
         
-        factory = web3.eth.contract(
-            address=Web3.to_checksum_address(FACTORY_ADDRESS),
-            abi=factory_abi
+        payload = job_payload(
+            contract_address, source_chain_ids, amount_each, nonces, expiry,
+            destination_chain_id, target_address, signature, urgency
         )
+        keys, fingerprint = idempotency_keys('transfer', payload, idempotency_key)
+        job_id = self.jobs.lookup(keys, fingerprint)
+        if job_id is not None:
+            return job_id
         
-        # Use OPERATOR_ADDRESS from config
-        result = factory.functions.computeAddress(0, user_address, OPERATOR_ADDRESS).call()
-        return result
+        raise_if_rejected(source_chain_ids[:1], self.verify_payloads(verification_payloads(
+            source_chain_ids[:1], contract_address, source_chain_ids, amount_each, nonces, expiry,
+            destination_chain_id, target_address, signature
+        )))
+        return self.jobs.enqueue('transfer', source_chain_ids[:1], payload, keys=keys, fingerprint=fingerprint)
     
-    def get_transaction_receipt(self, tx_hash, timeout=120):
+    def verify_payloads(self, payloads):
         """
-        Wait for and return transaction receipt.
+        Check signed payloads the way PyPay.signatureVerifier would, without RPC.
         
         Args:
-            tx_hash: Transaction hash
-            timeout: Timeout in seconds (default: 120)
+            payloads: List of dicts with contract_address, chain_id, source_chain_ids,
+                amount_each, nonces, expiry, destination_chain_id, target_address
+                and signature (bytes)
         
         Returns:
-            Transaction receipt
+            List of dicts with valid, error and signer, in payload order
         """
+        with stage('verify', payloads=len(payloads)):
+            return self.verifier.verify_many(payloads)
+    
+    def get_job(self, job_id):
+        """
+        Get the state of a queued submission.
+        
+        Args:
+            job_id: Job ID returned by submit_transfer / submit_cross_chain_transfer
+        
+        Returns:
+            dict with the job state and per-chain results, or None if unknown
+        """
+        return self.jobs.get(job_id)
+    
+    def subscribe_job(self, job_id, callback, after=None):
+        """
+        Subscribe to the lifecycle events of a queued submission.
+        
+        Args:
+            job_id: Job ID returned by submit_transfer / submit_cross_chain_transfer
+            callback: Called with each event (queued, submitted, mined, delivered, done); must not block
+            after: Optional ID of the last event already seen
+        
+        Returns:
+            Callable that ends the subscription, or None if the job is unknown
+        """
+        return self.lifecycle.subscribe(job_id, callback, after)
+    
+    def _run_job(self, kind, chain_id, payload, sent, record):
+        # Called by the queue's dispatchers; sends the job on one chain
+        with stage('job', kind=kind, chain_id=chain_id):
+            try:
+                if sent is not None:
+                    # An earlier attempt signed it and may have sent it before dying
+                    tx_hash = self.resend_transaction(chain_id, sent)
+                    if tx_hash is not None:
+                        return tx_hash
+                    # Never sent: its nonce went to another transaction
+                    record(None)
+                args, value = job_call(kind, chain_id, payload)
+                try:
+                    return self.call_contract(
+                        contract_address=payload['contract_address'],
+                        function_name=kind,
+                        args=args,
+                        chain_id=chain_id,
+                        value=value,
+                        urgency=payload['urgency'],
+                        on_signed=lambda tx_hash, transaction, label: record(sent_record(tx_hash, transaction, label))
+                    )
+                except Exception as e:
+                    if is_rejection(e):
+                        # Refused, and its nonce given back: the next attempt signs a new one
+                        record(None)
+                    raise
+            except Exception as e:
+                raise_if_reverted(e)
+                raise
+    
+    def resend_transaction(self, chain_id, sent):
+        """
+        Broadcast again a job transaction whose send outcome is unknown (its worker
+        died after recording it). Signing is deterministic, so this is the same
+        transaction with the same hash, never a second transfer.
+        
+        Args:
+            chain_id: Chain ID
+            sent: Record of the signed transaction (see sent_record)
+        
+        Returns:
+            Transaction hash, or None if its nonce went to another transaction (it was never sent)
+        """
+        web3 = self.get_web3_for_chain(chain_id)
+        transaction, label = sent['transaction'], sent['label']
+        signed_txn = self.wallet_manager.sign_transaction(transaction)
+        tx_hash = signed_txn.hash.hex()
         try:
-            receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
-            return {
-                'status': 'success' if receipt['status'] == 1 else 'failed',
-                'block_number': receipt['blockNumber'],
-                'gas_used': receipt['gasUsed'],
-                'confirmations': 1,
-                'transaction_hash': receipt['transactionHash'].hex()
-            }
+            web3.eth.send_raw_transaction(signed_txn.rawTransaction)
         except Exception as e:
-            return {
-                'status': 'pending',
-                'error': str(e)
-            }
+            message = str(e).lower()
+            if 'nonce too low' in message:
+                # Mined already, or the nonce was used by another transaction
+                try:
+                    web3.eth.get_transaction_receipt(tx_hash)
+                except TransactionNotFound:
+                    return None
+            elif 'already known' not in message and 'underpriced' not in message:
+                # Underpriced: a replacement of it with the same nonce is pending
+                raise
+        
+        self.tracker.track(tx_hash, chain_id, web3=web3, label=label)
+        self.accelerator.watch(chain_id, web3, transaction, tx_hash, label=label)
+        return tx_hash
+    
+    def _compute_contract_address(self, user_address, chain_id):
+        """Compute PyPay contract address for a given user and chain."""
+        return self.compute_contract_addresses([user_address], chain_id)[0]
+    
+    def compute_contract_addresses(self, user_addresses, chain_id=None):
+        """
+        Compute the PyPay contract addresses of many users.
+        Matches Factory.computeAddress (salt 0, OPERATOR_ADDRESS from config)
+        and runs locally once the derivation has been checked on the chain.
+        
+        Args:
+            user_addresses: List of user (signer) addresses
+            chain_id: Chain ID whose Factory the derivation is checked against
+                (default: first chain in PYUSD_ADDRESSES)
+        
+        Returns:
+            List of checksummed contract addresses, in user order
+        """
+        if chain_id is None:
+            chain_id = next(iter(PYUSD_ADDRESSES))
+        for user_address in user_addresses:
+            if not is_address(user_address):
+                raise ValueError(f'Invalid address: {user_address}')
+        
+        if self._derivation_matches(chain_id):
+            return self.addresses.compute_many(user_addresses)
+        
+        # Artifacts differ from the deployed PyPay: ask the Factory, in batched reads
+        factory = self.contracts.function('Factory', 'computeAddress')
+        results = self.reads.call_many(chain_id, [
+            (FACTORY_ADDRESS, factory.encode([0, user_address, OPERATOR_ADDRESS]))
+            for user_address in user_addresses
+        ])
+        addresses = []
+        for user_address, (success, data) in zip(user_addresses, results):
+            if not success:
+                raise ValueError(f'Error computing contract address for {user_address}')
+            addresses.append(to_checksum(factory.decode(data)))
+        return addresses
+    
+    def _derivation_matches(self, chain_id):
+        matches = self._derivation_checked.get(chain_id)
+        if matches is None:
+            factory = self.contracts.function('Factory', 'computeAddress')
+            result = self.reads.call(chain_id, FACTORY_ADDRESS, factory.encode([0, OPERATOR_ADDRESS, OPERATOR_ADDRESS]))
+            matches = to_checksum(factory.decode(result)) == self.addresses.compute(OPERATOR_ADDRESS)
+            if not matches:
+                logger.warning('Local PyPay bytecode does not match the Factory on chain %s; using RPC', chain_id)
+            self._derivation_checked[chain_id] = matches
+        return matches
+    
+    def get_transaction_receipt(self, tx_hash, chain_id=None, wait=0):
+        """
+        Get transaction status from the transaction tracker.
+        
+        Args:
+            tx_hash: Transaction hash
+            chain_id: Optional chain ID (if None, looks on every configured chain)
+            wait: Seconds to wait for the transaction to be mined (default: 0)
+        
+        Returns:
+            Transaction status with confirmations and chain ID
+        """
+        return self.tracker.status(tx_hash, chain_id=chain_id, wait=wait)
     
     def check_cross_chain_received(
         self,
         target_address,
         amount_expected,
         destination_chain_id,
-        timeout=60
+        timeout=60,
+        since_block=None
     ):
         """
         Check if cross-chain transfer has been received on the destination chain.
+        Looks up credits in the arrival indexer instead of reading balances.
         
         Args:
             target_address: Address that should receive the transfer
             amount_expected: Expected amount to be received
             destination_chain_id: Destination chain ID
             timeout: Timeout in seconds (default: 60)
+            since_block: Optional first destination block to count credits from
         
         Returns:
             dict with status information
         """
         try:
-            # Get Web3 for destination chain
-            web3_dest = self.get_web3_for_chain(destination_chain_id)
-            
-            # Load token address for destination chain from config
             if destination_chain_id not in PYUSD_ADDRESSES:
                 return {'received': False, 'error': f'Unsupported chain: {destination_chain_id}'}
             
-            token_address = PYUSD_ADDRESSES[destination_chain_id]
-            
-            # Get ERC20 token contract
-            erc20_abi = [
-                {
-                    "constant": True,
-                    "inputs": [{"name": "_owner", "type": "address"}],
-                    "name": "balanceOf",
-                    "outputs": [{"name": "balance", "type": "uint256"}],
-                    "payable": False,
-                    "stateMutability": "view",
-                    "type": "function"
-                },
-                {
-                    "constant": True,
-                    "inputs": [],
-                    "name": "decimals",
-                    "outputs": [{"name": "", "type": "uint8"}],
-                    "payable": False,
-                    "stateMutability": "view",
-                    "type": "function"
-                }
-            ]
-            
-            token_contract = web3_dest.eth.contract(
-                address=Web3.to_checksum_address(token_address),
-                abi=erc20_abi
-            )
-            
-            # Check balance
-            balance = token_contract.functions.balanceOf(
-                Web3.to_checksum_address(target_address)
-            ).call()
-            
-            decimals = token_contract.functions.decimals().call()
-            balance_formatted = balance / (10 ** decimals)
-            expected_formatted = amount_expected / 1e6  # PYUSD has 6 decimals
-            
-            return {
-                'received': balance_formatted >= expected_formatted,
-                'current_balance': balance_formatted,
-                'expected_balance': expected_formatted,
-                'chain_id': destination_chain_id,
-                'address': target_address
-            }
+            return self.arrivals.check(destination_chain_id, target_address, amount_expected, since_block)
         except Exception as e:
             return {
                 'received': False,
@@ -388,40 +1016,79 @@ class ContractManager:
             Native fee in wei (as int)
         """
         try:
-            web3_source = self.get_web3_for_chain(source_chain_id)
-            
-            # Load PyPay ABI
-            pypay_abi = [
-                {
-                    "inputs": [
-                        {"internalType": "uint256", "name": "sourceChainId", "type": "uint256"},
-                        {"internalType": "uint256", "name": "destinationChainId", "type": "uint256"},
-                        {"internalType": "uint256", "name": "amount", "type": "uint256"},
-                        {"internalType": "address", "name": "targetAddress", "type": "address"}
-                    ],
-                    "name": "getQuoteNativeFee",
-                    "outputs": [
-                        {"internalType": "uint256", "name": "nativeFee", "type": "uint256"}
-                    ],
-                    "stateMutability": "view",
-                    "type": "function"
-                }
-            ]
-            
-            contract = web3_source.eth.contract(
-                address=Web3.to_checksum_address(contract_address),
-                abi=pypay_abi
-            )
+            quote = self.contracts.function('QuoteFee', 'getQuoteNativeFee')
             
-            # Call view function
-            native_fee = contract.functions.getQuoteNativeFee(
+            # Call view function; the read is batched with concurrent calls
+            calldata = quote.encode([
                 source_chain_id,
                 destination_chain_id,
                 int(amount),
-                Web3.to_checksum_address(target_address)
-            ).call()
+                to_checksum(target_address)
+            ])
+            result = self.reads.call(source_chain_id, contract_address, calldata)
             
-            return native_fee
+            return quote.decode(result)
         except Exception as e:
             raise ValueError(f'Error querying native fee: {str(e)}')
-
+    
+    def get_native_fee_quote(
+        self,
+        contract_address,
+        source_chain_id,
+        destination_chain_id,
+        amount,
+        target_address,
+        force_refresh=False
+    ):
+        """
+        Get the native fee for a cross-chain transfer from the quote cache.
+        
+        Args:
+            contract_address: PyPay contract address
+            source_chain_id: Source chain ID
+            destination_chain_id: Destination chain ID
+            amount: Amount to transfer (rounded to a bucket)
+            target_address: Target address
+            force_refresh: Query the contract even if a fresh quote is cached
+        
+        Returns:
+            dict with native_fee (int), block_number and age (seconds)
+        """
+        try:
+            return self.quotes.get(
+                contract_address,
+                source_chain_id,
+                destination_chain_id,
+                amount,
+                target_address,
+                force_refresh=force_refresh
+            )
+        except Exception as e:
+            raise ValueError(f'Error querying native fee: {str(e)}')
+    
+    def get_pyusd_balances(self, addresses, chain_ids=None):
+        """
+        Get PYUSD balances of many addresses, one batched read per chain.
+        
+        Args:
+            addresses: List of addresses
+            chain_ids: Optional list of chain IDs (default: every chain in PYUSD_ADDRESSES)
+        
+        Returns:
+            dict mapping chain ID to {address: balance in base units}
+        """
+        chain_ids = list(chain_ids or PYUSD_ADDRESSES)
+        for chain_id in chain_ids:
+            if chain_id not in PYUSD_ADDRESSES:
+                raise ValueError(f'Unsupported chain: {chain_id}')
+        
+        # Chains are independent; query them in parallel
+        with ThreadPoolExecutor(max_workers=len(chain_ids)) as executor:
+            results = executor.map(
+                lambda chain_id: self.reads.token_balances(chain_id, PYUSD_ADDRESSES[chain_id], addresses),
+                chain_ids
+            )
+            return {
+                chain_id: dict(zip(addresses, balances))
+                for chain_id, balances in zip(chain_ids, results)
+            }
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Contract Registry for ABIs, function codecs and contract instances.
+ABIs are parsed once; each function gets its selector and a prebuilt
+eth_abi encoder/decoder, so hot paths encode calldata and decode results
+without rebuilding contract objects.
+"""
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from eth_abi.abi import default_codec
+from eth_abi.registry import registry
+from eth_utils.abi import collapse_if_tuple
+from web3 import Web3
+from config import CONTRACT_CACHE_SIZE
+
+
+@lru_cache(maxsize=CONTRACT_CACHE_SIZE)
+def to_checksum(address):
+    """Checksummed form of an address, cached."""
+    return Web3.to_checksum_address(address)
+
+
+class FunctionCodec:
+    """Selector and ABI codec for one contract function."""
+
+    def __init__(self, abi_entry):
+        """
+        Prepare the codec.
+
+        Args:
+            abi_entry: ABI entry of the function
+        """
+        self.name = abi_entry['name']
+        self.input_types = [collapse_if_tuple(arg) for arg in abi_entry.get('inputs', [])]
+        self.output_types = [collapse_if_tuple(arg) for arg in abi_entry.get('outputs', [])]
+        self.signature = f'{self.name}({",".join(self.input_types)})'
+        self.selector = Web3.keccak(text=self.signature)[:4]
+        self.payable = abi_entry.get('stateMutability') == 'payable'
+
+        self._encoder = registry.get_tuple_encoder(*self.input_types)
+        self._decoder = registry.get_tuple_decoder(*self.output_types)
+
+    def encode(self, args):
+        """
+        Encode a call.
+
+        Args:
+            args: Function arguments, in ABI order
+
+        Returns:
+            Calldata (bytes): selector followed by the encoded arguments
+        """
+        return self.selector + self._encoder(list(args))
+
+    def decode(self, data):
+        """
+        Decode return data.
+
+        Args:
+            data: Raw return data (bytes)
+
+        Returns:
+            The single return value, or a tuple when the function returns several
+        """
+        values = self._decoder(default_codec.stream_class(bytes(data)))
+        return values[0] if len(values) == 1 else values
+
+
+class ContractRegistry:
+    """ABIs and codecs by name, and contract instances by (chain, address, ABI)."""
+
+    def __init__(self, max_contracts=None):
+        """
+        Initialize the registry.
+
+        Args:
+            max_contracts: Contract instances kept (default: CONTRACT_CACHE_SIZE)
+        """
+        self.max_contracts = max_contracts or CONTRACT_CACHE_SIZE
+        self._abis = {}       # ABI name -> ABI list
+        self._functions = {}  # ABI name -> {function name: FunctionCodec}
+        self._contracts = OrderedDict()  # (chain_id, address, ABI name) -> contract, LRU order
+        self._lock = threading.Lock()
+
+    def register(self, name, abi):
+        """
+        Register an ABI and prepare codecs for its functions.
+
+        Args:
+            name: ABI name (e.g. 'PyPay')
+            abi: ABI list
+        """
+        self._functions[name] = {
+            entry['name']: FunctionCodec(entry)
+            for entry in abi
+            if entry.get('type') == 'function'
+        }
+        self._abis[name] = abi
+
+    def abi(self, name):
+        """Return a registered ABI."""
+        return self._abis[name]
+
+    def function(self, name, function_name):
+        """
+        Get the codec of a function.
+
+        Args:
+            name: ABI name
+            function_name: Function name
+
+        Returns:
+            FunctionCodec
+        """
+        try:
+            return self._functions[name][function_name]
+        except KeyError:
+            raise ValueError(f'Unknown function {function_name} in {name} ABI')
+
+    def contract(self, web3, chain_id, address, name):
+        """
+        Get a web3 contract instance, created once per (chain, address, ABI).
+
+        Args:
+            web3: Web3 instance for the chain
+            chain_id: Chain ID
+            address: Contract address
+            name: ABI name
+
+        Returns:
+            web3 Contract
+        """
+        key = (chain_id, to_checksum(address), name)
+        with self._lock:
+            contract = self._contracts.get(key)
+            if contract is not None:
+                self._contracts.move_to_end(key)
+                return contract
+
+        contract = web3.eth.contract(address=key[1], abi=self._abis[name])
+        with self._lock:
+            self._contracts[key] = contract
+            while len(self._contracts) > self.max_contracts:
+                self._contracts.popitem(last=False)
+        return contract
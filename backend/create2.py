@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Offline CREATE2 address derivation for PyPay contracts.
+Computes the same address as Factory.computeAddress: the PyPay creation
+bytecode followed by abi.encode(signer, operator), deployed by the Factory
+with salt bytes32(salt_int). No RPC is involved.
+"""
+
+from functools import lru_cache
+from eth_abi import encode
+from web3 import Web3
+from config import FACTORY_ADDRESS, OPERATOR_ADDRESS, ADDRESS_CACHE_SIZE
+
+
+def create2_address(deployer, salt, init_code_hash):
+    """
+    Address of a contract deployed with CREATE2.
+
+    Args:
+        deployer: Deploying contract address
+        salt: 32-byte salt
+        init_code_hash: keccak256 of the init code
+
+    Returns:
+        Checksummed contract address
+    """
+    digest = Web3.keccak(b'\xff' + bytes.fromhex(deployer[2:]) + salt + init_code_hash)
+    return Web3.to_checksum_address(digest[12:])
+
+
+class PyPayAddressDeriver:
+    """Derives PyPay contract addresses locally, with an LRU cache."""
+
+    def __init__(self, creation_code, factory_address=None, operator_address=None, cache_size=None):
+        """
+        Initialize the deriver.
+
+        Args:
+            creation_code: PyPay creation bytecode (hex string or bytes)
+            factory_address: Factory address (default: FACTORY_ADDRESS)
+            operator_address: Operator address (default: OPERATOR_ADDRESS)
+            cache_size: Derived addresses kept (default: ADDRESS_CACHE_SIZE)
+        """
+        if isinstance(creation_code, str):
+            creation_code = bytes.fromhex(creation_code[2:] if creation_code.startswith('0x') else creation_code)
+        if not creation_code:
+            raise ValueError('PyPay creation bytecode is empty')
+
+        self.creation_code = creation_code
+        self.factory_address = Web3.to_checksum_address(factory_address or FACTORY_ADDRESS)
+        self.operator_address = Web3.to_checksum_address(operator_address or OPERATOR_ADDRESS)
+        self._derive = lru_cache(maxsize=cache_size or ADDRESS_CACHE_SIZE)(self._derive_uncached)
+
+    def compute(self, signer, salt=0):
+        """
+        Compute the PyPay contract address of a signer.
+
+        Args:
+            signer: Signer (user) address
+            salt: Salt as an integer, as passed to Factory.computeAddress
+
+        Returns:
+            Checksummed contract address
+        """
+        return self._derive(Web3.to_checksum_address(signer), salt)
+
+    def compute_many(self, signers, salt=0):
+        """
+        Compute the PyPay contract addresses of many signers.
+
+        Args:
+            signers: List of signer addresses
+            salt: Salt as an integer
+
+        Returns:
+            List of checksummed contract addresses, in signer order
+        """
+        return [self.compute(signer, salt) for signer in signers]
+
+    def _derive_uncached(self, signer, salt):
+        init_code = self.creation_code + encode(['address', 'address'], [signer, self.operator_address])
+        return create2_address(self.factory_address, salt.to_bytes(32, 'big'), Web3.keccak(init_code))
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Fee Oracle for EIP-1559 transaction pricing.
+Follows each chain's head in the background, caches fee history and learns
+gas limits from receipts, so sends need no extra fee RPC. Gas is learned
+per function and payload size, since transfers grow with their arrays; a
+size not seen yet is estimated once.
+"""
+
+import threading
+from collections import deque
+from web3.exceptions import ContractLogicError
+from config import (
+    FEE_HISTORY_BLOCKS, FEE_URGENCY_PERCENTILES,
+    DEFAULT_GAS_LIMIT, GAS_LIMIT_MULTIPLIER, GAS_SAMPLES
+)
+
+
+def gas_label(function_name, args):
+    """
+    Gas-model label of a contract call: the function name and the length of
+    its array arguments (source chains for transfer / CrossChainTransfer).
+
+    Args:
+        function_name: Contract function name
+        args: Function arguments
+
+    Returns:
+        Label, e.g. 'transfer:2'
+    """
+    size = max((len(arg) for arg in args if isinstance(arg, (list, tuple))), default=0)
+    return f'{function_name}:{size}' if size else function_name
+
+
+class FeeOracle:
+    """Per-chain EIP-1559 fee and gas-limit oracle."""
+
+    def __init__(self, heads):
+        """
+        Initialize the oracle.
+
+        Args:
+            heads: HeadFollower that drives the per-block refresh
+        """
+        self.heads = heads
+        self._fees = {}        # chain_id -> {urgency: fee fields}
+        self._web3 = {}        # chain_id -> Web3
+        self._gas_samples = {}  # (chain_id, gas label) -> deque of gasUsed
+        self._gas_estimates = {}  # (chain_id, gas label) -> estimated gas, until receipts are seen
+        self._lock = threading.Lock()
+
+        heads.subscribe(self._on_block)
+
+    def get_fees(self, web3, chain_id, urgency='normal'):
+        """
+        Get transaction fee fields for the chain from memory.
+
+        Args:
+            web3: Web3 instance for the chain
+            chain_id: Chain ID
+            urgency: 'fast', 'normal' or 'cheap'
+
+        Returns:
+            dict with maxFeePerGas/maxPriorityFeePerGas, or gasPrice on legacy chains
+        """
+        if urgency not in FEE_URGENCY_PERCENTILES:
+            raise ValueError(f'Unknown urgency: {urgency}')
+
+        if chain_id not in self._web3:
+            self._web3[chain_id] = web3
+            self.heads.follow(chain_id, web3)
+
+        fees = self._fees.get(chain_id)
+        if fees is None:
+            # First use of this chain: fetch synchronously once
+            fees = self.refresh(chain_id)
+        return dict(fees[urgency])
+
+    def refresh(self, chain_id):
+        """
+        Refresh cached fees for the chain from eth_feeHistory.
+
+        Args:
+            chain_id: Chain ID
+
+        Returns:
+            dict mapping urgency to fee fields
+        """
+        web3 = self._web3[chain_id]
+        percentiles = list(FEE_URGENCY_PERCENTILES.values())
+        history = web3.eth.fee_history(FEE_HISTORY_BLOCKS, 'latest', percentiles)
+
+        base_fees = history.get('baseFeePerGas') or []
+        if not base_fees or base_fees[-1] is None:
+            # Legacy chain without a base fee
+            gas_price = web3.eth.gas_price
+            fees = {urgency: {'gasPrice': gas_price} for urgency in FEE_URGENCY_PERCENTILES}
+        else:
+            # Last entry is the base fee of the next block
+            next_base_fee = base_fees[-1]
+            rewards = history.get('reward') or []
+            fees = {}
+            for index, urgency in enumerate(FEE_URGENCY_PERCENTILES):
+                tips = sorted(block_rewards[index] for block_rewards in rewards if block_rewards)
+                priority_fee = tips[len(tips) // 2] if tips else 0
+                fees[urgency] = {
+                    # Allow for the base fee doubling before inclusion
+                    'maxFeePerGas': 2 * next_base_fee + priority_fee,
+                    'maxPriorityFeePerGas': priority_fee
+                }
+
+        self._fees[chain_id] = fees
+        return fees
+
+    def gas_limit(self, chain_id, label, web3=None, transaction=None):
+        """
+        Get the gas limit for a contract call, learned from past receipts.
+        Until a label has receipts, the call is estimated once (when web3 and
+        transaction are given). Never below DEFAULT_GAS_LIMIT.
+
+        Args:
+            chain_id: Chain ID
+            label: Gas label of the call (see gas_label)
+            web3: Optional Web3 instance for the chain, for the estimate
+            transaction: Optional transaction dict (from, to, data, value) to estimate
+
+        Returns:
+            Gas limit (int)
+
+        Raises:
+            ContractLogicError: The estimated call reverts; sending it would be a paid revert
+        """
+        key = (chain_id, label)
+        samples = self._gas_samples.get(key)
+        if samples:
+            gas = max(samples)
+        else:
+            gas = self._gas_estimates.get(key)
+            if gas is None and web3 is not None and transaction is not None:
+                try:
+                    gas = web3.eth.estimate_gas(
+                        {field: transaction[field] for field in ('from', 'to', 'data', 'value') if field in transaction}
+                    )
+                except ContractLogicError:
+                    raise
+                except Exception:
+                    # e.g. RPC down; the floor is used
+                    gas = None
+                else:
+                    self._gas_estimates[key] = gas
+        return max(int((gas or 0) * GAS_LIMIT_MULTIPLIER), DEFAULT_GAS_LIMIT)
+
+    def observe_gas(self, chain_id, label, gas_used):
+        """Record the gas used by a mined transaction."""
+        with self._lock:
+            samples = self._gas_samples.setdefault((chain_id, label), deque(maxlen=GAS_SAMPLES))
+            samples.append(gas_used)
+
+    def observe_receipt(self, chain_id, label, receipt):
+        """Feed a transaction receipt summary from the tracker into the gas-limit model."""
+        if label and receipt['status'] == 'success':
+            self.observe_gas(chain_id, label, receipt['gas_used'])
+
+    def _on_block(self, chain_id, web3, block_number, new_head):
+        if new_head and chain_id in self._web3:
+            self.refresh(chain_id)
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Gunicorn settings for app.py.
+The app is preloaded once in the master (web layer and chain modules, but
+no connections or threads) and forked into workers; each worker then warms
+its own wallet and contract managers in the background.
+
+Run with: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import os
+from config import DEFAULT_PORT
+
+bind = f"0.0.0.0:{os.getenv('PORT', DEFAULT_PORT)}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+preload_app = True
+
+
+def when_ready(server):
+    # Import web3 and the managers once so forked workers share them
+    from services import preload
+    preload()
+
+
+def post_fork(server, worker):
+    from app import services
+    services.warm()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Head Follower shared by background services.
+Polls each chain's block number once and notifies subscribers on every new head.
+"""
+
+import threading
+import time
+from config import HEAD_POLL_INTERVAL
+
+
+class HeadFollower:
+    """Follows the head block of each chain in one background thread per chain."""
+
+    def __init__(self, poll_interval=None):
+        """Initialize the follower; chains are followed from their first use."""
+        self.poll_interval = poll_interval or HEAD_POLL_INTERVAL
+        self._heads = {}        # chain_id -> latest block number
+        self._polled_at = {}    # chain_id -> monotonic time of the last successful poll
+        self._web3 = {}         # chain_id -> Web3
+        self._wake = {}         # chain_id -> Event to force an early tick
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def follow(self, chain_id, web3):
+        """
+        Start following a chain if it is not followed yet.
+
+        Args:
+            chain_id: Chain ID
+            web3: Web3 instance for the chain
+        """
+        if chain_id in self._web3:
+            return
+        with self._lock:
+            if chain_id in self._web3:
+                return
+            self._web3[chain_id] = web3
+            self._wake[chain_id] = threading.Event()
+            thread = threading.Thread(
+                target=self._follow_loop,
+                args=(chain_id,),
+                name=f'head-follower-{chain_id}',
+                daemon=True
+            )
+            thread.start()
+
+    def subscribe(self, callback):
+        """
+        Register a callback for new heads.
+
+        Args:
+            callback: Called as callback(chain_id, web3, block_number, new_head).
+                      new_head is False when the tick was forced by wake().
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def head(self, chain_id):
+        """Return the latest known block number of the chain, or None."""
+        return self._heads.get(chain_id)
+
+    def head_age(self, chain_id):
+        """Return seconds since the chain's head was last polled successfully, or None."""
+        polled_at = self._polled_at.get(chain_id)
+        return None if polled_at is None else time.monotonic() - polled_at
+
+    def chain_ids(self):
+        """Return the followed chain IDs."""
+        return list(self._web3)
+
+    def wake(self, chain_id):
+        """Run subscribers for the chain on the next loop iteration without waiting for a new block."""
+        event = self._wake.get(chain_id)
+        if event is not None:
+            event.set()
+
+    def stop(self):
+        """Stop all follower threads."""
+        self._stop.set()
+        for event in self._wake.values():
+            event.set()
+
+    def _follow_loop(self, chain_id):
+        web3 = self._web3[chain_id]
+        wake = self._wake[chain_id]
+        first = True
+        while not self._stop.is_set():
+            if not first:
+                wake.wait(self.poll_interval)
+            first = False
+            forced = wake.is_set()
+            wake.clear()
+
+            try:
+                block_number = web3.eth.block_number
+            except Exception:
+                # Keep the last known head; retry on the next tick
+                continue
+            self._polled_at[chain_id] = time.monotonic()
+
+            new_head = block_number != self._heads.get(chain_id)
+            if not new_head and not forced:
+                continue
+            self._heads[chain_id] = block_number
+
+            for callback in list(self._subscribers):
+                try:
+                    callback(chain_id, web3, block_number, new_head)
+                except Exception:
+                    continue
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Job Queue for transaction submissions.
+Endpoints persist a job to a SQLite store and return at once; per-chain
+dispatcher workers drain the queue with retries and backoff. A job has
+one task per chain it is sent on, so chains are dispatched independently.
+Tasks claimed by a worker that died are picked up again once their lease
+expires, giving at-least-once delivery across restarts. A task records
+its signed transaction before broadcasting it, so a task picked up again
+re-sends that transaction instead of a new one. Jobs can carry
+idempotency keys, so a retried submission maps to the job already queued.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from config import (
+    STATE_DIR, JOB_WORKERS_PER_CHAIN, JOB_MAX_ATTEMPTS, JOB_RETRY_BASE, JOB_RETRY_MAX,
+    JOB_LEASE, JOB_POLL_INTERVAL, IDEMPOTENCY_TTL, IDEMPOTENCY_MAX_KEYS
+)
+
+# Task states
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class IdempotencyConflict(ValueError):
+    """An idempotency key was reused for a different request."""
+
+
+class PermanentError(Exception):
+    """A send that fails the same way on every attempt (e.g. the call reverts); not retried."""
+
+
+def _is_permanent(error):
+    return isinstance(error, PermanentError)
+
+
+class JobQueue:
+    """Durable submission queue with per-chain dispatcher workers."""
+
+    def __init__(self, handler, db_path=None, workers_per_chain=None):
+        """
+        Initialize the queue.
+
+        Args:
+            handler: Callable (kind, chain_id, payload, sent, record) returning a transaction
+                hash. Before broadcasting, it passes a JSON-serializable record of the
+                signed transaction to record(), and record(None) once the node has refused
+                it. If the task runs again (after a failed attempt or a crash), sent is
+                the record still held (otherwise None).
+            db_path: Optional SQLite file path (default: JOBS_DB_PATH env or STATE_DIR/jobs.db)
+            workers_per_chain: Dispatcher threads per chain (default: JOB_WORKERS_PER_CHAIN)
+        """
+        if db_path is None:
+            db_path = os.getenv('JOBS_DB_PATH') or os.path.join(
+                os.getenv('STATE_DIR', STATE_DIR), 'jobs.db'
+            )
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self.handler = handler
+        self.db_path = db_path
+        self.workers_per_chain = workers_per_chain or JOB_WORKERS_PER_CHAIN
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wake = {}  # chain_id -> Condition notified on new tasks
+        self._listeners = []
+
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            ' id TEXT PRIMARY KEY,'
+            ' kind TEXT NOT NULL,'
+            ' payload TEXT NOT NULL,'
+            ' created_at REAL NOT NULL)'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS tasks ('
+            ' job_id TEXT NOT NULL,'
+            ' chain_id INTEGER NOT NULL,'
+            ' state TEXT NOT NULL,'
+            ' attempts INTEGER NOT NULL DEFAULT 0,'
+            ' next_attempt_at REAL NOT NULL,'
+            ' lease_until REAL,'
+            ' tx_hash TEXT,'
+            ' error TEXT,'
+            ' updated_at REAL NOT NULL,'
+            ' sent TEXT,'
+            ' lease_owner TEXT,'
+            ' PRIMARY KEY (job_id, chain_id))'
+        )
+        columns = [column[1] for column in conn.execute('PRAGMA table_info(tasks)')]
+        if 'sent' not in columns:
+            # Stores created before tasks recorded their signed transaction
+            conn.execute('ALTER TABLE tasks ADD COLUMN sent TEXT')
+        if 'lease_owner' not in columns:
+            # Stores created before claims were fenced by owner
+            conn.execute('ALTER TABLE tasks ADD COLUMN lease_owner TEXT')
+        conn.execute('CREATE INDEX IF NOT EXISTS tasks_due ON tasks (chain_id, state, next_attempt_at)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS idempotency ('
+            ' key TEXT PRIMARY KEY,'
+            ' fingerprint TEXT NOT NULL,'
+            ' job_id TEXT NOT NULL,'
+            ' created_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS idempotency_age ON idempotency (created_at)')
+
+        # Resume chains with work left over from a previous run
+        for (chain_id,) in conn.execute(
+            'SELECT DISTINCT chain_id FROM tasks WHERE state IN (?, ?)', (QUEUED, RUNNING)
+        ).fetchall():
+            self._start(chain_id)
+
+    def _connect(self):
+        # SQLite connections cannot be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, kind, chain_ids, payload, keys=(), fingerprint=None):
+        """
+        Persist a job and wake the dispatchers of its chains.
+        With idempotency keys, a job queued earlier under any of them is
+        returned instead; concurrent duplicates resolve to the same job.
+
+        Args:
+            kind: Job kind, passed to the handler (e.g. contract function name)
+            chain_ids: Chains the job is sent on, one task each
+            payload: JSON-serializable job arguments
+            keys: Optional idempotency keys of the request
+            fingerprint: Request fingerprint the keys must match (see lookup)
+
+        Returns:
+            Job ID (str)
+        """
+        chain_ids = list(dict.fromkeys(chain_ids))
+        if not chain_ids:
+            raise ValueError('A job needs at least one chain')
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        # BEGIN IMMEDIATE serializes duplicates across threads and processes
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            existing = self._find_key(conn, keys, fingerprint, now)
+            if existing is not None:
+                conn.execute('COMMIT')
+                return existing
+            conn.execute(
+                'INSERT INTO jobs (id, kind, payload, created_at) VALUES (?, ?, ?, ?)',
+                (job_id, kind, json.dumps(payload), now)
+            )
+            conn.executemany(
+                'INSERT INTO tasks (job_id, chain_id, state, next_attempt_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                [(job_id, chain_id, QUEUED, now, now) for chain_id in chain_ids]
+            )
+            if keys:
+                self._remember(conn, keys, fingerprint, job_id, now)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        for chain_id in chain_ids:
+            self._start(chain_id)
+            with self._wake[chain_id]:
+                self._wake[chain_id].notify()
+        return job_id
+
+    def lookup(self, keys, fingerprint=None):
+        """
+        Find the job queued under any of a request's idempotency keys.
+
+        Args:
+            keys: Idempotency keys of the request
+            fingerprint: Request fingerprint; a key stored with another one raises
+
+        Returns:
+            Job ID, or None if no live job was queued under the keys (a job whose
+            every task failed does not count, so the request may be sent again)
+
+        Raises:
+            IdempotencyConflict: A key was used for a different request
+        """
+        return self._find_key(self._connect(), keys, fingerprint, time.time())
+
+    def add_listener(self, callback):
+        """
+        Register a callback for finished send attempts in this process.
+
+        Args:
+            callback: Called as callback(job_id, chain_id, task state)
+        """
+        self._listeners.append(callback)
+
+    def payload(self, job_id):
+        """
+        Get the arguments a job was queued with.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            The job payload, or None if the job does not exist
+        """
+        row = self._connect().execute('SELECT payload FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def get(self, job_id):
+        """
+        Get the state of a job.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            dict with job_id, kind, state, created_at, tx_hash, tx_hashes and
+            per-chain results, or None if the job does not exist
+        """
+        conn = self._connect()
+        job = conn.execute('SELECT kind, created_at FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if job is None:
+            return None
+
+        results = {}
+        for chain_id, state, attempts, tx_hash, error in conn.execute(
+            'SELECT chain_id, state, attempts, tx_hash, error FROM tasks WHERE job_id = ? ORDER BY rowid',
+            (job_id,)
+        ):
+            result = {'state': state, 'attempts': attempts}
+            if tx_hash is not None:
+                result['tx_hash'] = tx_hash
+            if error is not None:
+                result['error'] = error
+            results[chain_id] = result
+
+        states = {result['state'] for result in results.values()}
+        if states == {SUCCEEDED}:
+            state = SUCCEEDED
+        elif states <= {SUCCEEDED, FAILED}:
+            state = FAILED
+        elif states == {QUEUED}:
+            state = QUEUED
+        else:
+            state = RUNNING
+
+        tx_hashes = {chain_id: result['tx_hash'] for chain_id, result in results.items() if 'tx_hash' in result}
+        return {
+            'job_id': job_id,
+            'kind': job[0],
+            'state': state,
+            'created_at': job[1],
+            'tx_hash': next(iter(tx_hashes.values()), None),
+            'tx_hashes': tx_hashes,
+            'results': results
+        }
+
+    def _find_key(self, conn, keys, fingerprint, now):
+        for key in keys:
+            row = conn.execute(
+                'SELECT fingerprint, job_id FROM idempotency WHERE key = ? AND created_at >= ?',
+                (key, now - IDEMPOTENCY_TTL)
+            ).fetchone()
+            if row is None:
+                continue
+            if row[0] != fingerprint:
+                raise IdempotencyConflict(f'Idempotency key already used for a different request (job {row[1]})')
+            if conn.execute(
+                'SELECT 1 FROM tasks WHERE job_id = ? AND state != ? LIMIT 1', (row[1], FAILED)
+            ).fetchone() is not None:
+                return row[1]
+        return None
+
+    def _remember(self, conn, keys, fingerprint, job_id, now):
+        conn.executemany(
+            'INSERT OR REPLACE INTO idempotency (key, fingerprint, job_id, created_at) VALUES (?, ?, ?, ?)',
+            [(key, fingerprint, job_id, now) for key in keys]
+        )
+        # Expired keys, then the oldest beyond the cap (rowids grow with each insert)
+        conn.execute('DELETE FROM idempotency WHERE created_at < ?', (now - IDEMPOTENCY_TTL,))
+        conn.execute(
+            'DELETE FROM idempotency WHERE rowid <= (SELECT MAX(rowid) FROM idempotency) - ?',
+            (IDEMPOTENCY_MAX_KEYS,)
+        )
+
+    def _start(self, chain_id):
+        if chain_id in self._wake:
+            return
+        with self._lock:
+            if chain_id in self._wake:
+                return
+            self._wake[chain_id] = threading.Condition()
+            for i in range(self.workers_per_chain):
+                thread = threading.Thread(
+                    target=self._dispatch_loop,
+                    args=(chain_id,),
+                    name=f'job-dispatcher-{chain_id}-{i}',
+                    daemon=True
+                )
+                thread.start()
+
+    def _dispatch_loop(self, chain_id):
+        wake = self._wake[chain_id]
+        while True:
+            try:
+                task = self._claim(chain_id)
+            except sqlite3.Error:
+                task = None
+            if task is None:
+                # Poll as well, so tasks enqueued by other processes and retries come due
+                with wake:
+                    wake.wait(JOB_POLL_INTERVAL)
+                continue
+            self._run(chain_id, *task)
+
+    def _claim(self, chain_id):
+        now = time.time()
+        owner = uuid.uuid4().hex
+        conn = self._connect()
+
+        # BEGIN IMMEDIATE serializes claims across threads and processes
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tasks.job_id, tasks.attempts, jobs.kind, jobs.payload, tasks.sent FROM tasks'
+                ' JOIN jobs ON jobs.id = tasks.job_id'
+                ' WHERE tasks.chain_id = ?'
+                ' AND ((tasks.state = ? AND tasks.next_attempt_at <= ?)'
+                '  OR (tasks.state = ? AND tasks.lease_until < ?))'
+                ' ORDER BY tasks.next_attempt_at LIMIT 1',
+                (chain_id, QUEUED, now, RUNNING, now)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    'UPDATE tasks SET state = ?, attempts = attempts + 1, lease_until = ?, lease_owner = ?, updated_at = ?'
+                    ' WHERE job_id = ? AND chain_id = ?',
+                    (RUNNING, now + JOB_LEASE, owner, now, row[0], chain_id)
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        if row is None:
+            return None
+        job_id, attempts, kind, payload, sent = row
+        return job_id, owner, attempts + 1, kind, json.loads(payload), None if sent is None else json.loads(sent)
+
+    def _run(self, chain_id, job_id, owner, attempt, kind, payload, sent):
+        def record(signed):
+            # Committed before the broadcast: a crash after it leaves the transaction to re-send
+            self._connect().execute(
+                'UPDATE tasks SET sent = ? WHERE job_id = ? AND chain_id = ? AND lease_owner = ?',
+                (None if signed is None else json.dumps(signed), job_id, chain_id, owner)
+            )
+
+        try:
+            tx_hash = self.handler(kind, chain_id, payload, sent, record)
+        except Exception as e:
+            now = time.time()
+            if attempt >= JOB_MAX_ATTEMPTS or _is_permanent(e):
+                state, next_attempt_at = FAILED, now
+            else:
+                state = QUEUED
+                next_attempt_at = now + min(JOB_RETRY_BASE * 2 ** (attempt - 1), JOB_RETRY_MAX)
+            # The record is kept: a send that failed in transport may have reached the node,
+            # so the next attempt re-sends it (the handler drops it with record(None) if refused)
+            self._finish(job_id, chain_id, owner, state, next_attempt_at=next_attempt_at, error=str(e), keep_sent=True)
+            return
+
+        self._finish(job_id, chain_id, owner, SUCCEEDED, tx_hash=tx_hash)
+
+    def _finish(self, job_id, chain_id, owner, state, next_attempt_at=None, tx_hash=None, error=None, keep_sent=False):
+        now = time.time()
+        cursor = self._connect().execute(
+            'UPDATE tasks SET state = ?, next_attempt_at = COALESCE(?, next_attempt_at), lease_until = NULL,'
+            ' lease_owner = NULL, tx_hash = ?, error = ?, updated_at = ?, sent = CASE WHEN ? THEN sent END'
+            ' WHERE job_id = ? AND chain_id = ? AND lease_owner = ?',
+            (state, next_attempt_at, tx_hash, error, now, keep_sent, job_id, chain_id, owner)
+        )
+        if cursor.rowcount == 0:
+            # The lease expired and another worker took the task over; its outcome stands
+            return
+        for callback in self._listeners:
+            try:
+                callback(job_id, chain_id, state)
+            except Exception:
+                continue
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Lifecycle events of submitted jobs, pushed to subscribers.
+A job's events (queued, submitted, mined, delivered, done) are derived from
+state the backend already follows per chain: the job queue, the transaction
+tracker's receipts and the arrival indexer. They are re-derived when one of
+those reports progress on a chain the job touches, so any number of
+subscribers cost no RPC calls of their own.
+"""
+
+import threading
+import time
+from job_queue import FAILED
+
+
+class LifecycleWatcher:
+    """Derives job lifecycle events from the shared per-chain watchers and fans them out."""
+
+    def __init__(self, jobs, tracker, arrivals, heads):
+        """
+        Initialize the watcher.
+
+        Args:
+            jobs: JobQueue the jobs were submitted to
+            tracker: TransactionTracker for receipts of the sent transactions
+            arrivals: ArrivalIndexer for LayerZero deliveries
+            heads: HeadFollower, for job progress made by other processes
+        """
+        self.jobs = jobs
+        self.tracker = tracker
+        self.arrivals = arrivals
+        self._watched = {}  # job_id -> {'payload', 'chains', 'keys', 'events', 'subscribers'}
+        self._lock = threading.RLock()
+
+        heads.subscribe(self._on_block)
+        tracker.add_listener(self._on_receipt)
+        arrivals.add_listener(self._on_indexed)
+        jobs.add_listener(self._on_task)
+
+    def subscribe(self, job_id, callback, after=None):
+        """
+        Subscribe to the events of a job.
+
+        Args:
+            job_id: Job ID
+            callback: Called as callback(event) for each event in order, starting
+                with the events the job has already reached. Must not block.
+            after: Optional ID of the last event already seen (Last-Event-ID);
+                events up to it are not replayed
+
+        Returns:
+            Callable that ends the subscription, or None if the job does not exist
+        """
+        payload = self.jobs.payload(job_id)
+        if payload is None:
+            return None
+
+        with self._lock:
+            watched = self._watched.get(job_id)
+            if watched is None:
+                watched = self._watched[job_id] = {
+                    'payload': payload,
+                    'chains': set(),
+                    'keys': set(),
+                    'events': [],
+                    'subscribers': []
+                }
+                self._update(job_id)
+            for event in watched['events']:
+                if after is None or event['id'] > after:
+                    callback(event)
+            watched['subscribers'].append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                watched['subscribers'].remove(callback)
+                if not watched['subscribers']:
+                    self._watched.pop(job_id, None)
+
+        return unsubscribe
+
+    def _on_block(self, chain_id, web3, block_number, new_head):
+        if new_head:
+            self._update_chain(chain_id)
+
+    def _on_receipt(self, chain_id, label, receipt):
+        self._update_chain(chain_id)
+
+    def _on_indexed(self, chain_id, block_number):
+        self._update_chain(chain_id)
+
+    def _on_task(self, job_id, chain_id, state):
+        with self._lock:
+            if job_id in self._watched:
+                self._update(job_id)
+
+    def _update_chain(self, chain_id):
+        with self._lock:
+            for job_id in [job_id for job_id, watched in self._watched.items() if chain_id in watched['chains']]:
+                self._update(job_id)
+
+    def _update(self, job_id):
+        # Called with the lock held; emits the events reached since the last update
+        watched = self._watched[job_id]
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        watched['chains'] = set(job['results'])
+        if job['kind'] == 'CrossChainTransfer':
+            watched['chains'].add(watched['payload']['destination_chain_id'])
+
+        for key, event in self._reached(job, watched['payload']):
+            if key in watched['keys']:
+                continue
+            watched['keys'].add(key)
+            event = {'id': len(watched['events']), 'job_id': job_id, 'time': time.time(), **event}
+            watched['events'].append(event)
+            for callback in list(watched['subscribers']):
+                try:
+                    callback(event)
+                except Exception:
+                    continue
+
+    def _reached(self, job, payload):
+        # Events the job has reached so far, in order, keyed for de-duplication.
+        # Events already emitted stay emitted (e.g. a receipt reorged out).
+        reached = [('queued', {'event': 'queued', 'kind': job['kind'], 'chain_ids': list(job['results'])})]
+        mined = {}
+        failed = False
+
+        for chain_id, result in job['results'].items():
+            if result['state'] == FAILED:
+                failed = True
+                reached.append((('failed', chain_id), {
+                    'event': 'failed',
+                    'chain_id': chain_id,
+                    'error': result.get('error')
+                }))
+                continue
+            tx_hash = result.get('tx_hash')
+            if tx_hash is None:
+                continue
+            reached.append((('submitted', chain_id), {'event': 'submitted', 'chain_id': chain_id, 'tx_hash': tx_hash}))
+
+            status = self.tracker.status(tx_hash, chain_id=chain_id)
+            if status['status'] == 'pending':
+                continue
+            mined[chain_id] = status
+            reached.append((('mined', chain_id), {
+                'event': 'mined',
+                'chain_id': chain_id,
+                'tx_hash': status['transaction_hash'],
+                'status': status['status'],
+                'block_number': status['block_number']
+            }))
+            if status['status'] != 'success':
+                failed = True
+
+        if failed:
+            reached.append(('done', {'event': 'done', 'success': False}))
+            return reached
+        if len(mined) < len(job['results']):
+            return reached
+
+        if job['kind'] == 'CrossChainTransfer':
+            destination_chain_id = payload['destination_chain_id']
+            amount_expected = sum(
+                amount for chain_id, amount in zip(payload['source_chain_ids'], payload['amount_each'])
+                if chain_id in mined
+            )
+            arrival = self.arrivals.check(
+                destination_chain_id, payload['target_address'], amount_expected, payload.get('destination_block')
+            )
+            if not arrival['received']:
+                return reached
+            reached.append(('delivered', {
+                'event': 'delivered',
+                'chain_id': destination_chain_id,
+                'received_amount': arrival['received_amount'],
+                'credits': arrival['credits']
+            }))
+
+        reached.append(('done', {'event': 'done', 'success': True}))
+        return reached
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Log Indexer base for per-chain event indexes.
+Follows each chain from a persisted checkpoint with eth_getLogs over
+adaptive block ranges, woken by the head follower. The latest blocks are
+indexed again on every tick, so logs of blocks that were reorged out are
+dropped. Subclasses define which logs to fetch and how to store them.
+"""
+
+import os
+import sqlite3
+import threading
+from config import (
+    INDEXER_START_LOOKBACK, INDEXER_INITIAL_RANGE, INDEXER_MAX_RANGE, INDEXER_MAX_RANGES_PER_TICK,
+    INDEXER_REORG_DEPTH, INDEXER_REORG_DEPTHS
+)
+
+
+def address_topic(address):
+    """32-byte topic of an address."""
+    return '0x' + '00' * 12 + address.lower()[2:]
+
+
+class LogIndexer:
+    """Checkpointed, head-driven eth_getLogs indexing per chain."""
+
+    name = 'log-indexer'
+
+    def __init__(self, clients, heads, db_path):
+        """
+        Initialize the indexer.
+
+        Args:
+            clients: ChainClientRegistry for the indexed chains
+            heads: HeadFollower that signals new blocks
+            db_path: SQLite file path
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self.clients = clients
+        self.heads = heads
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS checkpoints ('
+            ' chain_id INTEGER PRIMARY KEY,'
+            ' block_number INTEGER NOT NULL)'
+        )
+        self._create_tables(self._conn)
+        self._conn.commit()
+
+        self._lock = threading.Lock()
+        self._checkpoints = {}  # chain_id -> last indexed block
+        self._ranges = {}       # chain_id -> current getLogs block range
+        self._wake = {}         # chain_id -> Event set on new heads
+        self._listeners = []
+        for chain_id, block_number in self._conn.execute('SELECT chain_id, block_number FROM checkpoints'):
+            self._checkpoints[chain_id] = block_number
+        self._load(self._conn)
+
+        heads.subscribe(self._on_block)
+
+    def _create_tables(self, conn):
+        """Create the subclass tables."""
+
+    def _load(self, conn):
+        """Load the persisted index into memory."""
+
+    def _check_chain(self, chain_id):
+        """Raise ValueError if the chain cannot be indexed."""
+
+    def _fetch_logs(self, chain_id, web3, from_block, to_block):
+        """Return the logs of a block range; raise to shrink the range."""
+        raise NotImplementedError
+
+    def _store(self, chain_id, logs):
+        """Persist logs with self._conn; called under the lock before the checkpoint commit."""
+        raise NotImplementedError
+
+    def _rewind(self, chain_id, from_block, to_block):
+        """Drop stored logs of a block range about to be indexed again; called under the lock."""
+        raise NotImplementedError
+
+    def start(self, chain_id):
+        """
+        Start indexing a chain if it is not indexed yet.
+
+        Args:
+            chain_id: Chain ID
+        """
+        if chain_id in self._wake:
+            return
+        self._check_chain(chain_id)
+
+        with self._lock:
+            if chain_id in self._wake:
+                return
+            self._wake[chain_id] = threading.Event()
+            self._ranges[chain_id] = INDEXER_INITIAL_RANGE
+            thread = threading.Thread(
+                target=self._index_loop,
+                args=(chain_id,),
+                name=f'{self.name}-{chain_id}',
+                daemon=True
+            )
+            thread.start()
+
+        self.heads.follow(chain_id, self.clients.get(chain_id))
+
+    def add_listener(self, callback):
+        """
+        Register a callback for indexing progress.
+
+        Args:
+            callback: Called as callback(chain_id, block_number) after each indexed range
+        """
+        self._listeners.append(callback)
+
+    def checkpoint(self, chain_id):
+        """Return the last indexed block of the chain, or None."""
+        return self._checkpoints.get(chain_id)
+
+    def _on_block(self, chain_id, web3, block_number, new_head):
+        event = self._wake.get(chain_id)
+        if new_head and event is not None:
+            event.set()
+
+    def _index_loop(self, chain_id):
+        wake = self._wake[chain_id]
+        web3 = self.clients.get(chain_id)
+        while True:
+            wake.wait()
+            wake.clear()
+            try:
+                if not self._catch_up(chain_id, web3):
+                    # More ranges left; continue without waiting for the next head
+                    wake.set()
+            except Exception:
+                continue
+
+    def _catch_up(self, chain_id, web3):
+        head = self.heads.head(chain_id)
+        if head is None:
+            return True
+
+        checkpoint = self._checkpoints.get(chain_id)
+        if checkpoint is None:
+            from_block = max(head - INDEXER_START_LOOKBACK, 0)
+        else:
+            # Blocks within the reorg depth may have changed since they were indexed
+            depth = INDEXER_REORG_DEPTHS.get(chain_id, INDEXER_REORG_DEPTH)
+            from_block = max(min(checkpoint + 1, head - depth + 1), 0)
+
+        for _ in range(INDEXER_MAX_RANGES_PER_TICK):
+            if from_block > head:
+                return True
+
+            to_block = min(from_block + self._ranges[chain_id] - 1, head)
+            try:
+                logs = self._fetch_logs(chain_id, web3, from_block, to_block)
+            except Exception:
+                # Provider limits (too many results / range too large): shrink and retry
+                if self._ranges[chain_id] == 1:
+                    raise
+                self._ranges[chain_id] = max(self._ranges[chain_id] // 2, 1)
+                continue
+
+            with self._lock:
+                if checkpoint is not None and from_block <= checkpoint:
+                    # A head below the checkpoint also drops what was indexed above it
+                    self._rewind(chain_id, from_block, to_block if to_block < head else max(to_block, checkpoint))
+                self._store(chain_id, logs)
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO checkpoints (chain_id, block_number) VALUES (?, ?)',
+                    (chain_id, to_block)
+                )
+                self._conn.commit()
+                self._checkpoints[chain_id] = to_block
+
+            for callback in self._listeners:
+                try:
+                    callback(chain_id, to_block)
+                except Exception:
+                    continue
+
+            self._ranges[chain_id] = min(self._ranges[chain_id] * 2, INDEXER_MAX_RANGE)
+            from_block = to_block + 1
+
+        return from_block > head
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Metrics and tracing for the API and RPC layers.
+Prometheus histograms and counters for endpoint latency, every JSON-RPC
+call (latency, errors and payload sizes by chain) and ContractManager
+stages, exposed at /metrics. Spans are recorded with OpenTelemetry when
+TRACING_ENABLED=true and the package is installed; otherwise they cost nothing.
+"""
+
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from config import LATENCY_BUCKETS, PAYLOAD_SIZE_BUCKETS
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'pypay_http_request_seconds', 'API request latency',
+    ['method', 'endpoint', 'status'], buckets=LATENCY_BUCKETS
+)
+RPC_REQUEST_SECONDS = Histogram(
+    'pypay_rpc_request_seconds', 'JSON-RPC call latency, retries included',
+    ['chain_id', 'method'], buckets=LATENCY_BUCKETS
+)
+RPC_ERRORS = Counter(
+    'pypay_rpc_errors_total', 'Failed JSON-RPC calls (kind: transport or rpc)',
+    ['chain_id', 'method', 'kind']
+)
+RPC_REQUEST_BYTES = Histogram(
+    'pypay_rpc_request_bytes', 'JSON-RPC request body size',
+    ['chain_id', 'method'], buckets=PAYLOAD_SIZE_BUCKETS
+)
+RPC_RESPONSE_BYTES = Histogram(
+    'pypay_rpc_response_bytes', 'JSON-RPC response body size',
+    ['chain_id', 'method'], buckets=PAYLOAD_SIZE_BUCKETS
+)
+RPC_HEDGES = Counter(
+    'pypay_rpc_hedged_total', 'Reads re-sent to a second endpoint because the first was slow',
+    ['chain_id', 'method']
+)
+RPC_FAILOVERS = Counter(
+    'pypay_rpc_failovers_total', 'Calls retried on another endpoint after a failure',
+    ['chain_id', 'method']
+)
+RPC_ENDPOINT_LATENCY = Gauge(
+    'pypay_rpc_endpoint_latency_seconds', 'Rolling latency of each RPC endpoint',
+    ['chain_id', 'endpoint'], multiprocess_mode='max'
+)
+RPC_ENDPOINT_HEALTHY = Gauge(
+    'pypay_rpc_endpoint_healthy', '1 if the endpoint is used for reads, 0 if skipped',
+    ['chain_id', 'endpoint'], multiprocess_mode='max'
+)
+READ_CACHE_LOOKUPS = Counter(
+    'pypay_read_cache_total', 'Block read cache lookups (result: hit or miss)',
+    ['chain_id', 'result']
+)
+READ_FLIGHTS = Counter(
+    'pypay_read_flights_total',
+    'Reads sent upstream (result: fetched) or joined to an identical read in flight (result: coalesced)',
+    ['chain_id', 'method', 'result']
+)
+TX_REPLACEMENTS = Counter(
+    'pypay_tx_replacements_total',
+    'Stuck transactions re-sent with higher fees, and unused nonces filled (result: sent, filled, failed or capped)',
+    ['chain_id', 'result']
+)
+STAGE_SECONDS = Histogram(
+    'pypay_stage_seconds', 'Contract manager stage latency (build, sign, send, ...)',
+    ['stage'], buckets=LATENCY_BUCKETS
+)
+
+_tracer = None
+if os.getenv('TRACING_ENABLED', 'False').lower() == 'true':
+    try:
+        from opentelemetry import trace
+        _tracer = trace.get_tracer('pypay-backend')
+    except ImportError:
+        print('Warning: TRACING_ENABLED is set but opentelemetry is not installed; tracing is off')
+
+_NO_SPAN = nullcontext()
+
+
+def span(name, **attributes):
+    """
+    Context manager for a tracing span; a shared no-op when tracing is off.
+
+    Args:
+        name: Span name
+        **attributes: Span attributes (str, int, float or bool)
+    """
+    if _tracer is None:
+        return _NO_SPAN
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+@contextmanager
+def stage(name, **attributes):
+    """
+    Time a block into pypay_stage_seconds, inside a span of the same name.
+
+    Args:
+        name: Stage name
+        **attributes: Span attributes
+    """
+    start = time.perf_counter()
+    try:
+        with span(name, **attributes):
+            yield
+    finally:
+        STAGE_SECONDS.labels(name).observe(time.perf_counter() - start)
+
+
+def observe_request(method, endpoint, status, seconds):
+    """Record one API request; endpoint is the URL rule, not the raw path."""
+    HTTP_REQUEST_SECONDS.labels(method, endpoint, str(status)).observe(seconds)
+
+
+def observe_rpc(chain_id, method, seconds, error_kind=None):
+    """Record one JSON-RPC call (or batch) and its failure kind, if any."""
+    RPC_REQUEST_SECONDS.labels(chain_id, method).observe(seconds)
+    if error_kind is not None:
+        RPC_ERRORS.labels(chain_id, method, error_kind).inc()
+
+
+def observe_payload(chain_id, method, request_bytes, response_bytes):
+    """Record the encoded request and response sizes of one JSON-RPC call."""
+    RPC_REQUEST_BYTES.labels(chain_id, method).observe(request_bytes)
+    RPC_RESPONSE_BYTES.labels(chain_id, method).observe(response_bytes)
+
+
+def observe_hedge(chain_id, method):
+    """Record a read hedged to a second endpoint."""
+    RPC_HEDGES.labels(chain_id, method).inc()
+
+
+def observe_failover(chain_id, method):
+    """Record a call retried on another endpoint."""
+    RPC_FAILOVERS.labels(chain_id, method).inc()
+
+
+def observe_endpoint(chain_id, endpoint, latency, healthy):
+    """Publish the rolling health of one endpoint."""
+    if latency is not None:
+        RPC_ENDPOINT_LATENCY.labels(chain_id, endpoint).set(latency)
+    RPC_ENDPOINT_HEALTHY.labels(chain_id, endpoint).set(1 if healthy else 0)
+
+
+def observe_read_cache(chain_id, result):
+    """Record a block read cache hit or miss."""
+    READ_CACHE_LOOKUPS.labels(chain_label(chain_id), result).inc()
+
+
+def observe_read_flight(chain_id, method, result):
+    """Record a read that went upstream or was coalesced with one in flight."""
+    READ_FLIGHTS.labels(chain_label(chain_id), method, result).inc()
+
+
+def observe_replacement(chain_id, result):
+    """Record a replace-by-fee attempt for a stuck transaction."""
+    TX_REPLACEMENTS.labels(chain_label(chain_id), result).inc()
+
+
+def chain_label(chain_id):
+    """Metric label for a chain; 'default' for the wallet's own connection."""
+    return 'default' if chain_id is None else str(chain_id)
+
+
+def rpc_metrics_middleware(chain_id=None):
+    """
+    Web3 middleware that records latency, errors and a span for every RPC method.
+
+    Args:
+        chain_id: Chain ID for the labels (None for the default connection)
+
+    Returns:
+        Middleware for web3.middleware_onion.add
+    """
+    label = chain_label(chain_id)
+
+    def middleware(make_request, w3):
+        def record(method, params):
+            start = time.perf_counter()
+            with span(f'rpc {method}', chain_id=label):
+                try:
+                    response = make_request(method, params)
+                except Exception:
+                    observe_rpc(label, method, time.perf_counter() - start, 'transport')
+                    raise
+            error_kind = 'rpc' if isinstance(response, dict) and 'error' in response else None
+            observe_rpc(label, method, time.perf_counter() - start, error_kind)
+            return response
+        return record
+
+    return middleware
+
+
+def async_rpc_metrics_middleware(chain_id=None):
+    """Async variant of rpc_metrics_middleware, for AsyncWeb3."""
+    label = chain_label(chain_id)
+
+    async def middleware(make_request, w3):
+        async def record(method, params):
+            start = time.perf_counter()
+            with span(f'rpc {method}', chain_id=label):
+                try:
+                    response = await make_request(method, params)
+                except Exception:
+                    observe_rpc(label, method, time.perf_counter() - start, 'transport')
+                    raise
+            error_kind = 'rpc' if isinstance(response, dict) and 'error' in response else None
+            observe_rpc(label, method, time.perf_counter() - start, error_kind)
+            return response
+        return record
+
+    return middleware
+
+
+def render():
+    """
+    Current metrics in the Prometheus text format.
+
+    Under a multi-process server, set PROMETHEUS_MULTIPROC_DIR so every
+    worker's samples are aggregated.
+
+    Returns:
+        (body bytes, content type)
+    """
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Nonce Manager for the operator wallet.
+Hands out transaction nonces locally, shared across threads and worker
+processes through a SQLite store, and resyncs from the chain when needed.
+Nonces of failed sends are only taken back when no later nonce was handed
+out; otherwise they are left as gaps for the accelerator to fill.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from config import STATE_DIR, NONCE_RESYNC_INTERVAL
+
+
+class NonceManager:
+    """Allocates per-chain nonces for an account without an RPC per send."""
+
+    def __init__(self, db_path=None, resync_interval=None):
+        """
+        Initialize the nonce manager.
+
+        Args:
+            db_path: Optional SQLite file path (default: NONCE_DB_PATH env or STATE_DIR/nonces.db)
+            resync_interval: Seconds after which the stored nonce is checked against the chain
+        """
+        if db_path is None:
+            db_path = os.getenv('NONCE_DB_PATH') or os.path.join(
+                os.getenv('STATE_DIR', STATE_DIR), 'nonces.db'
+            )
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self.db_path = db_path
+        self.resync_interval = resync_interval if resync_interval is not None else NONCE_RESYNC_INTERVAL
+        self._local = threading.local()
+
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS nonces ('
+            ' chain_id INTEGER NOT NULL,'
+            ' address TEXT NOT NULL,'
+            ' next_nonce INTEGER NOT NULL,'
+            ' synced_at REAL NOT NULL,'
+            ' allocated_at REAL NOT NULL,'
+            ' PRIMARY KEY (chain_id, address))'
+        )
+
+    def _connect(self):
+        # SQLite connections cannot be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def allocate(self, web3, chain_id, address, count=1):
+        """
+        Allocate the next nonce (or block of consecutive nonces) for an account on a chain.
+
+        Args:
+            web3: Web3 instance for the chain (only used when a resync is due)
+            chain_id: Chain ID
+            address: Account address
+            count: Number of consecutive nonces to allocate
+
+        Returns:
+            First allocated nonce (int)
+        """
+        conn = self._connect()
+        now = time.time()
+
+        # Any chain lookup happens before the write lock, so other senders never wait on an RPC
+        row = conn.execute(
+            'SELECT synced_at FROM nonces WHERE chain_id = ? AND address = ?', (chain_id, address)
+        ).fetchone()
+        pending = None
+        if row is None or now - row[0] >= self.resync_interval:
+            pending = web3.eth.get_transaction_count(address, 'pending')
+
+        # BEGIN IMMEDIATE takes the write lock, serializing allocation across processes
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT next_nonce, synced_at, allocated_at FROM nonces WHERE chain_id = ? AND address = ?',
+                (chain_id, address)
+            ).fetchone()
+
+            if row is None:
+                if pending is None:
+                    # Removed since the lookup above; rare enough to read the chain under the lock
+                    pending = web3.eth.get_transaction_count(address, 'pending')
+                next_nonce, synced_at = pending, now
+            else:
+                next_nonce, synced_at, allocated_at = row
+                if pending is not None and now - synced_at >= self.resync_interval:
+                    if pending > next_nonce or now - allocated_at >= self.resync_interval:
+                        # Chain is ahead (another sender), or a nonce gap has been idle too long
+                        next_nonce = pending
+                    synced_at = now
+
+            self._store(conn, chain_id, address, next_nonce + count, synced_at, now)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        return next_nonce
+
+    def release(self, chain_id, address, nonce, count=1):
+        """
+        Give back nonces whose transactions were never sent.
+        They are only reused if nothing was allocated after them (compare and
+        set); otherwise other senders already hold later nonces and the
+        released ones stay a gap that must be filled on chain
+        (TransactionAccelerator.release does both).
+
+        Args:
+            chain_id: Chain ID
+            address: Account address
+            nonce: First released nonce
+            count: Number of consecutive released nonces
+
+        Returns:
+            True if the nonces will be handed out again, False if they are a gap
+        """
+        cursor = self._connect().execute(
+            'UPDATE nonces SET next_nonce = ? WHERE chain_id = ? AND address = ? AND next_nonce = ?',
+            (nonce, chain_id, address, nonce + count)
+        )
+        return cursor.rowcount == 1
+
+    def _store(self, conn, chain_id, address, next_nonce, synced_at, allocated_at):
+        conn.execute(
+            'INSERT INTO nonces (chain_id, address, next_nonce, synced_at, allocated_at)'
+            ' VALUES (?, ?, ?, ?, ?)'
+            ' ON CONFLICT (chain_id, address) DO UPDATE SET'
+            ' next_nonce = excluded.next_nonce,'
+            ' synced_at = excluded.synced_at,'
+            ' allocated_at = excluded.allocated_at',
+            (chain_id, address, next_nonce, synced_at, allocated_at)
+        )
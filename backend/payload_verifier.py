@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Payload Verifier for signed PyPay transfers.
+Runs the checks of PyPay.signatureVerifier locally: expiry, source chain,
+used nonce and the signer recovered from the EIP-191 signed payload hash,
+so a payload that would revert is rejected before it is signed or sent.
+"""
+
+import time
+from eth_abi.registry import registry
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from web3 import Web3
+from config import EXPIRY_MARGIN
+
+# abi.encode(sourceChainIds, amountEach, nonces, expiry, destinationChainId, targetAddress)
+PAYLOAD_ENCODER = registry.get_tuple_encoder('uint256[]', 'uint256[]', 'uint256[]', 'uint256', 'uint256', 'address')
+
+
+def payload_hash(source_chain_ids, amount_each, nonces, expiry, destination_chain_id, target_address):
+    """Message hash the payload signature is made over (before the EIP-191 prefix)."""
+    return Web3.keccak(PAYLOAD_ENCODER([
+        source_chain_ids, amount_each, nonces, expiry, destination_chain_id, target_address
+    ]))
+
+
+def recover_signer(source_chain_ids, amount_each, nonces, expiry, destination_chain_id, target_address, signature):
+    """
+    Recover the signer of a payload the way the contract's ecrecover does.
+
+    Returns:
+        Checksummed signer address
+    """
+    signature = bytes(signature)
+    if len(signature) != 65:
+        raise ValueError('invalid signature length')
+    if signature[64] not in (27, 28):
+        # ecrecover returns the zero address for any other v
+        raise ValueError('Invalid signature')
+
+    message_hash = payload_hash(source_chain_ids, amount_each, nonces, expiry, destination_chain_id, target_address)
+    return Account.recover_message(encode_defunct(primitive=message_hash), signature=signature)
+
+
+class PayloadVerifier:
+    """Pre-verifies signed payloads against local state."""
+
+    def __init__(self, used_nonces, contract_addresses):
+        """
+        Initialize the verifier.
+
+        Args:
+            used_nonces: UsedNonceIndex
+            contract_addresses: Callable (signers, chain_id) returning their PyPay contract addresses
+        """
+        self.used_nonces = used_nonces
+        self.contract_addresses = contract_addresses
+
+    def verify(self, payload, now=None):
+        """
+        Verify one payload.
+
+        Args: see verify_many
+
+        Returns:
+            dict with valid, error and signer
+        """
+        return self.verify_many([payload], now)[0]
+
+    def verify_many(self, payloads, now=None):
+        """
+        Verify many payloads, resolving their contracts in one call per chain.
+
+        Args:
+            payloads: List of dicts with contract_address, chain_id (the chain the
+                transaction runs on), source_chain_ids, amount_each, nonces, expiry,
+                destination_chain_id, target_address and signature (bytes)
+            now: Optional Unix time to check expiry against (default: current time)
+
+        Returns:
+            List of dicts with valid (bool), error (str or None) and signer, in payload order
+        """
+        now = time.time() if now is None else now
+        results = []
+        signers = {}  # chain_id -> [(result index, signer), ...]
+
+        for index, payload in enumerate(payloads):
+            result = {'valid': False, 'error': None, 'signer': None}
+            results.append(result)
+            try:
+                result['error'] = self._check_fields(payload, now)
+                if result['error'] is not None:
+                    continue
+                result['signer'] = recover_signer(
+                    payload['source_chain_ids'],
+                    payload['amount_each'],
+                    payload['nonces'],
+                    payload['expiry'],
+                    payload['destination_chain_id'],
+                    payload['target_address'],
+                    payload['signature']
+                )
+                signers.setdefault(payload['chain_id'], []).append((index, result['signer']))
+            except Exception as e:
+                result['error'] = str(e)
+
+        # The signature is valid if the recovered signer owns the contract
+        for chain_id, entries in signers.items():
+            contracts = self.contract_addresses([signer for _, signer in entries], chain_id)
+            for (index, _), contract in zip(entries, contracts):
+                if contract != Web3.to_checksum_address(payloads[index]['contract_address']):
+                    results[index]['error'] = 'Invalid signature'
+                else:
+                    results[index]['valid'] = True
+
+        return results
+
+    def _check_fields(self, payload, now):
+        # Same order as signatureVerifier, so the reported error matches the revert reason
+        if payload['expiry'] <= now + EXPIRY_MARGIN:
+            return 'signature is expired'
+
+        source_chain_ids = payload['source_chain_ids']
+        if payload['chain_id'] not in source_chain_ids:
+            return 'not authorized source chain'
+        local_index = source_chain_ids.index(payload['chain_id'])
+        if local_index >= len(payload['nonces']) or local_index >= len(payload['amount_each']):
+            return 'amount_each and nonces must cover every source chain'
+
+        if self.used_nonces.is_used(payload['chain_id'], payload['contract_address'], payload['nonces'][local_index]):
+            return 'nonce used!'
+        return None
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Quote Cache for LayerZero native fees.
+Keeps getQuoteNativeFee results per (source chain, destination chain,
+contract, amount bucket) and refreshes them in the background, so
+/estimate-fee is answered from memory. Concurrent misses for the same
+route share one refresh.
+"""
+
+import time
+import threading
+from eth_abi import encode, decode
+from web3 import Web3
+from config import CHAIN_IDS, QUOTE_TTL, QUOTE_IDLE_TTL
+from singleflight import SingleFlight
+
+# getQuoteNativeFee(uint256 sourceChainId, uint256 destinationChainId, uint256 amount, address targetAddress)
+QUOTE_SELECTOR = Web3.keccak(text='getQuoteNativeFee(uint256,uint256,uint256,address)')[:4]
+
+
+def amount_bucket(amount):
+    """
+    Round an amount down to one significant digit, so near-identical amounts share a quote.
+
+    Args:
+        amount: Amount in base units
+
+    Returns:
+        Bucket amount (int)
+    """
+    amount = int(amount)
+    if amount < 10:
+        return amount
+    magnitude = 10 ** (len(str(amount)) - 1)
+    return amount // magnitude * magnitude
+
+
+class QuoteCache:
+    """Background-refreshed matrix of native fee quotes."""
+
+    def __init__(self, reads, heads, clients):
+        """
+        Initialize the cache.
+
+        Args:
+            reads: ReadBatcher used to run the quote calls
+            heads: HeadFollower that drives the refresh schedule
+            clients: ChainClientRegistry used to follow source chains
+        """
+        self.reads = reads
+        self.heads = heads
+        self.clients = clients
+        self._entries = {}  # (source, destination, contract, bucket) -> entry
+        self._lock = threading.Lock()
+        self.flights = SingleFlight()
+
+        heads.subscribe(self._on_block)
+
+    def get(self, contract_address, source_chain_id, destination_chain_id, amount, target_address, force_refresh=False):
+        """
+        Get a native fee quote.
+
+        Args:
+            contract_address: PyPay contract address
+            source_chain_id: Source chain ID
+            destination_chain_id: Destination chain ID
+            amount: Amount to transfer
+            target_address: Target address
+            force_refresh: Query the contract even if a fresh quote is cached
+
+        Returns:
+            dict with native_fee (int), block_number and age (seconds)
+        """
+        if source_chain_id not in CHAIN_IDS.values() or destination_chain_id not in CHAIN_IDS.values():
+            raise ValueError(f'Unsupported route: {source_chain_id} -> {destination_chain_id}')
+
+        key = (
+            source_chain_id,
+            destination_chain_id,
+            Web3.to_checksum_address(contract_address),
+            amount_bucket(amount)
+        )
+
+        entry = self._entries.get(key)
+        if entry is None or force_refresh or time.time() - entry['fetched_at'] > QUOTE_TTL:
+            entry = self.flights.do(
+                source_chain_id, 'getQuoteNativeFee', (key, force_refresh),
+                lambda: self._refresh_route(key, entry, target_address)
+            )
+
+        entry['used_at'] = time.time()
+        return {
+            'native_fee': entry['native_fee'],
+            'block_number': entry['block_number'],
+            'age': time.time() - entry['fetched_at']
+        }
+
+    def _refresh_route(self, key, entry, target_address):
+        if entry is None:
+            entry = {'target_address': Web3.to_checksum_address(target_address)}
+        self._refresh(key[0], [(key, entry)])
+        self.heads.follow(key[0], self.clients.get(key[0]))
+        return entry
+
+    def _on_block(self, chain_id, web3, block_number, new_head):
+        if not new_head:
+            return
+
+        now = time.time()
+        with self._lock:
+            # Forget routes nobody asked for in a while
+            for key in [k for k, e in self._entries.items() if now - e.get('used_at', now) > QUOTE_IDLE_TTL]:
+                del self._entries[key]
+            stale = [
+                (key, entry) for key, entry in self._entries.items()
+                if key[0] == chain_id and now - entry['fetched_at'] >= QUOTE_TTL
+            ]
+
+        if stale:
+            self._refresh(chain_id, stale)
+
+    def _refresh(self, chain_id, items):
+        # Every stale route of the chain in one batched read
+        calls = [
+            (contract, QUOTE_SELECTOR + encode(
+                ['uint256', 'uint256', 'uint256', 'address'],
+                [source, destination, bucket, entry['target_address']]
+            ))
+            for (source, destination, contract, bucket), entry in items
+        ]
+        results = self.reads.call_many(chain_id, calls)
+        block_number = self.heads.head(chain_id)
+
+        now = time.time()
+        with self._lock:
+            for (key, entry), (success, data) in zip(items, results):
+                if not success:
+                    if 'native_fee' not in entry:
+                        raise ValueError(f'Error querying native fee for route {key[0]} -> {key[1]}')
+                    continue
+                entry['native_fee'] = decode(['uint256'], data)[0]
+                entry['block_number'] = block_number
+                entry['fetched_at'] = now
+                self._entries[key] = entry
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Read Batcher for contract view calls.
+Collects eth_call reads per chain and executes them as one Multicall3
+aggregate3 call (or one JSON-RPC batch where Multicall3 is not available),
+then hands each result back to its caller. With a BlockReadCache, calls
+already made at the current head are answered without a round trip, and
+an identical call already queued or in flight is shared rather than repeated.
+"""
+
+import threading
+from concurrent.futures import Future
+from eth_abi import encode, decode
+from web3 import Web3
+from chain_clients import batch_request
+from config import MULTICALL3_ADDRESSES, READ_BATCH_WINDOW, READ_BATCH_MAX
+from singleflight import SingleFlight
+
+# aggregate3((address target, bool allowFailure, bytes callData)[]) returns ((bool success, bytes returnData)[])
+AGGREGATE3_SELECTOR = Web3.keccak(text='aggregate3((address,bool,bytes)[])')[:4]
+
+# balanceOf(address)
+BALANCE_OF_SELECTOR = Web3.keccak(text='balanceOf(address)')[:4]
+
+# Multicall3.getEthBalance(address)
+GET_ETH_BALANCE_SELECTOR = Web3.keccak(text='getEthBalance(address)')[:4]
+
+
+class ReadBatcher:
+    """Batches view calls per chain."""
+
+    def __init__(self, clients, cache=None):
+        """
+        Initialize the batcher.
+
+        Args:
+            clients: ChainClientRegistry used to reach each chain
+            cache: Optional BlockReadCache for results within a block
+        """
+        self.clients = clients
+        self.cache = cache
+        self._queues = {}  # chain_id -> [(target, calldata, Future), ...]
+        self._lock = threading.Lock()
+        self.flights = SingleFlight()
+
+    def call(self, chain_id, target, calldata):
+        """
+        Run one view call, batched with any other calls made to the chain
+        within READ_BATCH_WINDOW seconds.
+
+        Args:
+            chain_id: Chain ID
+            target: Contract address
+            calldata: ABI-encoded call data (bytes or hex string)
+
+        Returns:
+            Raw return data (bytes)
+        """
+        return self.submit(chain_id, target, calldata).result()
+
+    def submit(self, chain_id, target, calldata):
+        """
+        Queue a view call for the next batch of the chain.
+
+        Args:
+            chain_id: Chain ID
+            target: Contract address
+            calldata: ABI-encoded call data (bytes or hex string)
+
+        Returns:
+            Future resolving to the raw return data (bytes)
+        """
+        future = Future()
+        key = read_key(target, calldata)
+        block_number = self.cache.head(chain_id) if self.cache is not None else None
+        if block_number is not None:
+            data = self.cache.get(chain_id, block_number, key)
+            if data is not None:
+                future.set_result(data)
+                return future
+
+        # The same call already queued or in flight answers this one too
+        future, leader = self.flights.join(chain_id, 'eth_call', (block_number, key), future)
+        if not leader:
+            return future
+        if block_number is not None:
+            future.add_done_callback(
+                lambda done: done.exception() is None and self.cache.put(chain_id, block_number, key, done.result())
+            )
+
+        with self._lock:
+            queue = self._queues.setdefault(chain_id, [])
+            queue.append((target, calldata, future))
+            if len(queue) == 1:
+                # First call of a new batch: flush after the collection window
+                timer = threading.Timer(READ_BATCH_WINDOW, self._flush, args=(chain_id,))
+                timer.daemon = True
+                timer.start()
+            elif len(queue) >= READ_BATCH_MAX:
+                self._queues[chain_id] = []
+                threading.Thread(target=self._execute, args=(chain_id, queue), daemon=True).start()
+        return future
+
+    def call_many(self, chain_id, calls):
+        """
+        Run many view calls on a chain in as few round trips as possible.
+
+        Args:
+            chain_id: Chain ID
+            calls: List of (target, calldata) tuples
+
+        Returns:
+            List of (success, return data) tuples, in call order
+        """
+        block_number = self.cache.head(chain_id) if self.cache is not None else None
+        if block_number is None:
+            return self._call_uncached(chain_id, calls)
+
+        # Only calls not yet made at this head go to the node
+        keys = [read_key(target, calldata) for target, calldata in calls]
+        results = []
+        for key in keys:
+            data = self.cache.get(chain_id, block_number, key)
+            results.append(None if data is None else (True, data))
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            fetched = self._call_uncached(chain_id, [calls[i] for i in missing])
+            for i, (success, data) in zip(missing, fetched):
+                results[i] = (success, data)
+                if success:
+                    self.cache.put(chain_id, block_number, keys[i], data)
+        return results
+
+    def token_balances(self, chain_id, token, addresses):
+        """
+        Get ERC20 balances of many addresses on one chain.
+
+        Args:
+            chain_id: Chain ID
+            token: Token contract address
+            addresses: List of holder addresses
+
+        Returns:
+            List of balances (int, or None where the call failed), in address order
+        """
+        calls = [
+            (token, BALANCE_OF_SELECTOR + encode(['address'], [Web3.to_checksum_address(address)]))
+            for address in addresses
+        ]
+        return [
+            decode(['uint256'], data)[0] if success else None
+            for success, data in self.call_many(chain_id, calls)
+        ]
+
+    def native_balances(self, chain_id, addresses):
+        """
+        Get native token balances of many addresses on one chain.
+
+        Args:
+            chain_id: Chain ID
+            addresses: List of addresses
+
+        Returns:
+            List of balances in wei, in address order
+        """
+        multicall = MULTICALL3_ADDRESSES.get(chain_id)
+        if multicall is None:
+            web3 = self.clients.get(chain_id)
+            responses = batch_request(web3, [('eth_getBalance', [address, 'latest']) for address in addresses])
+            return [int(response['result'], 16) if 'result' in response else None for response in responses]
+
+        calls = [
+            (multicall, GET_ETH_BALANCE_SELECTOR + encode(['address'], [Web3.to_checksum_address(address)]))
+            for address in addresses
+        ]
+        return [
+            decode(['uint256'], data)[0] if success else None
+            for success, data in self.call_many(chain_id, calls)
+        ]
+
+    def _call_uncached(self, chain_id, calls):
+        results = []
+        for start in range(0, len(calls), READ_BATCH_MAX):
+            results.extend(self._call_chunk(chain_id, calls[start:start + READ_BATCH_MAX]))
+        return results
+
+    def _flush(self, chain_id):
+        with self._lock:
+            queue = self._queues.get(chain_id, [])
+            self._queues[chain_id] = []
+        if queue:
+            self._execute(chain_id, queue)
+
+    def _execute(self, chain_id, queue):
+        try:
+            results = self._call_chunk(chain_id, [(target, calldata) for target, calldata, _ in queue])
+        except Exception as e:
+            for _, _, future in queue:
+                future.set_exception(e)
+            return
+
+        for (_, _, future), (success, data) in zip(queue, results):
+            if success:
+                future.set_result(data)
+            else:
+                future.set_exception(ValueError(f'Call reverted: 0x{data.hex()}'))
+
+    def _call_chunk(self, chain_id, calls):
+        web3 = self.clients.get(chain_id)
+        calls = [(Web3.to_checksum_address(target), _to_bytes(calldata)) for target, calldata in calls]
+
+        multicall = MULTICALL3_ADDRESSES.get(chain_id)
+        if multicall is None:
+            # No Multicall3 on this chain: one JSON-RPC batch of eth_calls
+            responses = batch_request(web3, [
+                ('eth_call', [{'to': target, 'data': '0x' + calldata.hex()}, 'latest'])
+                for target, calldata in calls
+            ])
+            return [
+                (True, bytes.fromhex(response['result'][2:])) if 'result' in response
+                else (False, b'')
+                for response in responses
+            ]
+
+        if len(calls) == 1:
+            # Nothing to aggregate
+            target, calldata = calls[0]
+            try:
+                return [(True, bytes(web3.eth.call({'to': target, 'data': calldata})))]
+            except Exception as e:
+                if 'revert' not in str(e).lower():
+                    raise
+                return [(False, b'')]
+
+        data = AGGREGATE3_SELECTOR + encode(
+            ['(address,bool,bytes)[]'],
+            [[(target, True, calldata) for target, calldata in calls]]
+        )
+        raw = web3.eth.call({'to': Web3.to_checksum_address(multicall), 'data': data})
+        return [(success, bytes(result)) for success, result in decode(['(bool,bytes)[]'], raw)[0]]
+
+
+def read_key(target, calldata):
+    """Cache key of a view call."""
+    return ('eth_call', target.lower(), _to_bytes(calldata))
+
+
+def _to_bytes(calldata):
+    if isinstance(calldata, str):
+        return bytes.fromhex(calldata[2:] if calldata.startswith('0x') else calldata)
+    return bytes(calldata)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Block-keyed cache for chain reads.
+View calls and balances can only change when a new block arrives, so their
+results are cached per (chain, head block, read) and dropped when the head
+follower sees newer blocks. Reads are only cached while the chain's head is
+being followed and polled successfully; otherwise they go to the node.
+Concurrent misses for the same read share one upstream call.
+"""
+
+import threading
+from config import READ_CACHE_MAX_BLOCK_LAG, READ_CACHE_MAX_HEAD_AGE, READ_CACHE_SIZE
+from metrics import observe_read_cache
+from singleflight import SingleFlight
+
+
+class BlockReadCache:
+    """Read-through cache of per-block read results, invalidated by new heads."""
+
+    def __init__(self, heads, clients):
+        """
+        Initialize the cache.
+
+        Args:
+            heads: HeadFollower whose new heads expire entries
+            clients: ChainClientRegistry used to start following a chain
+        """
+        self.heads = heads
+        self.clients = clients
+        self._blocks = {}  # chain_id -> {block_number: {key: value}}
+        self._sizes = {}   # chain_id -> cached entries
+        self._lock = threading.Lock()
+        self.flights = SingleFlight()
+
+        heads.subscribe(self._on_block)
+
+    def head(self, chain_id):
+        """
+        Block that reads made now are cached under.
+
+        Args:
+            chain_id: Chain ID
+
+        Returns:
+            The followed head block number, or None when the head is unknown or
+            has not been polled within READ_CACHE_MAX_HEAD_AGE (reads are not cached)
+        """
+        block_number = self.heads.head(chain_id)
+        if block_number is None:
+            self.heads.follow(chain_id, self.clients.get(chain_id))
+            return None
+        age = self.heads.head_age(chain_id)
+        if age is None or age > READ_CACHE_MAX_HEAD_AGE:
+            return None
+        return block_number
+
+    def get(self, chain_id, block_number, key):
+        """
+        Look up a read cached at most READ_CACHE_MAX_BLOCK_LAG blocks behind block_number.
+
+        Args:
+            chain_id: Chain ID
+            block_number: Head block from head()
+            key: Read key, e.g. ('eth_call', to, calldata)
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        blocks = self._blocks.get(chain_id, {})
+        for block in range(block_number, block_number - READ_CACHE_MAX_BLOCK_LAG - 1, -1):
+            value = blocks.get(block, {}).get(key)
+            if value is not None:
+                observe_read_cache(chain_id, 'hit')
+                return value
+        observe_read_cache(chain_id, 'miss')
+        return None
+
+    def put(self, chain_id, block_number, key, value):
+        """
+        Cache a read made while block_number was the head.
+
+        Args:
+            chain_id: Chain ID
+            block_number: Head block from head() before the read was made
+            key: Read key
+            value: Result (not None)
+        """
+        with self._lock:
+            head = self.heads.head(chain_id)
+            if head is not None and block_number < head - READ_CACHE_MAX_BLOCK_LAG:
+                # A newer head arrived while reading
+                return
+            if self._sizes.get(chain_id, 0) >= READ_CACHE_SIZE:
+                return
+            entries = self._blocks.setdefault(chain_id, {}).setdefault(block_number, {})
+            if key not in entries:
+                self._sizes[chain_id] = self._sizes.get(chain_id, 0) + 1
+            entries[key] = value
+
+    def read(self, chain_id, key, fetch):
+        """
+        Return a cached read, or fetch and cache it. Concurrent fetches of the
+        same read are coalesced into one.
+
+        Args:
+            chain_id: Chain ID
+            key: Read key (its first item names the method, e.g. 'eth_call')
+            fetch: Callable making the read
+
+        Returns:
+            Read result
+        """
+        block_number = self.head(chain_id)
+        if block_number is None:
+            return self.flights.do(chain_id, key[0], (None, key), fetch)
+        value = self.get(chain_id, block_number, key)
+        if value is None:
+            value = self.flights.do(
+                chain_id, key[0], (block_number, key), lambda: self._fetch(chain_id, block_number, key, fetch)
+            )
+        return value
+
+    def _fetch(self, chain_id, block_number, key, fetch):
+        value = fetch()
+        if value is not None:
+            self.put(chain_id, block_number, key, value)
+        return value
+
+    def _on_block(self, chain_id, web3, block_number, new_head):
+        if not new_head:
+            return
+        with self._lock:
+            blocks = self._blocks.get(chain_id, {})
+            for block in [b for b in blocks if b < block_number - READ_CACHE_MAX_BLOCK_LAG]:
+                self._sizes[chain_id] -= len(blocks.pop(block))
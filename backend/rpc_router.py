@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+RPC Router for chains served by several endpoints.
+Scores each endpoint on rolling latency, error rate and head lag. Reads go
+to the best healthy endpoint, are hedged to the next one when slow and fail
+over on errors; raw transactions are broadcast to several endpoints so
+they propagate faster.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+from web3 import Web3
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.providers.base import JSONBaseProvider
+from metrics import chain_label, observe_endpoint, observe_failover, observe_hedge
+from config import (
+    RPC_TIMEOUT, RPC_EWMA_ALPHA, RPC_MAX_ERROR_RATE, RPC_MAX_HEAD_LAG, RPC_MAX_HEAD_LAGS,
+    RPC_HEDGE_MIN_DELAY, RPC_HEDGE_INITIAL_DELAY, RPC_BROADCAST_FANOUT
+)
+
+# Sent to several endpoints instead of one
+SEND_METHODS = frozenset({'eth_sendRawTransaction'})
+
+
+def endpoint_label(url):
+    """Host (and port) of an endpoint URL, for logs and metrics; credentials and API keys stay out."""
+    parsed = urlparse(url)
+    if parsed.hostname is None:
+        return url
+    return f'{parsed.hostname}:{parsed.port}' if parsed.port else parsed.hostname
+
+
+def is_rate_limited(response):
+    """True if a JSON-RPC response is the endpoint refusing work, not an answer."""
+    if not isinstance(response, dict) or 'error' not in response:
+        return False
+    error = response['error'] if isinstance(response['error'], dict) else {'message': str(response['error'])}
+    message = str(error.get('message', '')).lower()
+    return error.get('code') in (429, -32005) or 'rate limit' in message or 'too many requests' in message
+
+
+def is_already_known(response):
+    """True if a send was refused only because the endpoint already has the transaction."""
+    if not isinstance(response, dict) or not isinstance(response.get('error'), dict):
+        return False
+    message = str(response['error'].get('message', '')).lower()
+    return 'already known' in message or 'known transaction' in message
+
+
+def is_rejection(error):
+    """
+    True if a send failed because the node answered with a JSON-RPC error (web3
+    raises it as a plain ValueError of the error object), so it does not have the
+    transaction. Timeouts, dropped connections and malformed answers are not:
+    the transaction may have been received.
+    """
+    return type(error) is ValueError and bool(error.args) and isinstance(error.args[0], (dict, str))
+
+
+def send_result(response, params):
+    """Turn an 'already known' answer into the transaction hash the node would have returned."""
+    if is_already_known(response):
+        return {'jsonrpc': '2.0', 'id': response.get('id'), 'result': Web3.keccak(hexstr=params[0]).hex()}
+    return response
+
+
+class RpcEndpoint:
+    """Rolling health of one RPC endpoint."""
+
+    def __init__(self, url):
+        """
+        Initialize the endpoint.
+
+        Args:
+            url: RPC URL
+        """
+        self.url = url
+        self.label = endpoint_label(url)
+        self.latency = None    # EWMA of successful call latency (seconds)
+        self.deviation = 0.0   # EWMA of the absolute latency deviation
+        self.error_rate = 0.0  # EWMA of failures (1) and successes (0)
+        self.head = None       # last block number seen by the probe
+
+    def record(self, seconds, ok):
+        """
+        Record the outcome of one call.
+
+        Updates are not locked; a lost sample under contention does not
+        change the ranking.
+
+        Args:
+            seconds: Call latency
+            ok: False for transport failures and rate limiting
+        """
+        if ok:
+            if self.latency is None:
+                self.latency = seconds
+                self.deviation = seconds / 2
+            else:
+                self.deviation += RPC_EWMA_ALPHA * (abs(seconds - self.latency) - self.deviation)
+                self.latency += RPC_EWMA_ALPHA * (seconds - self.latency)
+        self.error_rate += RPC_EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+
+    def hedge_delay(self):
+        """Seconds to wait for this endpoint before hedging a read."""
+        if self.latency is None:
+            return RPC_HEDGE_INITIAL_DELAY
+        return min(max(self.latency + 4 * self.deviation, RPC_HEDGE_MIN_DELAY), RPC_TIMEOUT)
+
+
+class EndpointSet:
+    """Endpoints of one chain, ranked by health; shared by the sync and async providers."""
+
+    def __init__(self, chain_id, urls):
+        """
+        Initialize the set.
+
+        Args:
+            chain_id: Chain ID (None for the wallet's default connection)
+            urls: RPC URLs, preferred first
+        """
+        if not urls:
+            raise ValueError(f'No RPC URLs for chain {chain_id}')
+        self.chain_id = chain_id
+        self.metrics_label = chain_label(chain_id)
+        self.endpoints = [RpcEndpoint(url) for url in dict.fromkeys(urls)]
+        self.max_head_lag = RPC_MAX_HEAD_LAGS.get(chain_id, RPC_MAX_HEAD_LAG)
+
+    def ranked(self):
+        """
+        Endpoints in the order to try them.
+
+        Returns:
+            Healthy endpoints by rolling latency (untried ones first), then
+            the skipped ones by error rate
+        """
+        if len(self.endpoints) == 1:
+            return self.endpoints
+        best_head = max((endpoint.head for endpoint in self.endpoints if endpoint.head is not None), default=None)
+        healthy = []
+        skipped = []
+        for endpoint in self.endpoints:
+            (healthy if self._is_healthy(endpoint, best_head) else skipped).append(endpoint)
+        healthy.sort(key=lambda endpoint: endpoint.latency or 0.0)
+        skipped.sort(key=lambda endpoint: endpoint.error_rate)
+        return healthy + skipped
+
+    def _is_healthy(self, endpoint, best_head):
+        if endpoint.error_rate > RPC_MAX_ERROR_RATE:
+            return False
+        if best_head is not None and endpoint.head is not None:
+            return best_head - endpoint.head <= self.max_head_lag
+        return True
+
+    def publish(self):
+        """Export every endpoint's latency and health as metrics; return True if any is healthy."""
+        best_head = max((endpoint.head for endpoint in self.endpoints if endpoint.head is not None), default=None)
+        any_healthy = False
+        for endpoint in self.endpoints:
+            healthy = self._is_healthy(endpoint, best_head)
+            any_healthy = any_healthy or healthy
+            observe_endpoint(self.metrics_label, endpoint.label, endpoint.latency, healthy)
+        return any_healthy
+
+
+_endpoint_sets = {}
+_endpoint_sets_lock = threading.Lock()
+
+
+def endpoint_set(chain_id, urls):
+    """
+    Get the process-wide EndpointSet for a chain and URL list.
+
+    Args:
+        chain_id: Chain ID (None for the default connection)
+        urls: RPC URLs, preferred first
+
+    Returns:
+        EndpointSet
+    """
+    key = (chain_id, tuple(urls))
+    with _endpoint_sets_lock:
+        if key not in _endpoint_sets:
+            _endpoint_sets[key] = EndpointSet(chain_id, urls)
+        return _endpoint_sets[key]
+
+
+class FailoverProvider(JSONBaseProvider):
+    """Provider over several endpoints: hedged, failing-over reads and broadcast sends."""
+
+    def __init__(self, endpoints, providers, pool_size):
+        """
+        Initialize the provider.
+
+        Args:
+            endpoints: EndpointSet
+            providers: One provider per endpoint, in endpoints.endpoints order
+            pool_size: Connections per endpoint (sizes the hedging thread pool)
+        """
+        super().__init__()
+        self.endpoints = endpoints
+        self.metrics_label = endpoints.metrics_label
+        self._providers = {endpoint.url: provider for endpoint, provider in zip(endpoints.endpoints, providers)}
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_size * len(providers),
+            thread_name_prefix=f'rpc-{self.metrics_label}'
+        )
+
+    def make_request(self, method, params):
+        if method in SEND_METHODS:
+            return self._broadcast(method, params)
+        return self._read(method, lambda provider: provider.make_request(method, params))
+
+    def make_batch_request(self, calls):
+        """
+        Send several JSON-RPC requests in one HTTP round trip, with hedging and failover.
+
+        Args:
+            calls: List of (method, params) tuples
+
+        Returns:
+            List of raw JSON-RPC responses, in call order
+        """
+        return self._read('batch', lambda provider: provider.make_batch_request(calls))
+
+    def probe(self):
+        """
+        Check every endpoint's latency and head at once.
+
+        Returns:
+            True if at least one endpoint is healthy
+        """
+        futures = {
+            endpoint: self._executor.submit(self._call, endpoint, lambda provider: provider.make_request('eth_blockNumber', []))
+            for endpoint in self.endpoints.endpoints
+        }
+        for endpoint, future in futures.items():
+            try:
+                endpoint.head = int(future.result()['result'], 16)
+            except Exception:
+                continue
+        return self.endpoints.publish()
+
+    def close(self):
+        """Stop the hedging pool and close every endpoint's connections."""
+        self._executor.shutdown(wait=False)
+        for provider in self._providers.values():
+            if hasattr(provider, 'close'):
+                provider.close()
+
+    def _call(self, endpoint, send):
+        start = time.perf_counter()
+        try:
+            response = send(self._providers[endpoint.url])
+        except Exception:
+            endpoint.record(time.perf_counter() - start, False)
+            raise
+        limited = is_rate_limited(response)
+        endpoint.record(time.perf_counter() - start, not limited)
+        if limited:
+            raise ConnectionError(f'{endpoint.label} is rate limiting: {response["error"]}')
+        return response
+
+    def _read(self, method, send):
+        ranked = self.endpoints.ranked()
+        if len(ranked) == 1:
+            return self._call(ranked[0], send)
+
+        # Primary first; a hedge when it is slow, the next endpoint when an attempt fails
+        pending = {self._executor.submit(self._call, ranked[0], send)}
+        remaining = iter(ranked[1:])
+        timeout = ranked[0].hedge_delay()
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+            if not done or not pending:
+                endpoint = next(remaining, None)
+                if endpoint is not None:
+                    (observe_failover if done else observe_hedge)(self.metrics_label, method)
+                    pending.add(self._executor.submit(self._call, endpoint, send))
+            timeout = None
+        raise error
+
+    def _broadcast(self, method, params):
+        ranked = self.endpoints.ranked()[:RPC_BROADCAST_FANOUT]
+        send = lambda provider: provider.make_request(method, params)
+        if len(ranked) == 1:
+            return send_result(self._call(ranked[0], send), params)
+
+        # The first accepted send wins; the others keep going in the background for propagation
+        futures = {self._executor.submit(self._call, endpoint, send): endpoint for endpoint in ranked}
+        outcomes = {}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = send_result(future.result(), params)
+                except Exception as e:
+                    outcomes[futures[future]] = e
+                    continue
+                if 'error' not in response:
+                    return response
+                outcomes[futures[future]] = response
+
+        # Every endpoint refused: report the best-ranked endpoint's answer
+        outcome = outcomes[ranked[0]]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class AsyncFailoverProvider(AsyncJSONBaseProvider):
+    """Async variant of FailoverProvider, for AsyncWeb3."""
+
+    def __init__(self, endpoints, providers):
+        """
+        Initialize the provider.
+
+        Args:
+            endpoints: EndpointSet (shared with the sync provider of the same chain)
+            providers: One async provider per endpoint, in endpoints.endpoints order
+        """
+        super().__init__()
+        self.endpoints = endpoints
+        self.metrics_label = endpoints.metrics_label
+        self._providers = {endpoint.url: provider for endpoint, provider in zip(endpoints.endpoints, providers)}
+
+    async def cache_async_session(self, session):
+        """Use one aiohttp session for every endpoint."""
+        for provider in self._providers.values():
+            await provider.cache_async_session(session)
+
+    async def make_request(self, method, params):
+        if method in SEND_METHODS:
+            return await self._broadcast(method, params)
+        return await self._read(method, params)
+
+    async def _call(self, endpoint, method, params):
+        start = time.perf_counter()
+        try:
+            response = await self._providers[endpoint.url].make_request(method, params)
+        except Exception:
+            endpoint.record(time.perf_counter() - start, False)
+            raise
+        limited = is_rate_limited(response)
+        endpoint.record(time.perf_counter() - start, not limited)
+        if limited:
+            raise ConnectionError(f'{endpoint.label} is rate limiting: {response["error"]}')
+        return response
+
+    async def _read(self, method, params):
+        ranked = self.endpoints.ranked()
+        if len(ranked) == 1:
+            return await self._call(ranked[0], method, params)
+
+        pending = {asyncio.ensure_future(self._call(ranked[0], method, params))}
+        remaining = iter(ranked[1:])
+        timeout = ranked[0].hedge_delay()
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                if not done or not pending:
+                    endpoint = next(remaining, None)
+                    if endpoint is not None:
+                        (observe_failover if done else observe_hedge)(self.metrics_label, method)
+                        pending.add(asyncio.ensure_future(self._call(endpoint, method, params)))
+                timeout = None
+        finally:
+            # The losing read is not needed
+            for task in pending:
+                task.cancel()
+        raise error
+
+    async def _broadcast(self, method, params):
+        ranked = self.endpoints.ranked()[:RPC_BROADCAST_FANOUT]
+        tasks = {asyncio.ensure_future(self._call(endpoint, method, params)): endpoint for endpoint in ranked}
+        for task in tasks:
+            # Sends still running after the first acceptance finish unobserved
+            task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        outcomes = {}
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    outcomes[tasks[task]] = task.exception()
+                    continue
+                response = send_result(task.result(), params)
+                if 'error' not in response:
+                    return response
+                outcomes[tasks[task]] = response
+
+        outcome = outcomes[ranked[0]]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Request schemas and JSON encoding for the API layer.
+Each POST endpoint has a msgspec Struct that decodes and validates the
+raw request body in one pass (numeric strings are accepted for integers,
+as the frontend sends them; unsigned integers must fit in a uint256).
+Responses are encoded with msgspec as well.
+"""
+
+import re
+from typing import Annotated, Dict, List, Optional, Union
+import msgspec
+from config import COMPUTE_ADDRESS_MAX, TRANSFER_BATCH_MAX, VERIFY_BATCH_MAX
+
+Address = Annotated[str, msgspec.Meta(pattern='^0x[0-9a-fA-F]{40}$')]
+Uint = Annotated[int, msgspec.Meta(ge=0)]
+HexBytes = Annotated[str, msgspec.Meta(pattern='^(0x)?([0-9a-fA-F]{2})*$')]
+
+UINT256_MAX = 2**256 - 1
+
+_ERROR_PATH = re.compile(r' - at `\$\.?(?P<path>[^`]*)`$')
+_MISSING_FIELD = re.compile(r'^Object missing required field `(?P<field>[^`]+)`')
+
+_encoder = msgspec.json.Encoder()
+
+
+class RequestError(ValueError):
+    """Invalid request body; field names the part that failed, if known."""
+
+    def __init__(self, message, field=None):
+        super().__init__(message)
+        self.field = field
+
+
+class Request(msgspec.Struct, kw_only=True):
+    """Base of the request bodies."""
+
+    def __post_init__(self):
+        # msgspec bounds stop at int64, so the uint256 bound of Uint is checked here
+        for name in self.__struct_fields__:
+            path = _oversized(getattr(self, name), name)
+            if path is not None:
+                raise ValueError(f'Expected `int` <= 2**256 - 1 - at `$.{path}`')
+
+
+def _oversized(value, path):
+    """Path of the first integer above UINT256_MAX in a field value, or None."""
+    if isinstance(value, list):
+        items = ((f'{path}[{index}]', item) for index, item in enumerate(value))
+    elif isinstance(value, dict):
+        items = ((f'{path}[...]', item) for item in value.values())
+    else:
+        too_large = isinstance(value, int) and not isinstance(value, bool) and value > UINT256_MAX
+        return path if too_large else None
+    for item_path, item in items:
+        found = _oversized(item, item_path)
+        if found is not None:
+            return found
+    return None
+
+
+class TransferRequest(Request, kw_only=True):
+    """Body of /transfer."""
+    contract_address: Address
+    source_chain_ids: List[Uint]
+    amount_each: List[Uint]
+    nonces: List[Uint]
+    expiry: Uint
+    destination_chain_id: Uint
+    target_address: Address
+    signature: HexBytes
+    urgency: str = 'normal'
+
+    def payload(self):
+        """Signed payload fields, as keyword arguments for the contract manager."""
+        return {
+            'contract_address': self.contract_address,
+            'source_chain_ids': self.source_chain_ids,
+            'amount_each': self.amount_each,
+            'nonces': self.nonces,
+            'expiry': self.expiry,
+            'destination_chain_id': self.destination_chain_id,
+            'target_address': self.target_address,
+            # Signature arrives as a hex string; the contract takes raw bytes
+            'signature': bytes.fromhex(self.signature[2:] if self.signature.startswith('0x') else self.signature)
+        }
+
+
+class TransferBatchRequest(Request, kw_only=True):
+    """Body of /transfer/batch; payloads are decoded one by one so a bad one fails alone."""
+    payloads: Annotated[List[msgspec.Raw], msgspec.Meta(max_length=TRANSFER_BATCH_MAX)]
+    urgency: str = 'normal'
+
+
+class CrossChainTransferRequest(TransferRequest, kw_only=True):
+    """Body of /cross-chain-transfer; native_fee is one fee or a map of chain ID to fee."""
+    native_fee: Union[Uint, Dict[int, Uint]]
+
+
+class CheckCrossChainRequest(Request, kw_only=True):
+    """Body of /check-cross-chain."""
+    target_address: Address
+    amount_expected: Uint
+    destination_chain_id: Uint
+    timeout: Uint = 60
+    since_block: Optional[Uint] = None
+
+
+class EstimateFeeRequest(Request, kw_only=True):
+    """Body of /estimate-fee."""
+    contract_address: Address
+    source_chain_id: Uint
+    destination_chain_id: Uint
+    amount: Uint
+    target_address: Address
+    force_refresh: bool = False
+
+
+class PyusdBalancesRequest(Request, kw_only=True):
+    """Body of /pyusd-balances."""
+    addresses: List[Address]
+    chain_ids: Optional[List[Uint]] = None
+
+
+class ComputeAddressRequest(Request, kw_only=True):
+    """Body of /compute-address."""
+    addresses: Annotated[List[Address], msgspec.Meta(max_length=COMPUTE_ADDRESS_MAX)]
+    chain_id: Optional[Uint] = None
+
+
+class VerifyPayload(TransferRequest, kw_only=True):
+    """One /verify payload: a transfer payload plus the chain it would run on."""
+    chain_id: Uint
+
+    def payload(self):
+        """Signed payload fields and the chain ID, as the payload verifier takes them."""
+        return {**super().payload(), 'chain_id': self.chain_id}
+
+
+class VerifyRequest(Request, kw_only=True):
+    """Body of /verify; payloads are decoded one by one so a bad one fails alone."""
+    payloads: Annotated[List[msgspec.Raw], msgspec.Meta(max_length=VERIFY_BATCH_MAX)]
+
+
+def _decoder(schema):
+    return msgspec.json.Decoder(schema, strict=False)
+
+
+_DECODERS = {
+    schema: _decoder(schema)
+    for schema in (
+        TransferRequest, TransferBatchRequest, CrossChainTransferRequest, CheckCrossChainRequest, EstimateFeeRequest,
+        PyusdBalancesRequest, ComputeAddressRequest, VerifyPayload, VerifyRequest
+    )
+}
+
+
+def decode(body, schema):
+    """
+    Decode and validate a raw JSON body.
+
+    Args:
+        body: Raw request body (bytes)
+        schema: Request Struct type
+
+    Returns:
+        Instance of schema
+
+    Raises:
+        RequestError: if the body is not valid JSON or does not match the schema
+    """
+    try:
+        return _DECODERS[schema].decode(body)
+    except msgspec.ValidationError as e:
+        raise RequestError(str(e), field=_error_field(str(e)))
+    except msgspec.DecodeError as e:
+        raise RequestError(f'Invalid JSON: {e}')
+
+
+def _error_field(message):
+    match = _ERROR_PATH.search(message)
+    path = match.group('path') if match else ''
+    missing = _MISSING_FIELD.match(message)
+    if missing:
+        path = f'{path}.{missing.group("field")}' if path else missing.group('field')
+    return path or None
+
+
+def encode(body):
+    """Encode a response body as JSON bytes."""
+    return _encoder.encode(body)
+
+
+def encode_event(event):
+    """Encode a lifecycle event as a server-sent event frame."""
+    return b'id: %d\nevent: %s\ndata: %s\n\n' % (event['id'], event['event'].encode(), _encoder.encode(event))
+
+
+def error_body(error):
+    """Response body for a RequestError."""
+    body = {'success': False, 'error': str(error)}
+    if error.field is not None:
+        body['field'] = error.field
+    return body
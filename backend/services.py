@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Lazily created backend services.
+app.py and asgi.py import only the web layer at startup. The wallet and
+contract managers (and web3 with them) are created on first use, once per
+process, and their RPC connections are warmed in the background with
+retries. Nothing opens a connection or starts a thread at import time, so
+the app can be preloaded in a parent process and forked into workers, and
+an unreachable RPC at boot makes a worker unready instead of crashing it.
+A worker is ready once the RPC of every chain in READY_CHAINS answers.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from config import WARMUP_RETRY_INITIAL, WARMUP_RETRY_MAX, READY_CHAINS
+
+
+class LazyService:
+    """Proxy that creates its service on first use, once per process."""
+
+    def __init__(self, factory):
+        """
+        Args:
+            factory: Callable creating the service
+        """
+        self._factory = factory
+        self._reset()
+        # A parent's instance (threads, sockets) is not usable after fork
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def created(self):
+        """True once the service exists in this process."""
+        return self._instance is not None
+
+    def get(self):
+        """Get the service, creating it if needed."""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+                instance = self._instance
+        return instance
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+
+class Services:
+    """The wallet and contract managers of one app, with background warm-up and readiness."""
+
+    def __init__(self, create_wallet_manager, create_contract_manager):
+        """
+        Args:
+            create_wallet_manager: Callable creating the wallet manager
+            create_contract_manager: Callable(wallet_manager) creating the contract manager
+        """
+        self.wallet_manager = LazyService(create_wallet_manager)
+        self.contract_manager = LazyService(lambda: create_contract_manager(self.wallet_manager.get()))
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._warming = None
+        self._lock = threading.Lock()
+        self._ready = False
+        self._error = None
+        self._chains = {}
+        self._started = time.monotonic()
+
+    def warm(self):
+        """Create the services and open their connections in a background thread (once per process)."""
+        if self._warming is not None:
+            return
+        with self._lock:
+            if self._warming is None:
+                self._warming = threading.Thread(target=self._warm_loop, name='warmup', daemon=True)
+                self._warming.start()
+
+    def warm_async(self):
+        """
+        Async variant of warm(), for AsyncWalletManager / AsyncContractManager.
+        Must be called on the serving event loop.
+
+        Returns:
+            The warm-up task
+        """
+        if self._warming is None:
+            self._warming = asyncio.get_running_loop().create_task(self._warm_loop_async())
+        return self._warming
+
+    def readiness(self):
+        """
+        Readiness of this process.
+
+        Returns:
+            dict with ready, seconds since startup, the last warm-up error and
+            per-chain connection results
+        """
+        return {
+            'ready': self._ready,
+            'uptime': round(time.monotonic() - self._started, 3),
+            'error': self._error,
+            'chains': self._chains
+        }
+
+    def _warm_loop(self):
+        delay = WARMUP_RETRY_INITIAL
+        while True:
+            try:
+                self.wallet_manager.connect()
+                self._warmed(self.contract_manager.warm())
+                return
+            except Exception as e:
+                self._failed(e, delay)
+            time.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX)
+
+    async def _warm_loop_async(self):
+        delay = WARMUP_RETRY_INITIAL
+        while True:
+            try:
+                await self.wallet_manager.connect()
+                self._warmed(await self.contract_manager.warm())
+                return
+            except Exception as e:
+                self._failed(e, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX)
+
+    def _warmed(self, chains):
+        self._chains = {str(chain_id): healthy for chain_id, healthy in chains.items()}
+        down = [chain_id for chain_id in READY_CHAINS if not chains.get(chain_id)]
+        if down:
+            # Not ready; the warm-up loop retries with backoff
+            raise ConnectionError(f'RPC not answering on chain {", ".join(map(str, down))}')
+        self._error = None
+        self._ready = True
+
+    def _failed(self, error, delay):
+        self._error = str(error)
+        print(f'Warning: warm-up failed ({error}); retrying in {delay}s')
+
+
+def preload():
+    """
+    Import the chain modules without creating anything, so forked workers
+    share them instead of importing web3 each. Called by gunicorn.conf.py.
+    """
+    import contract_manager
+    import wallet_manager
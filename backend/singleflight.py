@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Single-flight coalescing for chain reads.
+Identical reads made at the same time (same chain, method and arguments)
+share one upstream call: the first caller runs it and every caller that
+arrives while it is in flight waits for, and gets, the same result or error.
+Upstream volume then follows the number of distinct reads rather than the
+number of requests.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from metrics import observe_read_flight
+
+
+class SingleFlight:
+    """Coalesces identical in-flight reads across threads."""
+
+    def __init__(self):
+        self._calls = {}  # (chain_id, method, args) -> Future
+        self._lock = threading.Lock()
+
+    def do(self, chain_id, method, args, fetch):
+        """
+        Run a read, or join the identical one already in flight.
+
+        Args:
+            chain_id: Chain ID (None for the wallet's default connection)
+            method: Read method, e.g. 'eth_call' or 'eth_getBalance'
+            args: Hashable read arguments
+            fetch: Callable making the read
+
+        Returns:
+            Read result
+        """
+        key = (chain_id, method, args)
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            observe_read_flight(chain_id, method, 'coalesced')
+            return future.result()
+
+        observe_read_flight(chain_id, method, 'fetched')
+        try:
+            result = fetch()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def join(self, chain_id, method, args, future):
+        """
+        Share a Future-based read: return the Future of the identical read in
+        flight, or register this one until it is done.
+
+        Args:
+            chain_id: Chain ID
+            method: Read method
+            args: Hashable read arguments
+            future: Future of the read about to be started
+
+        Returns:
+            (future, leader): the Future to wait on, and True if the caller must
+            start its read
+        """
+        key = (chain_id, method, args)
+        with self._lock:
+            shared = self._calls.get(key)
+            if shared is None:
+                self._calls[key] = future
+        if shared is not None:
+            observe_read_flight(chain_id, method, 'coalesced')
+            return shared, False
+
+        observe_read_flight(chain_id, method, 'fetched')
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future, True
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """Coalesces identical in-flight reads on one event loop."""
+
+    def __init__(self):
+        self._calls = {}  # (chain_id, method, args) -> Task
+
+    async def do(self, chain_id, method, args, fetch):
+        """
+        Run a read, or join the identical one already in flight.
+
+        Args:
+            chain_id: Chain ID (None for the wallet's default connection)
+            method: Read method, e.g. 'eth_call' or 'eth_getBalance'
+            args: Hashable read arguments
+            fetch: Coroutine function making the read
+
+        Returns:
+            Read result
+        """
+        key = (chain_id, method, args)
+        task = self._calls.get(key)
+        if task is None:
+            observe_read_flight(chain_id, method, 'fetched')
+            task = self._calls[key] = asyncio.ensure_future(fetch())
+            task.add_done_callback(lambda done: self._calls.pop(key, None))
+        else:
+            observe_read_flight(chain_id, method, 'coalesced')
+        # A caller that goes away does not cancel the read for the others
+        return await asyncio.shield(task)
@@ -0,0 +1,87 @@
+"""PyPayAddressDeriver: offline CREATE2 derivation matches Factory.computeAddress."""
+
+import os
+import shlex
+import shutil
+import socket
+import pytest
+from eth_abi import encode
+from web3 import Web3
+from create2 import PyPayAddressDeriver, create2_address
+
+OPERATOR = '0x3d94E55a2C3Cf83226b3D056eBeBb43b4731417f'
+FACTORY = '0x0ece0dca03180c05c8eb91a3790d763ed02d9b55'
+SIGNERS = [
+    '0x70997970C51812dc3A010C7d01b50e0d17dc79C8',
+    '0x90F79bf6EB2c4f870365E785982E1f101E93b906',
+    '0x0000000000000000000000000000000000000001'
+]
+
+
+@pytest.mark.parametrize('deployer, salt, init_code, expected', [
+    # EIP-1014 examples
+    ('0x0000000000000000000000000000000000000000', 0, '00', '0x4D1A2e2bB4F88F0250f26Ffff098B0b30B26BF38'),
+    ('0xdeadbeef00000000000000000000000000000000', 0, '00', '0xB928f69Bb1D91Cd65274e3c79d8986362984fDA3'),
+    ('0xdeadbeef00000000000000000000000000000000', 0xfeed << 144, '00', '0xD04116cDd17beBE565EB2422F2497E06cC1C9833'),
+    ('0x0000000000000000000000000000000000000000', 0, 'deadbeef', '0x70f2b2914A2a4b783FaEFb75f459A580616Fcb5e'),
+    ('0x00000000000000000000000000000000deadbeef', 0xcafebabe, 'deadbeef', '0x60f3f640a8508fC6a86d45DF051962668E1e8AC7'),
+    ('0x00000000000000000000000000000000deadbeef', 0xcafebabe, 'deadbeef' * 11, '0x1d8bfDC5D46DC4f61D6b6115972536eBE6A8854C'),
+    ('0x0000000000000000000000000000000000000000', 0, '', '0xE33C0C7F7df4809055C3ebA6c09CFe4BaF1BD9e0')
+])
+def test_create2_address_matches_eip_1014(deployer, salt, init_code, expected):
+    init_code_hash = Web3.keccak(bytes.fromhex(init_code))
+    assert create2_address(deployer, salt.to_bytes(32, 'big'), init_code_hash) == expected
+
+
+def test_deriver_appends_the_constructor_arguments():
+    creation_code = bytes.fromhex('6080604052')
+    deriver = PyPayAddressDeriver('0x6080604052', FACTORY, OPERATOR)
+
+    for salt in (0, 1, 2**256 - 1):
+        # type(PyPay).creationCode ++ abi.encode(signer, operator), salt bytes32(salt_int)
+        init_code = creation_code + encode(['address', 'address'], [SIGNERS[0], OPERATOR])
+        expected = create2_address(Web3.to_checksum_address(FACTORY), salt.to_bytes(32, 'big'), Web3.keccak(init_code))
+        assert deriver.compute(SIGNERS[0].lower(), salt) == expected
+
+
+def test_compute_many_keeps_signer_order():
+    deriver = PyPayAddressDeriver('6080604052', FACTORY, OPERATOR)
+    assert deriver.compute_many(SIGNERS) == [deriver.compute(signer) for signer in SIGNERS]
+    assert len(set(deriver.compute_many(SIGNERS))) == len(SIGNERS)
+
+
+def test_empty_creation_code_is_refused():
+    with pytest.raises(ValueError):
+        PyPayAddressDeriver('0x', FACTORY, OPERATOR)
+
+
+@pytest.fixture(scope='module')
+def factory_chain():
+    """A local node with the compiled Factory installed (anvil, or TEST_NODE_CMD)."""
+    import benchmark
+
+    node_cmd = os.getenv('TEST_NODE_CMD', benchmark.DEFAULT_NODE_CMD)
+    if shutil.which(shlex.split(node_cmd)[0]) is None:
+        pytest.skip(f'no local node ({node_cmd})')
+    if not (benchmark.ARTIFACTS_DIR / 'pypay.sol' / 'Factory.json').exists():
+        pytest.skip('contracts not compiled (npx hardhat compile)')
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    chain = benchmark.LocalChain(1, port, node_cmd)
+    try:
+        artifact = benchmark.load_artifact('pypay.sol', 'Factory')
+        chain.set_code(FACTORY, artifact)
+        yield chain.web3.eth.contract(address=Web3.to_checksum_address(FACTORY), abi=artifact['abi'])
+    finally:
+        chain.stop()
+
+
+def test_deriver_matches_factory_compute_address(factory_chain):
+    import benchmark
+
+    deriver = PyPayAddressDeriver(benchmark.load_artifact('pypay.sol', 'PyPay')['bytecode'], FACTORY, OPERATOR)
+    for signer in SIGNERS:
+        for salt in (0, 1, 2**255 + 7):
+            assert deriver.compute(signer, salt) == factory_chain.functions.computeAddress(salt, signer, OPERATOR).call()
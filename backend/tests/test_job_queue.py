@@ -0,0 +1,162 @@
+"""JobQueue: each task is claimed by one worker, and taken over once its lease expires."""
+
+import json
+import sqlite3
+import threading
+import time
+import pytest
+import job_queue
+from job_queue import JobQueue, PermanentError, RUNNING, SUCCEEDED, FAILED
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(job_queue, 'JOB_POLL_INTERVAL', 0.05)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'jobs.db')
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_each_task_is_claimed_once(db_path):
+    calls = []
+    lock = threading.Lock()
+
+    def handler(kind, chain_id, payload, sent, record):
+        with lock:
+            calls.append((payload['n'], chain_id))
+        return f'0x{payload["n"]:064x}'
+
+    queue = JobQueue(handler, db_path, workers_per_chain=4)
+    job_ids = [queue.enqueue('transfer', [1, 42161], {'n': n}) for n in range(40)]
+
+    assert wait_for(lambda: all(queue.get(job_id)['state'] == SUCCEEDED for job_id in job_ids))
+    assert sorted(calls) == sorted((n, chain_id) for n in range(40) for chain_id in (1, 42161))
+    job = queue.get(job_ids[0])
+    assert job['results'][1] == {'state': SUCCEEDED, 'attempts': 1, 'tx_hash': f'0x{0:064x}'}
+
+
+def test_running_task_is_taken_over_after_lease_expiry(db_path, monkeypatch):
+    monkeypatch.setattr(job_queue, 'JOB_LEASE', 0.5)
+    hung = threading.Event()
+    calls = []
+
+    def handler(kind, chain_id, payload, sent, record):
+        calls.append(sent)
+        if len(calls) == 1:
+            # The first worker records its transaction, then hangs past its lease
+            record({'tx_hash': '0xaa'})
+            hung.wait(10)
+        return '0xaa'
+
+    queue = JobQueue(handler, db_path, workers_per_chain=2)
+    job_id = queue.enqueue('transfer', [1], {})
+    try:
+        assert wait_for(lambda: len(calls) == 1)
+        time.sleep(0.2)
+        # Still leased: the other worker leaves it alone
+        assert len(calls) == 1
+        assert queue.get(job_id)['state'] == RUNNING
+
+        assert wait_for(lambda: queue.get(job_id)['state'] == SUCCEEDED)
+        assert calls == [None, {'tx_hash': '0xaa'}]
+        assert queue.get(job_id)['results'][1]['attempts'] == 2
+    finally:
+        hung.set()
+
+
+def test_worker_whose_lease_was_taken_over_cannot_finish_the_task(db_path, monkeypatch):
+    monkeypatch.setattr(job_queue, 'JOB_LEASE', 0.5)
+    hung = threading.Event()
+    stale_done = threading.Event()
+    calls = []
+    finished = []
+
+    def handler(kind, chain_id, payload, sent, record):
+        calls.append(sent)
+        if len(calls) == 1:
+            hung.wait(10)
+            # Wakes up after the takeover: neither its record nor its failure may land
+            try:
+                record({'tx_hash': '0xstale'})
+                raise ConnectionError('stale worker')
+            finally:
+                stale_done.set()
+        return '0xbb'
+
+    queue = JobQueue(handler, db_path, workers_per_chain=2)
+    queue.add_listener(lambda job_id, chain_id, state: finished.append(state))
+    job_id = queue.enqueue('transfer', [1], {})
+    try:
+        assert wait_for(lambda: queue.get(job_id)['state'] == SUCCEEDED)
+    finally:
+        hung.set()
+    assert stale_done.wait(10)
+    time.sleep(0.2)
+
+    assert queue.get(job_id)['results'][1] == {'state': SUCCEEDED, 'attempts': 2, 'tx_hash': '0xbb'}
+    assert finished == [SUCCEEDED]
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT sent FROM tasks WHERE job_id = ?', (job_id,)).fetchone() == (None,)
+
+
+def test_task_of_a_dead_worker_resumes_on_restart(db_path):
+    JobQueue(lambda *args: None, db_path)
+    now = time.time()
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute(
+        'INSERT INTO jobs (id, kind, payload, created_at) VALUES (?, ?, ?, ?)',
+        ('job', 'transfer', json.dumps({'n': 1}), now)
+    )
+    conn.execute(
+        'INSERT INTO tasks (job_id, chain_id, state, attempts, next_attempt_at, lease_until, updated_at, sent)'
+        ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        ('job', 1, RUNNING, 1, now, now - 1, now, json.dumps({'tx_hash': '0xbb'}))
+    )
+    conn.close()
+
+    received = []
+
+    def handler(kind, chain_id, payload, sent, record):
+        received.append((kind, chain_id, payload, sent))
+        return sent['tx_hash']
+
+    queue = JobQueue(handler, db_path, workers_per_chain=1)
+
+    assert wait_for(lambda: queue.get('job')['state'] == SUCCEEDED)
+    assert received == [('transfer', 1, {'n': 1}, {'tx_hash': '0xbb'})]
+    assert queue.get('job')['tx_hash'] == '0xbb'
+
+
+def test_failed_attempt_is_retried_and_permanent_error_is_not(db_path, monkeypatch):
+    monkeypatch.setattr(job_queue, 'JOB_RETRY_BASE', 0.05)
+    attempts = {}
+
+    def handler(kind, chain_id, payload, sent, record):
+        attempts[kind] = attempts.get(kind, 0) + 1
+        if kind == 'reverts':
+            raise PermanentError('Call reverts: nonce used!')
+        if attempts[kind] == 1:
+            raise ConnectionError('node unreachable')
+        return '0xcc'
+
+    queue = JobQueue(handler, db_path, workers_per_chain=1)
+    retried = queue.enqueue('flaky', [1], {})
+    reverted = queue.enqueue('reverts', [1], {})
+
+    assert wait_for(lambda: queue.get(retried)['state'] == SUCCEEDED)
+    assert wait_for(lambda: queue.get(reverted)['state'] == FAILED)
+    assert queue.get(retried)['results'][1]['attempts'] == 2
+    assert queue.get(reverted)['results'][1] == {
+        'state': FAILED, 'attempts': 1, 'error': 'Call reverts: nonce used!'
+    }
@@ -0,0 +1,166 @@
+"""Queued sends: a broadcast lost in transport keeps its nonce and is re-sent, a refused one is not."""
+
+import time
+import pytest
+import requests
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+import job_queue
+from contract_manager import ContractManager, job_payload
+from contract_registry import ContractRegistry
+from job_queue import JobQueue, SUCCEEDED
+from nonce_manager import NonceManager
+from tx_signer import TransactionSigner
+
+CHAIN_ID = 1
+# Development key (never use on a real chain)
+PRIVATE_KEY = '0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80'
+CONTRACT = '0x1111111111111111111111111111111111111111'
+TARGET = '0x90F79bf6EB2c4f870365E785982E1f101E93b906'
+
+PAYLOAD_INPUTS = [
+    {'name': 'sourceChainIds', 'type': 'uint256[]'},
+    {'name': 'amountEach', 'type': 'uint256[]'},
+    {'name': 'nonces', 'type': 'uint256[]'},
+    {'name': 'expiry', 'type': 'uint256'},
+    {'name': 'destinationChainId', 'type': 'uint256'},
+    {'name': 'targetAddress', 'type': 'address'},
+    {'name': 'signature', 'type': 'bytes'}
+]
+PYPAY_ABI = [{
+    'type': 'function', 'name': 'transfer', 'stateMutability': 'nonpayable',
+    'inputs': PAYLOAD_INPUTS, 'outputs': [{'name': '', 'type': 'bool'}]
+}]
+
+
+class FakeEth:
+    """
+    Answers sends from a script of outcomes (an exception to raise, or None to accept).
+    A send that times out was received anyway, and is mined.
+    """
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.mined = set()
+        self.sent = []
+
+    def get_transaction_count(self, address, block_identifier):
+        return 0
+
+    def send_raw_transaction(self, raw):
+        self.sent.append(bytes(raw))
+        outcome = self.outcomes.pop(0) if self.outcomes else None
+        if isinstance(outcome, requests.exceptions.Timeout):
+            self.mined.add(Web3.to_hex(Web3.keccak(raw)))
+        if outcome is not None:
+            raise outcome
+        return Web3.keccak(raw)
+
+    def get_transaction_receipt(self, tx_hash):
+        if tx_hash not in self.mined:
+            raise TransactionNotFound(tx_hash)
+        return {'transactionHash': tx_hash, 'status': 1}
+
+
+class FakeWeb3:
+    def __init__(self, eth):
+        self.eth = eth
+
+
+class FakeWallet:
+    def __init__(self):
+        self.signer = TransactionSigner(PRIVATE_KEY, workers=0)
+        self.address = self.signer.address
+
+    def sign_transaction(self, transaction):
+        return self.signer.sign(transaction)
+
+
+class FakeFeeOracle:
+    def get_fees(self, web3, chain_id, urgency):
+        return {'maxFeePerGas': 2 * 10**9, 'maxPriorityFeePerGas': 10**9}
+
+    def gas_limit(self, chain_id, label, web3=None, transaction=None):
+        return 500000
+
+
+class Recorder:
+    """Stands in for the tracker and the accelerator, recording what they are given."""
+
+    def __init__(self):
+        self.tracked = []
+        self.watched = []
+        self.released = []
+
+    def track(self, tx_hash, chain_id, web3=None, label=None):
+        self.tracked.append(tx_hash)
+
+    def watch(self, chain_id, web3, transaction, tx_hash, label=None):
+        self.watched.append((transaction['nonce'], tx_hash))
+
+    def release(self, chain_id, web3, nonces):
+        self.released.extend(nonces)
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(job_queue, 'JOB_POLL_INTERVAL', 0.05)
+    monkeypatch.setattr(job_queue, 'JOB_RETRY_BASE', 0.05)
+
+
+def make_manager(tmp_path, eth):
+    # Only what call_contract and _run_job use; no RPC or artifacts needed
+    manager = ContractManager.__new__(ContractManager)
+    manager.wallet_manager = FakeWallet()
+    manager.contracts = ContractRegistry()
+    manager.contracts.register('PyPay', PYPAY_ABI)
+    manager.fee_oracle = FakeFeeOracle()
+    manager.nonces = NonceManager(str(tmp_path / 'nonces.db'), resync_interval=3600)
+    manager.tracker = manager.accelerator = Recorder()
+    manager.get_web3_for_chain = lambda chain_id: FakeWeb3(eth)
+    manager.jobs = JobQueue(manager._run_job, str(tmp_path / 'jobs.db'), workers_per_chain=1)
+    return manager
+
+
+def enqueue(manager):
+    payload = job_payload(
+        CONTRACT, [CHAIN_ID], [1_000_000], [7], int(time.time()) + 3600, CHAIN_ID, TARGET, b'\x01' * 65, 'normal'
+    )
+    return manager.jobs.enqueue('transfer', [CHAIN_ID], payload)
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_send_timeout_keeps_the_nonce_and_resends_the_same_transaction(tmp_path):
+    # The first broadcast times out although the node got it; the retry learns it was mined
+    eth = FakeEth([requests.exceptions.ReadTimeout('read timed out'), ValueError({'code': -32000, 'message': 'nonce too low'})])
+    manager = make_manager(tmp_path, eth)
+    job_id = enqueue(manager)
+
+    assert wait_for(lambda: manager.jobs.get(job_id)['state'] == SUCCEEDED)
+    job = manager.jobs.get(job_id)
+    assert manager.accelerator.released == []
+    assert eth.sent[0] == eth.sent[1]
+    assert job['tx_hash'] == manager.tracker.tracked[0]
+    assert job['results'][CHAIN_ID]['attempts'] == 2
+    # The nonce stayed taken
+    assert manager.nonces.allocate(None, CHAIN_ID, manager.wallet_manager.address) == 1
+
+
+def test_refused_send_releases_the_nonce_and_signs_anew(tmp_path):
+    eth = FakeEth([ValueError({'code': -32000, 'message': 'insufficient funds for gas * price + value'})])
+    manager = make_manager(tmp_path, eth)
+    job_id = enqueue(manager)
+
+    assert wait_for(lambda: manager.jobs.get(job_id)['state'] == SUCCEEDED)
+    assert manager.accelerator.released == [0]
+    # Nothing was re-sent from a record: one refused send, then one fresh send
+    assert len(eth.sent) == 2
+    assert manager.jobs.get(job_id)['results'][CHAIN_ID]['attempts'] == 2
@@ -0,0 +1,122 @@
+"""NonceManager: allocation and release across threads and processes sharing the store."""
+
+import threading
+import pytest
+from nonce_manager import NonceManager
+
+CHAIN_ID = 1
+ADDRESS = '0x19E7E376E7C213B7E7e7e46cc70A5dD086DAff2A'
+
+
+class FakeEth:
+    def __init__(self, pending):
+        self.pending = pending
+        self.calls = 0
+
+    def get_transaction_count(self, address, block_identifier):
+        assert block_identifier == 'pending'
+        self.calls += 1
+        return self.pending
+
+
+class FakeWeb3:
+    def __init__(self, pending=0):
+        self.eth = FakeEth(pending)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'nonces.db')
+
+
+def test_first_allocation_starts_at_pending_count(db_path):
+    web3 = FakeWeb3(pending=7)
+    nonces = NonceManager(db_path, resync_interval=3600)
+
+    assert nonces.allocate(web3, CHAIN_ID, ADDRESS) == 7
+    assert nonces.allocate(web3, CHAIN_ID, ADDRESS, count=3) == 8
+    assert nonces.allocate(web3, CHAIN_ID, ADDRESS) == 11
+    assert web3.eth.calls == 1
+
+
+def test_concurrent_allocations_are_unique_and_contiguous(db_path):
+    web3 = FakeWeb3(pending=100)
+    # Two managers on one store stand in for two worker processes
+    managers = [NonceManager(db_path, resync_interval=3600) for _ in range(2)]
+    allocated = []
+    lock = threading.Lock()
+
+    def worker(nonces):
+        for _ in range(50):
+            nonce = nonces.allocate(web3, CHAIN_ID, ADDRESS)
+            with lock:
+                allocated.append(nonce)
+
+    threads = [threading.Thread(target=worker, args=(managers[i % 2],)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(allocated) == list(range(100, 500))
+
+
+def test_release_of_latest_nonces_reuses_them(db_path):
+    web3 = FakeWeb3()
+    nonces = NonceManager(db_path, resync_interval=3600)
+    first = nonces.allocate(web3, CHAIN_ID, ADDRESS, count=2)
+
+    assert nonces.release(CHAIN_ID, ADDRESS, first, count=2) is True
+    assert nonces.allocate(web3, CHAIN_ID, ADDRESS) == first
+
+
+def test_release_behind_a_later_allocation_leaves_a_gap(db_path):
+    web3 = FakeWeb3()
+    nonces = NonceManager(db_path, resync_interval=3600)
+    first = nonces.allocate(web3, CHAIN_ID, ADDRESS)
+    second = nonces.allocate(web3, CHAIN_ID, ADDRESS)
+
+    assert nonces.release(CHAIN_ID, ADDRESS, first) is False
+    assert nonces.allocate(web3, CHAIN_ID, ADDRESS) == second + 1
+
+
+def test_concurrent_allocate_and_release_never_hand_out_a_held_nonce(db_path):
+    web3 = FakeWeb3()
+    nonces = NonceManager(db_path, resync_interval=3600)
+    held = set()
+    duplicates = []
+    lock = threading.Lock()
+
+    def worker(index):
+        for attempt in range(100):
+            nonce = nonces.allocate(web3, CHAIN_ID, ADDRESS)
+            with lock:
+                if nonce in held:
+                    duplicates.append(nonce)
+                held.add(nonce)
+            if (index + attempt) % 3 == 0:
+                # A failed send: give the nonce back; if it became a gap it stays taken
+                with lock:
+                    held.discard(nonce)
+                if not nonces.release(CHAIN_ID, ADDRESS, nonce):
+                    with lock:
+                        held.add(nonce)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert duplicates == []
+    assert max(held) < nonces.allocate(web3, CHAIN_ID, ADDRESS)
+
+
+def test_resync_moves_forward_when_the_chain_is_ahead(db_path):
+    web3 = FakeWeb3(pending=5)
+    nonces = NonceManager(db_path, resync_interval=0)
+    assert nonces.allocate(web3, CHAIN_ID, ADDRESS) == 5
+
+    # Another sender used the account meanwhile
+    web3.eth.pending = 9
+    assert nonces.allocate(web3, CHAIN_ID, ADDRESS) == 9
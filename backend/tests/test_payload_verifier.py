@@ -0,0 +1,133 @@
+"""PayloadVerifier: every check of PyPay.signatureVerifier rejects with the contract's reason."""
+
+import pytest
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from config import EXPIRY_MARGIN
+from payload_verifier import PayloadVerifier, payload_hash
+
+NOW = 1_700_000_000
+# Development keys (never use on a real chain)
+SIGNER = Account.from_key('0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d')
+OTHER = Account.from_key('0x5de4111afa1a4b94908f83103eb1f1706367c2e68ca870fc3fb9a804cdab365a')
+CONTRACT = '0x1111111111111111111111111111111111111111'
+TARGET = '0x90F79bf6EB2c4f870365E785982E1f101E93b906'
+
+
+class FakeUsedNonces:
+    def __init__(self, used=()):
+        self.used = set(used)
+
+    def is_used(self, chain_id, contract_address, nonce):
+        return (chain_id, contract_address, nonce) in self.used
+
+
+class FakeContracts:
+    """Maps signers to their PyPay contract; records the lookups made."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, signers, chain_id):
+        self.calls.append((list(signers), chain_id))
+        return [CONTRACT if signer == SIGNER.address else '0x' + '22' * 20 for signer in signers]
+
+
+def signed_payload(account=SIGNER, **fields):
+    payload = {
+        'contract_address': CONTRACT,
+        'chain_id': 1,
+        'source_chain_ids': [1, 42161],
+        'amount_each': [1_000_000, 2_000_000],
+        'nonces': [5, 6],
+        'expiry': NOW + 3600,
+        'destination_chain_id': 42161,
+        'target_address': TARGET,
+        **fields
+    }
+    message_hash = payload_hash(
+        payload['source_chain_ids'], payload['amount_each'], payload['nonces'],
+        payload['expiry'], payload['destination_chain_id'], payload['target_address']
+    )
+    if 'signature' not in payload:
+        payload['signature'] = bytes(Account.sign_message(encode_defunct(primitive=message_hash), account.key).signature)
+    return payload
+
+
+@pytest.fixture
+def contracts():
+    return FakeContracts()
+
+
+@pytest.fixture
+def verifier(contracts):
+    return PayloadVerifier(FakeUsedNonces({(1, CONTRACT, 99)}), contracts)
+
+
+def test_valid_payload(verifier):
+    assert verifier.verify(signed_payload(), now=NOW) == {'valid': True, 'error': None, 'signer': SIGNER.address}
+
+
+@pytest.mark.parametrize('fields, error', [
+    ({'expiry': NOW + EXPIRY_MARGIN}, 'signature is expired'),
+    ({'expiry': NOW - 1}, 'signature is expired'),
+    ({'chain_id': 10}, 'not authorized source chain'),
+    ({'nonces': [5], 'chain_id': 42161}, 'amount_each and nonces must cover every source chain'),
+    ({'amount_each': [1_000_000], 'chain_id': 42161}, 'amount_each and nonces must cover every source chain'),
+    ({'signature': b'\x00' * 64}, 'invalid signature length'),
+    ({'signature': b'\x01' * 64 + b'\x01'}, 'Invalid signature')
+])
+def test_field_checks(verifier, fields, error):
+    result = verifier.verify(signed_payload(**fields), now=NOW)
+    assert result['valid'] is False
+    assert result['error'] == error
+
+
+def test_used_nonce(verifier, contracts):
+    # The nonce at the index of the chain the transaction runs on is the one checked
+    result = verifier.verify(signed_payload(nonces=[99, 6]), now=NOW)
+    assert result == {'valid': False, 'error': 'nonce used!', 'signer': None}
+    assert verifier.verify(signed_payload(nonces=[5, 99]), now=NOW)['error'] != 'nonce used!'
+    # A payload rejected on its fields needs no contract lookup
+    assert contracts.calls == [([SIGNER.address], 1)]
+
+
+def test_checks_run_in_contract_order(verifier):
+    # Expired and from an unauthorized chain: the contract reverts on expiry first
+    result = verifier.verify(signed_payload(expiry=NOW, chain_id=10), now=NOW)
+    assert result['error'] == 'signature is expired'
+
+
+def test_signer_that_does_not_own_the_contract(verifier):
+    result = verifier.verify(signed_payload(account=OTHER), now=NOW)
+    assert result == {'valid': False, 'error': 'Invalid signature', 'signer': OTHER.address}
+
+
+def test_tampered_payload(verifier):
+    # A changed amount recovers some other address, which owns no matching contract
+    payload = signed_payload()
+    payload['amount_each'] = [9_000_000, 2_000_000]
+    result = verifier.verify(payload, now=NOW)
+    assert result['valid'] is False
+    assert result['error'] == 'Invalid signature'
+    assert result['signer'] != SIGNER.address
+
+
+def test_verify_many_keeps_order_and_resolves_contracts_once_per_chain(verifier, contracts):
+    payloads = [
+        signed_payload(),
+        signed_payload(expiry=NOW),
+        signed_payload(account=OTHER),
+        signed_payload(chain_id=42161),
+        signed_payload()
+    ]
+    results = verifier.verify_many(payloads, now=NOW)
+
+    assert [result['error'] for result in results] == [
+        None, 'signature is expired', 'Invalid signature', None, None
+    ]
+    assert {chain_id: signers for signers, chain_id in contracts.calls} == {
+        1: [SIGNER.address, OTHER.address, SIGNER.address],
+        42161: [SIGNER.address]
+    }
+    assert len(contracts.calls) == 2
@@ -0,0 +1,76 @@
+"""TransactionSigner: the native path produces the same signed bytes as eth_account."""
+
+import pytest
+from eth_account import Account
+from tx_signer import TransactionSigner
+
+# Development key (never use on a real chain)
+PRIVATE_KEY = '0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80'
+ADDRESS = Account.from_key(PRIVATE_KEY).address
+TO = '0x70997970C51812dc3A010C7d01b50e0d17dc79C8'
+
+TRANSACTIONS = {
+    'dynamic-fee call': {
+        'type': 2, 'chainId': 1, 'nonce': 42, 'to': TO, 'value': 0, 'gas': 500000,
+        'maxFeePerGas': 30 * 10**9, 'maxPriorityFeePerGas': 10**9, 'data': '0xa9059cbb' + '00' * 64
+    },
+    'dynamic-fee bytes data, from, empty access list': {
+        'type': 2, 'chainId': 42161, 'nonce': 0, 'to': TO, 'value': 10**18, 'gas': 21000,
+        'maxFeePerGas': 10**8, 'maxPriorityFeePerGas': 0, 'data': b'\x01\x02', 'from': ADDRESS,
+        'accessList': []
+    },
+    'dynamic-fee without type or data': {
+        'chainId': 1, 'nonce': 127, 'to': TO, 'gas': 21000,
+        'maxFeePerGas': 2**64, 'maxPriorityFeePerGas': 2**63
+    },
+    'legacy EIP-155': {
+        'chainId': 1, 'nonce': 128, 'to': TO, 'value': 1, 'gas': 21000, 'gasPrice': 20 * 10**9, 'data': '0x'
+    },
+    'legacy large chain ID': {
+        'chainId': 42161, 'nonce': 2**32, 'to': TO, 'gas': 100000, 'gasPrice': 10**8
+    },
+    'access list (eth_account path)': {
+        'type': 2, 'chainId': 1, 'nonce': 1, 'to': TO, 'gas': 50000,
+        'maxFeePerGas': 10**9, 'maxPriorityFeePerGas': 10**9,
+        'accessList': [{'address': TO, 'storageKeys': ['0x' + '00' * 32]}]
+    }
+}
+
+
+@pytest.fixture(scope='module')
+def signer():
+    return TransactionSigner(PRIVATE_KEY, workers=0)
+
+
+def assert_same(signed, expected):
+    assert signed.rawTransaction == expected.rawTransaction
+    assert signed.hash == expected.hash
+    assert (signed.r, signed.s, signed.v) == (expected.r, expected.s, expected.v)
+
+
+def test_native_signing_is_available(signer):
+    assert signer.native
+    assert signer.address == ADDRESS
+
+
+@pytest.mark.parametrize('name', list(TRANSACTIONS))
+def test_sign_matches_eth_account(signer, name, monkeypatch):
+    transaction = TRANSACTIONS[name]
+    if 'eth_account path' not in name:
+        # Signed natively, without falling back
+        monkeypatch.setattr(signer._signer, '_account', None)
+    assert_same(signer.sign(dict(transaction)), Account.sign_transaction(dict(transaction), PRIVATE_KEY))
+
+
+def test_sign_many_matches_eth_account_in_order(signer):
+    transactions = [dict(TRANSACTIONS['dynamic-fee call'], nonce=nonce) for nonce in range(20)]
+    for signed, transaction in zip(signer.sign_many(transactions), transactions):
+        assert_same(signed, Account.sign_transaction(transaction, PRIVATE_KEY))
+
+
+def test_from_of_another_account_is_refused(signer):
+    transaction = dict(TRANSACTIONS['dynamic-fee call'], **{'from': TO})
+    with pytest.raises(TypeError):
+        signer.sign(transaction)
+    with pytest.raises(TypeError):
+        Account.sign_transaction(transaction, PRIVATE_KEY)
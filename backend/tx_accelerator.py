@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Transaction Accelerator for stuck operator transactions.
+Watches every transaction the backend sends and, once it has been pending
+longer than the chain's inclusion deadline, re-signs it with the same nonce
+and bumped fees (replace-by-fee), up to a cap. Replacements are linked in
+the transaction tracker so /tx-status maps any hash to the one mined.
+Nonces of transactions that were never sent are given back to the nonce
+manager when nothing was allocated after them; otherwise they are filled
+with zero-value transfers to self, so later transactions can be mined.
+"""
+
+import time
+import threading
+from web3 import Web3
+from config import (
+    TX_INCLUSION_DEADLINE, TX_INCLUSION_DEADLINES, TX_FEE_BUMP, TX_MAX_BUMPS, TX_MAX_FEE_MULTIPLIER
+)
+from metrics import observe_replacement
+
+FEE_FIELDS = ('maxFeePerGas', 'maxPriorityFeePerGas', 'gasPrice')
+
+# A plain value transfer to self, used to fill a nonce left unused by a failed send
+GAP_FILL_GAS = 21000
+
+
+def bump_fees(transaction, current, original):
+    """
+    Fee fields for a replacement transaction.
+
+    Args:
+        transaction: Fee fields of the transaction being replaced
+        current: Current fast fee fields from the fee oracle
+        original: Fee fields of the first transaction with this nonce
+
+    Returns:
+        New fee fields, or None if the cap leaves no room for a valid replacement
+    """
+    def bumped(field):
+        # At least TX_FEE_BUMP over the last bid (nodes reject smaller bumps), and at least the current price
+        return max(int(transaction[field] * (1 + TX_FEE_BUMP)) + 1, current.get(field, 0))
+
+    if 'gasPrice' in transaction:
+        gas_price = bumped('gasPrice')
+        if gas_price > original['gasPrice'] * TX_MAX_FEE_MULTIPLIER:
+            return None
+        return {'gasPrice': gas_price}
+
+    priority_fee = bumped('maxPriorityFeePerGas')
+    max_fee = max(bumped('maxFeePerGas'), priority_fee)
+    if max_fee > original['maxFeePerGas'] * TX_MAX_FEE_MULTIPLIER:
+        return None
+    return {'maxFeePerGas': max_fee, 'maxPriorityFeePerGas': priority_fee}
+
+
+class TransactionAccelerator:
+    """Replaces operator transactions that miss their inclusion deadline."""
+
+    def __init__(self, signer, nonces, tracker, heads, fee_oracle):
+        """
+        Initialize the accelerator.
+
+        Args:
+            signer: TransactionSigner of the operator key, which signs replacements
+            nonces: NonceManager handing out the operator's nonces
+            tracker: TransactionTracker that tracks replacements and their links
+            heads: HeadFollower that drives the checks
+            fee_oracle: FeeOracle for current fees
+        """
+        self.signer = signer
+        self.nonces = nonces
+        self.tracker = tracker
+        self.heads = heads
+        self.fee_oracle = fee_oracle
+        self._watched = {}  # chain_id -> {nonce: entry}
+        self._gaps = {}     # chain_id -> set of unused nonces to fill
+        self._web3 = {}     # chain_id -> Web3
+        self._lock = threading.Lock()
+
+        heads.subscribe(self._on_block)
+
+    def watch(self, chain_id, web3, transaction, tx_hash, label=None):
+        """
+        Watch a sent transaction until its nonce is used.
+
+        Args:
+            chain_id: Chain ID
+            web3: Web3 instance for the chain (sync)
+            transaction: Unsigned transaction dict that was signed and sent
+            tx_hash: Hash of the sent transaction
+            label: Optional label passed on to the tracker (e.g. function name)
+        """
+        now = time.time()
+        with self._lock:
+            self._web3.setdefault(chain_id, web3)
+            self._watched.setdefault(chain_id, {})[transaction['nonce']] = {
+                'transaction': dict(transaction),
+                'original_fees': {field: transaction[field] for field in FEE_FIELDS if field in transaction},
+                'tx_hash': tx_hash,
+                'label': label,
+                'sent_at': now,
+                'bumps': 0
+            }
+        self.heads.follow(chain_id, web3)
+
+    def release(self, chain_id, web3, nonces):
+        """
+        Give back nonces whose transactions were never sent.
+        The highest consecutive run is reused if nothing was allocated after it;
+        every other nonce is a gap and gets filled.
+
+        Args:
+            chain_id: Chain ID
+            web3: Web3 instance for the chain (sync)
+            nonces: Unused nonces
+        """
+        nonces = sorted(set(nonces))
+        if not nonces:
+            return
+        start = len(nonces) - 1
+        while start and nonces[start - 1] == nonces[start] - 1:
+            start -= 1
+        if self.nonces.release(chain_id, self.signer.address, nonces[start], len(nonces) - start):
+            nonces = nonces[:start]
+        if nonces:
+            self.fill_gaps(chain_id, web3, nonces)
+
+    def fill_gaps(self, chain_id, web3, nonces):
+        """
+        Fill unused nonces with zero-value transfers to self. Fills that cannot
+        be sent now are retried on every new head until the nonce is used.
+
+        Args:
+            chain_id: Chain ID
+            web3: Web3 instance for the chain (sync)
+            nonces: Unused nonces
+        """
+        with self._lock:
+            self._web3.setdefault(chain_id, web3)
+            self._gaps.setdefault(chain_id, set()).update(nonces)
+        self.heads.follow(chain_id, web3)
+        try:
+            self._fill(chain_id, web3, web3.eth.get_transaction_count(self.signer.address, 'latest'))
+        except Exception:
+            # e.g. fee oracle or RPC down; retried on the next head
+            pass
+
+    def _on_block(self, chain_id, web3, block_number, new_head):
+        if not new_head or not (self._watched.get(chain_id) or self._gaps.get(chain_id)):
+            return
+        web3 = self._web3.get(chain_id, web3)
+
+        # A mined nonce is done, whichever of its transactions made it
+        confirmed = web3.eth.get_transaction_count(self.signer.address, 'latest')
+        if self._gaps.get(chain_id):
+            try:
+                self._fill(chain_id, web3, confirmed)
+            except Exception:
+                pass
+        deadline = TX_INCLUSION_DEADLINES.get(chain_id, TX_INCLUSION_DEADLINE)
+        now = time.time()
+        with self._lock:
+            watched = self._watched.setdefault(chain_id, {})
+            for nonce in [n for n in watched if n < confirmed]:
+                del watched[nonce]
+            # Lowest nonce first: it holds up every later one
+            overdue = [(nonce, watched[nonce]) for nonce in sorted(watched) if now - watched[nonce]['sent_at'] >= deadline]
+
+        for nonce, entry in overdue:
+            try:
+                self._replace(chain_id, web3, nonce, entry)
+            except Exception:
+                # e.g. fee oracle or RPC down; retried on the next head
+                continue
+
+    def _replace(self, chain_id, web3, nonce, entry):
+        transaction = entry['transaction']
+        fees = None
+        if entry['bumps'] < TX_MAX_BUMPS:
+            current = self.fee_oracle.get_fees(web3, chain_id, 'fast')
+            fees = bump_fees(transaction, current, entry['original_fees'])
+        if fees is None:
+            # Capped: leave it to the network and stop watching
+            observe_replacement(chain_id, 'capped')
+            self._forget(chain_id, nonce)
+            return
+
+        replacement = {**{k: v for k, v in transaction.items() if k not in FEE_FIELDS}, **fees}
+        raw = self.signer.sign(replacement).rawTransaction
+        try:
+            tx_hash = web3.eth.send_raw_transaction(raw).hex()
+        except Exception as e:
+            message = str(e).lower()
+            if 'nonce too low' in message:
+                # One of its transactions was mined since the last head
+                self._forget(chain_id, nonce)
+                return
+            if 'already known' not in message:
+                # e.g. underpriced; bid again from the new fees after the next deadline
+                observe_replacement(chain_id, 'failed')
+                self._update(chain_id, nonce, replacement, entry['tx_hash'])
+                return
+            tx_hash = Web3.keccak(raw).hex()
+
+        observe_replacement(chain_id, 'sent')
+        self.tracker.link(entry['tx_hash'], tx_hash)
+        self.tracker.track(tx_hash, chain_id, web3=web3, label=entry['label'])
+        self._update(chain_id, nonce, replacement, tx_hash)
+
+    def _fill(self, chain_id, web3, confirmed):
+        with self._lock:
+            gaps = self._gaps.get(chain_id, set())
+            gaps.difference_update([nonce for nonce in gaps if nonce < confirmed])
+            nonces = sorted(gaps)
+        if not nonces:
+            return
+
+        address = self.signer.address
+        fees = self.fee_oracle.get_fees(web3, chain_id, 'fast')
+        fills = [
+            {'chainId': chain_id, 'nonce': nonce, 'to': address, 'value': 0, 'gas': GAP_FILL_GAS, **fees}
+            for nonce in nonces
+        ]
+        for fill, signed in zip(fills, self.signer.sign_many(fills)):
+            try:
+                tx_hash = web3.eth.send_raw_transaction(signed.rawTransaction).hex()
+            except Exception as e:
+                message = str(e).lower()
+                if 'nonce too low' in message or 'underpriced' in message:
+                    # Used meanwhile, or a transaction with this nonce is pending after all
+                    self._forget_gap(chain_id, fill['nonce'])
+                    continue
+                if 'already known' not in message:
+                    # Kept for the next head
+                    observe_replacement(chain_id, 'failed')
+                    continue
+                tx_hash = Web3.keccak(signed.rawTransaction).hex()
+
+            observe_replacement(chain_id, 'filled')
+            self._forget_gap(chain_id, fill['nonce'])
+            self.watch(chain_id, web3, fill, tx_hash, label='gap_fill')
+
+    def _forget_gap(self, chain_id, nonce):
+        with self._lock:
+            self._gaps.get(chain_id, set()).discard(nonce)
+
+    def _update(self, chain_id, nonce, transaction, tx_hash):
+        with self._lock:
+            entry = self._watched.get(chain_id, {}).get(nonce)
+            if entry is not None:
+                entry['transaction'] = transaction
+                entry['tx_hash'] = tx_hash
+                entry['sent_at'] = time.time()
+                entry['bumps'] += 1
+
+    def _forget(self, chain_id, nonce):
+        with self._lock:
+            self._watched.get(chain_id, {}).pop(nonce, None)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Transaction Signer for the operator key.
+eth_account spends most of a signature formatting and validating the
+transaction dict in pure Python. For the transactions the backend builds
+(EIP-1559 and EIP-155 legacy, no access list), this signer RLP-encodes the
+transaction directly and signs its hash with libsecp256k1 via coincurve,
+producing the same bytes as eth_account. Anything else, or a missing
+coincurve, goes through eth_account. Large batches can be spread over a
+pool of worker processes. The key is held by the signer only; pool workers
+receive it once, when they start.
+"""
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from eth_account import Account
+from eth_account.datastructures import SignedTransaction
+from eth_utils import is_checksum_address, keccak, to_bytes, to_canonical_address
+from hexbytes import HexBytes
+from config import SIGNING_WORKERS, SIGNING_POOL_MIN_BATCH
+
+try:
+    from coincurve import PrivateKey
+except ImportError:  # pragma: no cover - coincurve is in requirements.txt
+    PrivateKey = None
+
+DYNAMIC_FEE_FIELDS = frozenset({'chainId', 'nonce', 'maxPriorityFeePerGas', 'maxFeePerGas', 'gas', 'to'})
+LEGACY_FIELDS = frozenset({'chainId', 'nonce', 'gasPrice', 'gas', 'to'})
+OPTIONAL_FIELDS = frozenset({'value', 'data', 'from'})
+INT_FIELDS = ('chainId', 'nonce', 'maxPriorityFeePerGas', 'maxFeePerGas', 'gasPrice', 'gas', 'value')
+
+
+def _rlp_length(length, offset):
+    if length < 56:
+        return bytes([offset + length])
+    size = length.to_bytes((length.bit_length() + 7) // 8, 'big')
+    return bytes([offset + 55 + len(size)]) + size
+
+
+def _rlp_encode(item):
+    # RLP for the shapes a transaction has (non-negative ints, bytes, lists of them),
+    # without the pyrlp sedes inference that costs more than the signature
+    if isinstance(item, list):
+        payload = b''.join(_rlp_encode(element) for element in item)
+        return _rlp_length(len(payload), 0xc0) + payload
+    if isinstance(item, int):
+        item = item.to_bytes((item.bit_length() + 7) // 8, 'big')
+    if len(item) == 1 and item[0] < 0x80:
+        return item
+    return _rlp_length(len(item), 0x80) + item
+
+
+@lru_cache(maxsize=4096)
+def _address_bytes(address):
+    # Canonical bytes of a checksummed address, or None (eth_account refuses the rest)
+    return to_canonical_address(address) if is_checksum_address(address) else None
+
+
+def _native_fields(transaction):
+    # Required field set the native path handles, or None to fall back to eth_account
+    fields = set(transaction) - OPTIONAL_FIELDS
+    if transaction.get('type') in (2, '0x2'):
+        fields.discard('type')
+    if transaction.get('accessList') == []:
+        fields.discard('accessList')
+    if not all(isinstance(transaction.get(name, 0), int) for name in INT_FIELDS):
+        return None
+    if not isinstance(transaction.get('to'), str) or _address_bytes(transaction['to']) is None:
+        return None
+    if fields == DYNAMIC_FEE_FIELDS:
+        return DYNAMIC_FEE_FIELDS
+    if fields == LEGACY_FIELDS and 'type' not in transaction:
+        return LEGACY_FIELDS
+    return None
+
+
+class NativeSigner:
+    """Signs transactions for one key with libsecp256k1, falling back to eth_account."""
+
+    def __init__(self, private_key):
+        """
+        Args:
+            private_key: Hex private key
+        """
+        self._account = Account.from_key(private_key)
+        self._key = PrivateKey(bytes(self._account.key)) if PrivateKey is not None else None
+        self.address = self._account.address
+
+    @property
+    def native(self):
+        """True if signatures are made with libsecp256k1 directly."""
+        return self._key is not None
+
+    def sign(self, transaction):
+        """
+        Sign a transaction dict.
+
+        Args:
+            transaction: Transaction fields, as for Account.sign_transaction
+
+        Returns:
+            eth_account SignedTransaction
+        """
+        fields = _native_fields(transaction) if self._key is not None else None
+        if fields is None:
+            return self._account.sign_transaction(transaction)
+        if 'from' in transaction and transaction['from'].lower() != self.address.lower():
+            raise TypeError(f'from field must match key\'s {self.address}, but it was {transaction["from"]}')
+
+        chain_id = transaction['chainId']
+        data = transaction.get('data', b'')
+        call = [
+            transaction['gas'],
+            _address_bytes(transaction['to']),
+            transaction.get('value', 0),
+            to_bytes(hexstr=data) if isinstance(data, str) else bytes(data)
+        ]
+
+        if fields is LEGACY_FIELDS:
+            # EIP-155: rlp([nonce, gasPrice, gas, to, value, data, chainId, 0, 0]), v carries the chain ID
+            body = [transaction['nonce'], transaction['gasPrice']] + call
+            r, s, recovery = self._sign_hash(keccak(_rlp_encode(body + [chain_id, 0, 0])))
+            v = recovery + 35 + 2 * chain_id
+            raw = _rlp_encode(body + [v, r, s])
+        else:
+            # EIP-1559: 0x02 || rlp([chainId, nonce, tip, maxFee, gas, to, value, data, accessList])
+            body = [chain_id, transaction['nonce'], transaction['maxPriorityFeePerGas'], transaction['maxFeePerGas']] + call + [[]]
+            r, s, v = self._sign_hash(keccak(b'\x02' + _rlp_encode(body)))
+            raw = b'\x02' + _rlp_encode(body + [v, r, s])
+
+        return SignedTransaction(rawTransaction=HexBytes(raw), hash=HexBytes(keccak(raw)), r=r, s=s, v=v)
+
+    def _sign_hash(self, message_hash):
+        # 65 bytes: r || s || recovery id; RFC 6979 nonce and low s, as eth_keys
+        signature = self._key.sign_recoverable(message_hash, hasher=None)
+        return int.from_bytes(signature[:32], 'big'), int.from_bytes(signature[32:64], 'big'), signature[64]
+
+
+# Pool worker state: each worker process builds its signer once
+_worker_signer = None
+
+
+def _start_worker(private_key):
+    global _worker_signer
+    _worker_signer = NativeSigner(private_key)
+
+
+def _sign_chunk(transactions):
+    return [_worker_signer.sign(transaction) for transaction in transactions]
+
+
+class TransactionSigner:
+    """Signing service for the operator key: one transaction or many per call."""
+
+    def __init__(self, private_key, workers=None):
+        """
+        Initialize the signer.
+
+        Args:
+            private_key: Hex private key
+            workers: Processes for large sign_many batches (default: SIGNING_WORKERS env
+                or config; 0 signs in the calling thread)
+        """
+        self._signer = NativeSigner(private_key)
+        self._private_key = private_key
+        self.address = self._signer.address
+        self.workers = workers if workers is not None else int(os.getenv('SIGNING_WORKERS', SIGNING_WORKERS))
+        self._pool = None
+        self._pid = None
+
+    @property
+    def native(self):
+        """True if signatures are made with libsecp256k1 directly."""
+        return self._signer.native
+
+    def sign(self, transaction):
+        """
+        Sign one transaction in the calling thread.
+
+        Args:
+            transaction: Transaction fields, as for Account.sign_transaction
+
+        Returns:
+            eth_account SignedTransaction
+        """
+        return self._signer.sign(transaction)
+
+    def sign_many(self, transactions):
+        """
+        Sign many transactions, spread over the worker pool when the batch is large.
+
+        Args:
+            transactions: List of transaction dicts
+
+        Returns:
+            List of SignedTransaction, in order
+        """
+        if self.workers < 2 or len(transactions) < SIGNING_POOL_MIN_BATCH:
+            return [self._signer.sign(transaction) for transaction in transactions]
+
+        size = -(-len(transactions) // self.workers)
+        chunks = [transactions[start:start + size] for start in range(0, len(transactions), size)]
+        signed = []
+        for chunk in self._get_pool().map(_sign_chunk, chunks):
+            signed.extend(chunk)
+        return signed
+
+    def close(self):
+        """Stop the worker pool, if one was started."""
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.shutdown(wait=False)
+        self._pool = None
+
+    def _get_pool(self):
+        # Created on first use and per process: a pool does not survive fork.
+        # Workers are spawned, not forked, since the caller has threads running.
+        if self._pool is None or self._pid != os.getpid():
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_start_worker,
+                initargs=(self._private_key,)
+            )
+            self._pid = os.getpid()
+        return self._pool
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Transaction Tracker for /tx-status.
+Matches pending transaction hashes to receipts in batches on every new head
+and keeps finalized receipts in a bounded cache, so status requests are
+answered from memory. Replacements of a transaction (same nonce, higher
+fees) are linked to it, and a status request for any of them reports the
+one that was mined. Hashes the tracker did not send are looked up once per
+request instead of being tracked.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from chain_clients import batch_request
+from config import (
+    CHAIN_IDS, TX_FINALITY_DEPTH, TX_CACHE_SIZE, TX_BATCH_SIZE, TX_PENDING_TTL, TX_MAX_WAIT,
+    TX_UNKNOWN_TTL, TX_UNKNOWN_CACHE_SIZE
+)
+
+
+class TransactionTracker:
+    """Tracks transaction receipts for every followed chain."""
+
+    def __init__(self, clients, heads):
+        """
+        Initialize the tracker.
+
+        Args:
+            clients: ChainClientRegistry used for chains without an explicit Web3
+            heads: HeadFollower that drives receipt polling
+        """
+        self.clients = clients
+        self.heads = heads
+        self._pending = {}          # chain_id -> {tx_hash: (label, added_at)}
+        self._mined = {}            # tx_hash -> (chain_id, label, receipt summary), not yet final
+        self._final = OrderedDict()  # tx_hash -> (chain_id, receipt summary), bounded LRU
+        self._replacements = OrderedDict()  # original hash -> [original, replacement, ...], bounded
+        self._originals = {}        # any hash of a replacement chain -> original hash
+        self._unknown = OrderedDict()  # (tx_hash, chain_id) -> time of a lookup that found nothing, bounded
+        self._listeners = []
+        self._cond = threading.Condition()
+
+        heads.subscribe(self._on_block)
+
+    def track(self, tx_hash, chain_id, web3=None, label=None):
+        """
+        Start tracking a transaction.
+
+        Args:
+            tx_hash: Transaction hash
+            chain_id: Chain ID the transaction was sent to
+            web3: Optional Web3 instance for the chain (default: registry client)
+            label: Optional label passed to receipt listeners (e.g. function name)
+        """
+        tx_hash = self._normalize(tx_hash)
+        with self._cond:
+            if tx_hash in self._final or tx_hash in self._mined:
+                return
+            self._pending.setdefault(chain_id, {})[tx_hash] = (label, time.time())
+
+        self.heads.follow(chain_id, web3 or self.clients.get(chain_id))
+        self.heads.wake(chain_id)
+
+    def link(self, tx_hash, replacement_hash):
+        """
+        Record that a transaction was replaced (same nonce, higher fees).
+
+        Args:
+            tx_hash: Hash of the replaced transaction (original or earlier replacement)
+            replacement_hash: Hash of the replacement
+        """
+        tx_hash = self._normalize(tx_hash)
+        replacement_hash = self._normalize(replacement_hash)
+        with self._cond:
+            original = self._originals.get(tx_hash, tx_hash)
+            hashes = self._replacements.setdefault(original, [original])
+            if replacement_hash not in hashes:
+                hashes.append(replacement_hash)
+            for linked in hashes:
+                self._originals[linked] = original
+            while len(self._replacements) > TX_CACHE_SIZE:
+                _, dropped = self._replacements.popitem(last=False)
+                for linked in dropped:
+                    self._originals.pop(linked, None)
+            self._cond.notify_all()
+
+    def add_listener(self, callback):
+        """
+        Register a callback for mined receipts.
+
+        Args:
+            callback: Called as callback(chain_id, label, receipt summary)
+        """
+        self._listeners.append(callback)
+
+    def status(self, tx_hash, chain_id=None, wait=0):
+        """
+        Get the status of a transaction from tracker state.
+
+        Args:
+            tx_hash: Transaction hash
+            chain_id: Optional chain ID (default: look on every configured chain)
+            wait: Seconds to wait for the transaction to be mined (long-poll)
+
+        Returns:
+            dict with status, block number, gas used, confirmations and chain ID.
+            For a replaced transaction, transaction_hash is the one that was
+            mined and original_hash / replacements describe the chain.
+        """
+        tx_hash = self._normalize(tx_hash)
+        deadline = time.time() + min(max(wait, 0), TX_MAX_WAIT)
+
+        found = self._find_or_lookup(tx_hash, chain_id)
+        while found is None and time.time() < deadline:
+            # Tracked hashes are signalled when mined; unknown ones are looked up again
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._find(tx_hash) is not None,
+                    timeout=min(deadline - time.time(), TX_UNKNOWN_TTL)
+                )
+            found = self._find_or_lookup(tx_hash, chain_id)
+
+        replaced = self._replacement_info(tx_hash)
+        if found is None:
+            return {
+                'status': 'pending',
+                'transaction_hash': self._latest_hash(tx_hash),
+                **replaced
+            }
+
+        found_chain_id, receipt = found
+        head = self.heads.head(found_chain_id) or receipt['block_number']
+        return {
+            **receipt,
+            'confirmations': max(head - receipt['block_number'] + 1, 1),
+            'chain_id': found_chain_id,
+            **replaced
+        }
+
+    def _find_or_lookup(self, tx_hash, chain_id):
+        found = self._find(tx_hash)
+        if found is not None or self._is_pending(tx_hash) or tx_hash in self._originals:
+            return found
+        # Not sent by this process (e.g. before a restart, or by anyone else): one
+        # receipt lookup per chain, not tracked, so callers cannot grow the pending set
+        for candidate in ([chain_id] if chain_id is not None else CHAIN_IDS.values()):
+            if self._lookup_receipt(tx_hash, candidate):
+                return self._find(tx_hash)
+        return None
+
+    def _lookup_receipt(self, tx_hash, chain_id):
+        key = (tx_hash, chain_id)
+        now = time.time()
+        with self._cond:
+            checked_at = self._unknown.get(key)
+            if checked_at is not None and now - checked_at < TX_UNKNOWN_TTL:
+                return False
+
+        try:
+            # An unhealthy chain fails here like a failed request, so the other chains are still checked
+            web3 = self.clients.get(chain_id)
+            response = batch_request(web3, [('eth_getTransactionReceipt', [tx_hash])])[0]
+        except Exception:
+            response = {'error': 'lookup failed'}
+
+        if response.get('result') is None:
+            with self._cond:
+                self._unknown[key] = now
+                self._unknown.move_to_end(key)
+                while len(self._unknown) > TX_UNKNOWN_CACHE_SIZE:
+                    self._unknown.popitem(last=False)
+            return False
+
+        # Mined: kept until final like any receipt, with the chain followed for reorgs
+        block_number = int(response['result']['blockNumber'], 16)
+        self._apply(chain_id, max(self.heads.head(chain_id) or 0, block_number), [tx_hash], [response])
+        self.heads.follow(chain_id, web3)
+        return True
+
+    def _linked_hashes(self, tx_hash):
+        original = self._originals.get(tx_hash)
+        return list(self._replacements.get(original, [tx_hash])) if original is not None else [tx_hash]
+
+    def _find(self, tx_hash):
+        # Receipt of the transaction or of whichever of its replacements was mined
+        for linked in self._linked_hashes(tx_hash):
+            found = self._lookup(linked)
+            if found is not None:
+                return found
+        return None
+
+    def _latest_hash(self, tx_hash):
+        return self._linked_hashes(tx_hash)[-1]
+
+    def _replacement_info(self, tx_hash):
+        hashes = self._linked_hashes(tx_hash)
+        if len(hashes) == 1:
+            return {}
+        return {'original_hash': hashes[0], 'replacements': hashes[1:]}
+
+    def _lookup(self, tx_hash):
+        final = self._final.get(tx_hash)
+        if final is not None:
+            return final
+        mined = self._mined.get(tx_hash)
+        if mined is not None:
+            return mined[0], mined[2]
+        return None
+
+    def _is_pending(self, tx_hash):
+        return any(tx_hash in pending for pending in self._pending.values())
+
+    def _normalize(self, tx_hash):
+        tx_hash = tx_hash.lower()
+        return tx_hash if tx_hash.startswith('0x') else '0x' + tx_hash
+
+    def _on_block(self, chain_id, web3, block_number, new_head):
+        now = time.time()
+        with self._cond:
+            pending = self._pending.get(chain_id, {})
+            # Drop hashes that never showed up
+            for tx_hash in [h for h, (_, added_at) in pending.items() if now - added_at > TX_PENDING_TTL]:
+                del pending[tx_hash]
+
+            # Re-check mined but not yet final receipts on new heads to catch reorgs
+            recheck = [h for h, (c, _, _) in self._mined.items() if c == chain_id] if new_head else []
+            to_check = list(pending) + recheck
+
+        for start in range(0, len(to_check), TX_BATCH_SIZE):
+            chunk = to_check[start:start + TX_BATCH_SIZE]
+            responses = batch_request(web3, [('eth_getTransactionReceipt', [h]) for h in chunk])
+            self._apply(chain_id, block_number, chunk, responses)
+
+    def _apply(self, chain_id, block_number, hashes, responses):
+        mined = []
+        with self._cond:
+            pending = self._pending.setdefault(chain_id, {})
+            for tx_hash, response in zip(hashes, responses):
+                raw = response.get('result')
+                if raw is None:
+                    if 'error' not in response and tx_hash in self._mined:
+                        # Receipt disappeared: reorged out, back to pending
+                        _, label, _ = self._mined.pop(tx_hash)
+                        pending[tx_hash] = (label, time.time())
+                    continue
+
+                receipt = {
+                    'status': 'success' if int(raw['status'], 16) == 1 else 'failed',
+                    'block_number': int(raw['blockNumber'], 16),
+                    'gas_used': int(raw['gasUsed'], 16),
+                    'transaction_hash': tx_hash
+                }
+
+                if tx_hash in pending:
+                    label, _ = pending.pop(tx_hash)
+                    mined.append((label, receipt))
+                    # Found here; stop looking for it on other chains, and for the
+                    # transactions it replaced or was replaced by (same nonce)
+                    for linked in self._linked_hashes(tx_hash):
+                        for other in self._pending.values():
+                            other.pop(linked, None)
+                else:
+                    label = self._mined.get(tx_hash, (None, None))[1]
+
+                if block_number - receipt['block_number'] + 1 >= TX_FINALITY_DEPTH:
+                    # Finalized receipts never change; keep them in the bounded cache
+                    self._mined.pop(tx_hash, None)
+                    self._final[tx_hash] = (chain_id, receipt)
+                    self._final.move_to_end(tx_hash)
+                    while len(self._final) > TX_CACHE_SIZE:
+                        self._final.popitem(last=False)
+                else:
+                    self._mined[tx_hash] = (chain_id, label, receipt)
+
+            self._cond.notify_all()
+
+        for label, receipt in mined:
+            for callback in self._listeners:
+                try:
+                    callback(chain_id, label, receipt)
+                except Exception:
+                    continue
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Used Nonce Index for PyPay contracts.
+Indexes usedNoncesEvent logs on each chain so a replayed payload nonce can
+be rejected before anything is signed or sent.
+"""
+
+import os
+from web3 import Web3
+from log_indexer import LogIndexer
+from config import STATE_DIR, CHAIN_IDS
+
+# usedNoncesEvent(uint32 indexed chainId, uint256 indexed nonceUsed)
+USED_NONCES_TOPIC = Web3.keccak(text='usedNoncesEvent(uint32,uint256)').hex()
+
+
+class UsedNonceIndex(LogIndexer):
+    """Nonces consumed per (chain, PyPay contract), from usedNoncesEvent logs."""
+
+    name = 'used-nonce-indexer'
+
+    def __init__(self, clients, heads, db_path=None):
+        """
+        Initialize the index.
+
+        Args:
+            clients: ChainClientRegistry for the indexed chains
+            heads: HeadFollower that signals new blocks
+            db_path: Optional SQLite file path (default: STATE_DIR/used_nonces.db)
+        """
+        if db_path is None:
+            db_path = os.getenv('USED_NONCES_DB_PATH') or os.path.join(
+                os.getenv('STATE_DIR', STATE_DIR), 'used_nonces.db'
+            )
+        self._used = set()  # (chain_id, contract, nonce)
+        super().__init__(clients, heads, db_path)
+
+    def _create_tables(self, conn):
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS used_nonces ('
+            ' chain_id INTEGER NOT NULL,'
+            ' contract TEXT NOT NULL,'
+            ' nonce TEXT NOT NULL,'
+            ' block_number INTEGER NOT NULL,'
+            ' PRIMARY KEY (chain_id, contract, nonce))'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS used_nonces_block ON used_nonces (chain_id, block_number)')
+
+    def _load(self, conn):
+        for chain_id, contract, nonce in conn.execute('SELECT chain_id, contract, nonce FROM used_nonces'):
+            self._used.add((chain_id, contract, int(nonce)))
+
+    def _check_chain(self, chain_id):
+        if chain_id not in CHAIN_IDS.values():
+            raise ValueError(f'Unsupported chain: {chain_id}')
+
+    def is_used(self, chain_id, contract_address, nonce):
+        """
+        Check whether a nonce has been consumed by a PyPay contract.
+
+        Args:
+            chain_id: Chain ID
+            contract_address: PyPay contract address
+            nonce: Payload nonce
+
+        Returns:
+            True if a usedNoncesEvent for the nonce has been indexed
+        """
+        return (chain_id, Web3.to_checksum_address(contract_address), int(nonce)) in self._used
+
+    def _fetch_logs(self, chain_id, web3, from_block, to_block):
+        # Every PyPay contract on the chain; the emitting address keys the index
+        return web3.eth.get_logs({
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            'topics': [USED_NONCES_TOPIC]
+        })
+
+    def _store(self, chain_id, logs):
+        for log in logs:
+            contract = Web3.to_checksum_address(log['address'])
+            nonce = int.from_bytes(bytes(log['topics'][2]), 'big')
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO used_nonces (chain_id, contract, nonce, block_number) VALUES (?, ?, ?, ?)',
+                (chain_id, contract, str(nonce), log['blockNumber'])
+            )
+            if cursor.rowcount:
+                self._used.add((chain_id, contract, nonce))
+
+    def _rewind(self, chain_id, from_block, to_block):
+        rows = self._conn.execute(
+            'SELECT contract, nonce FROM used_nonces WHERE chain_id = ? AND block_number BETWEEN ? AND ?',
+            (chain_id, from_block, to_block)
+        ).fetchall()
+        if not rows:
+            return
+        self._conn.execute(
+            'DELETE FROM used_nonces WHERE chain_id = ? AND block_number BETWEEN ? AND ?',
+            (chain_id, from_block, to_block)
+        )
+        for contract, nonce in rows:
+            self._used.discard((chain_id, contract, int(nonce)))
@@ -8,6 +8,60 @@ import os
 from web3 import Web3
 from web3.middleware import geth_poa_middleware
 from eth_account import Account
+from tx_signer import TransactionSigner
+from metrics import rpc_metrics_middleware
+from chain_clients import create_provider
+
+def get_default_rpc_url():
+    """
+    Get the RPC URL of the wallet's default network.
+    Uses RPC_URL if set, otherwise derives it from NETWORK and the Alchemy keys.
+    
+    Returns:
+        RPC URL string
+    """
+    rpc_url = os.getenv('RPC_URL')
+    if not rpc_url:
+        network = os.getenv('NETWORK', 'mainnet')
+        alchemy_key_ethereum = os.getenv('ALCHEMY_API_KEY_ETHEREUM')
+        alchemy_key_arbitrum = os.getenv('ALCHEMY_API_KEY_ARBITRUM')
+        alchemy_key_arbitrum_sepolia = os.getenv('ALCHEMY_API_KEY_ARBITRUM_SEPOLIA')
+        
+        # Default RPC URLs for different networks
+        if network == 'mainnet' or network == 'ethereum':
+            if alchemy_key_ethereum:
+                rpc_url = f'https://eth-mainnet.g.alchemy.com/v2/{alchemy_key_ethereum}'
+            else:
+                raise ValueError('ALCHEMY_API_KEY_ETHEREUM not found in environment variables')
+        elif network == 'arbitrum':
+            if alchemy_key_arbitrum:
+                rpc_url = f'https://arb-mainnet.g.alchemy.com/v2/{alchemy_key_arbitrum}'
+            else:
+                rpc_url = 'https://arb1.arbitrum.io/rpc'
+        elif network == 'arbitrum-sepolia':
+            if alchemy_key_arbitrum_sepolia:
+                rpc_url = f'https://arb-sepolia.g.alchemy.com/v2/{alchemy_key_arbitrum_sepolia}'
+            else:
+                rpc_url = 'https://sepolia-rollup.arbitrum.io/rpc'
+        elif network == 'localhost':
+            rpc_url = 'http://localhost:8545'
+        else:
+            raise ValueError(f'Unknown network: {network}')
+    
+    return rpc_url
+
+def get_default_rpc_urls():
+    """
+    Get every RPC URL of the wallet's default network, preferred first.
+    Uses RPC_URLS (comma-separated) if set, otherwise get_default_rpc_url().
+    
+    Returns:
+        List of RPC URL strings
+    """
+    configured = os.getenv('RPC_URLS')
+    if configured:
+        return [url.strip() for url in configured.split(',') if url.strip()]
+    return [get_default_rpc_url()]
 
 class WalletManager:
     """Manages wallet operations for blockchain interactions."""
@@ -20,51 +74,33 @@ class WalletManager:
         if not self.private_key:
             raise ValueError('PRIVATE_KEY not found in environment variables')
         
-        # Get the network from environment or use default
-        rpc_url = os.getenv('RPC_URL')
-        if not rpc_url:
-            network = os.getenv('NETWORK', 'mainnet')
-            alchemy_key_ethereum = os.getenv('ALCHEMY_API_KEY_ETHEREUM')
-            alchemy_key_arbitrum = os.getenv('ALCHEMY_API_KEY_ARBITRUM')
-            alchemy_key_arbitrum_sepolia = os.getenv('ALCHEMY_API_KEY_ARBITRUM_SEPOLIA')
-            
-            # Default RPC URLs for different networks
-            if network == 'mainnet' or network == 'ethereum':
-                if alchemy_key_ethereum:
-                    rpc_url = f'https://eth-mainnet.g.alchemy.com/v2/{alchemy_key_ethereum}'
-                else:
-                    raise ValueError('ALCHEMY_API_KEY_ETHEREUM not found in environment variables')
-            elif network == 'arbitrum':
-                if alchemy_key_arbitrum:
-                    rpc_url = f'https://arb-mainnet.g.alchemy.com/v2/{alchemy_key_arbitrum}'
-                else:
-                    rpc_url = 'https://arb1.arbitrum.io/rpc'
-            elif network == 'arbitrum-sepolia':
-                if alchemy_key_arbitrum_sepolia:
-                    rpc_url = f'https://arb-sepolia.g.alchemy.com/v2/{alchemy_key_arbitrum_sepolia}'
-                else:
-                    rpc_url = 'https://sepolia-rollup.arbitrum.io/rpc'
-            elif network == 'localhost':
-                rpc_url = 'http://localhost:8545'
-            else:
-                raise ValueError(f'Unknown network: {network}')
+        # Get the RPC URLs from environment or network default
+        self.rpc_urls = get_default_rpc_urls()
+        self.rpc_url = ', '.join(self.rpc_urls)
         
-        # Initialize Web3 connection
-        self.web3 = Web3(Web3.HTTPProvider(rpc_url))
+        # Initialize Web3 connection (failover across endpoints when several are set)
+        self.web3 = Web3(create_provider(self.rpc_urls))
         
         # Add PoA middleware for Arbitrum and other PoA chains
         self.web3.middleware_onion.inject(geth_poa_middleware, layer=0)
         
-        # Check connection
-        if not self.web3.is_connected():
-            raise ConnectionError(f'Cannot connect to RPC: {rpc_url}')
+        # RPC latency and error metrics
+        self.web3.middleware_onion.add(rpc_metrics_middleware(), 'metrics')
         
         # Create account from private key
         self.account = Account.from_key(self.private_key)
         self.address = self.account.address
         
+        # Signing service for the operator key (native secp256k1, optional process pool)
+        self.signer = TransactionSigner(self.private_key)
+    
+    def connect(self):
+        """Check the RPC connection (the constructor does not touch the network)."""
+        if not self.web3.is_connected():
+            raise ConnectionError(f'Cannot connect to RPC: {self.rpc_url}')
+        
         print(f'Wallet initialized: {self.address}')
-        print(f'Connected to RPC: {rpc_url}')
+        print(f'Connected to RPC: {self.rpc_url}')
     
     def get_address(self):
         """Get the wallet address."""
@@ -76,4 +112,28 @@ class WalletManager:
         balance_eth = self.web3.from_wei(balance_wei, 'ether')
         return str(balance_eth)
     
+    def sign_transaction(self, transaction):
+        """
+        Sign a transaction with the wallet's key.
+        
+        Args:
+            transaction: Transaction dict
+        
+        Returns:
+            SignedTransaction
+        """
+        return self.signer.sign(transaction)
+    
+    def sign_transactions(self, transactions):
+        """
+        Sign many transactions with the wallet's key in one call.
+        
+        Args:
+            transactions: List of transaction dicts
+        
+        Returns:
+            List of SignedTransaction, in order
+        """
+        return self.signer.sign_many(transactions)
+    
 
@@ -0,0 +1,30 @@
+// SPDX-License-Identifier: UNLICENSED
+pragma solidity ^0.8.28;
+
+import {IOFTLikeSender} from "../pypay.sol";
+
+// Stand-in for the PYUSD OFT adapter on local benchmark chains. Quotes a fixed fee and
+// accepts sends without delivering them; deliveries are simulated with MockPYUSD.mint.
+contract MockOFT {
+    uint256 public constant NATIVE_FEE = 0.0001 ether;
+
+    event OFTSent(bytes32 indexed guid, uint32 dstEid, address indexed fromAddress, uint256 amountSentLD, uint256 amountReceivedLD);
+
+    function quoteSend(IOFTLikeSender.SendParam calldata, bool) external pure returns (IOFTLikeSender.MessagingFee memory) {
+        return IOFTLikeSender.MessagingFee(NATIVE_FEE, 0);
+    }
+
+    function send(
+        IOFTLikeSender.SendParam calldata sendParam,
+        IOFTLikeSender.MessagingFee calldata fee,
+        address
+    ) external payable returns (IOFTLikeSender.MessagingReceipt memory, IOFTLikeSender.OFTReceipt memory) {
+        require(msg.value == fee.nativeFee, "Incorrect native fee");
+        bytes32 guid = keccak256(abi.encode(msg.sender, sendParam.dstEid, sendParam.amountLD, block.number));
+        emit OFTSent(guid, sendParam.dstEid, msg.sender, sendParam.amountLD, sendParam.amountLD);
+        return (
+            IOFTLikeSender.MessagingReceipt(guid, 0, sendParam.dstEid),
+            IOFTLikeSender.OFTReceipt(sendParam.amountLD, sendParam.amountLD)
+        );
+    }
+}
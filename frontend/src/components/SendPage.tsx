@@ -11,6 +11,23 @@ interface NotificationState {
   type: 'success' | 'error' | 'info'
 }
 
+// 後端 /jobs/<job_id>/events 推送的交易生命週期事件
+interface JobEvent {
+  id: number
+  job_id: string
+  event: 'queued' | 'submitted' | 'mined' | 'delivered' | 'failed' | 'done'
+  chain_id?: number
+  tx_hash?: string
+  status?: string
+  error?: string
+  success?: boolean
+}
+
+const JOB_EVENTS = ['queued', 'submitted', 'mined', 'delivered', 'failed', 'done']
+
+// 等待 done 事件的上限；串流會自動重連，所以逾時要由前端判斷
+const JOB_TIMEOUT_MS = 5 * 60 * 1000
+
 function SendPage() {
   const { address } = useAccount()
   const [sendMethod, setSendMethod] = useState<'address' | 'qr'>('address')
@@ -99,6 +116,58 @@ function SendPage() {
     }
   }
 
+  // 訂閱後端推送的交易生命週期，直到完成（轉帳上鏈，或跨鏈送達）
+  const followJob = (
+    queued: { success: boolean; job_id?: string; error?: string },
+    onEvent?: (event: JobEvent) => void,
+    timeoutError = 'Transfer timeout'
+  ): Promise<{ success: boolean; tx_hash?: string; error?: string }> => {
+    if (!queued.success) return Promise.resolve(queued)
+
+    return new Promise((resolve, reject) => {
+      // EventSource reconnects by itself and resumes after the last event it saw
+      const source = new EventSource(`${BACKEND_URL}/jobs/${queued.job_id}/events`)
+      let txHash: string | undefined
+      const errors: string[] = []
+
+      // Reconnects never end on their own, so a job that never reaches done gives up here
+      const timer = setTimeout(() => {
+        source.close()
+        reject(new Error(timeoutError))
+      }, JOB_TIMEOUT_MS)
+
+      const handle = (message: MessageEvent) => {
+        const event = JSON.parse(message.data) as JobEvent
+        onEvent?.(event)
+
+        if (event.event === 'submitted' || event.event === 'mined') {
+          // A mined hash may be a fee-bumped replacement of the submitted one
+          txHash = event.tx_hash
+        }
+        if (event.event === 'failed' && event.error) {
+          errors.push(event.error)
+        }
+        if (event.event === 'mined' && event.status !== 'success') {
+          errors.push(`Transaction ${event.tx_hash} reverted`)
+        }
+        if (event.event === 'done') {
+          clearTimeout(timer)
+          source.close()
+          resolve(event.success ? { success: true, tx_hash: txHash } : { success: false, error: errors.join('; ') })
+        }
+      }
+
+      JOB_EVENTS.forEach(name => source.addEventListener(name, handle))
+      source.onerror = () => {
+        // CLOSED: the job is unknown or the backend refused the stream; otherwise it is retrying
+        if (source.readyState === EventSource.CLOSED) {
+          clearTimeout(timer)
+          resolve({ success: false, error: 'Lost connection to the backend' })
+        }
+      }
+    })
+  }
+
   const handleSend = async () => {
     if (!recipientAddress || !amount) {
       setNotification({ message: 'Please fill in complete information', type: 'error' })
@@ -273,7 +342,16 @@ function SendPage() {
           }),
         })
         
-        const crossChainData = await crossChainResponse.json()
+        // The stream reports each step and ends once LayerZero has delivered on the target chain
+        const crossChainData = await followJob(await crossChainResponse.json(), event => {
+          if (event.event === 'submitted') {
+            setStatusMessage('Cross-chain transfer sent, waiting for it to be mined...')
+          } else if (event.event === 'mined' && event.status === 'success') {
+            setStatusMessage('Cross-chain transfer mined, waiting for delivery on the target chain...')
+          } else if (event.event === 'delivered') {
+            setStatusMessage('Cross-chain transfer delivered')
+          }
+        }, 'Cross-chain transfer timeout')
         
         if (!crossChainData.success) {
           setNotification({ message: `Cross-chain transfer failed: ${crossChainData.error}`, type: 'error' })
@@ -284,39 +362,6 @@ function SendPage() {
         
         txHashes.push(crossChainData.tx_hash)
         
-        setStatusMessage('Waiting for cross-chain transfer to complete...')
-        
-        // Wait for cross-chain transfer
-        let retries = 20
-        let confirmed = false
-        
-        while (retries > 0 && !confirmed) {
-          await new Promise(resolve => setTimeout(resolve, 3000))
-          
-          const checkResponse = await fetch(`${BACKEND_URL}/check-cross-chain`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-              target_address: address,
-              amount_expected: amountEach[1].toString(),
-              destination_chain_id: targetChainIdNum,
-            }),
-          })
-          
-          const checkData = await checkResponse.json()
-          if (checkData.success && checkData.result.received) {
-            confirmed = true
-          }
-          retries--
-        }
-        
-        if (!confirmed) {
-          setNotification({ message: 'Cross-chain transfer timeout', type: 'error' })
-          setIsSending(false)
-          setStatusMessage('')
-          return
-        }
-        
         // Step 2: Final transfer signature and execution on target chain
         setStatusMessage('Requesting signature for final transfer...')
         
@@ -351,7 +396,11 @@ function SendPage() {
           }),
         })
         
-        const finalData = await finalResponse.json()
+        const finalData = await followJob(await finalResponse.json(), event => {
+          if (event.event === 'submitted') {
+            setStatusMessage('Final transfer sent, waiting for it to be mined...')
+          }
+        })
         
         if (!finalData.success) {
           setNotification({ message: `Final transfer failed: ${finalData.error}`, type: 'error' })
@@ -402,7 +451,11 @@ function SendPage() {
           }),
         })
         
-        const data = await response.json()
+        const data = await followJob(await response.json(), event => {
+          if (event.event === 'submitted') {
+            setStatusMessage('Transaction sent, waiting for it to be mined...')
+          }
+        })
         
         if (data.success) {
           setNotification({ 
@@ -431,7 +484,7 @@ function SendPage() {
     } catch (error) {
       console.error('Error sending transaction:', error)
       setNotification({ 
-        message: `Error: ${error}`, 
+        message: `Error: ${error instanceof Error ? error.message : error}`, 
         type: 'error' 
       })
       setStatusMessage('')